@@ -0,0 +1,362 @@
+#!/usr/bin/env python
+
+"""
+File holds the module of admission control limiting concurrent queries sent
+to each database, queueing the others by priority with timeout and
+optionally adapting the limit to measured latency.
+"""
+
+import time
+import heapq
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Supported priorities, in order of precedence.
+PRIORITIES = ["interactive", "batch"]
+# Weight of last query in moving average of latency.
+LATENCY_ALPHA = 0.2
+# Share of gap to window average the baseline latency rise by per window,
+# so lowest latency of an unusually fast window is forgotten over time.
+BASELINE_DECAY = 0.1
+
+
+class AdmissionController(object):
+    """
+    Class handle the admission of database operations per connection
+    identity. At most limit operations run at once per identity, others wait
+    in queue ordered by priority then arrival and are admitted as slots are
+    released, or fail after queue timeout. In adaptive mode limit follow
+    AIMD: it grow by one slot after window of operations within latency
+    target and shrink by decrease factor when latency exceed it. Controller
+    can be shared by managers so they share limits of same database.
+
+    ********
+    Methods:
+    --------
+
+        __init__:       Initaization functions, holds limits.
+        acquire:        Method to wait for slot of identity.
+        release:        Method to return slot of identity.
+        run:            Method to execute function within slot.
+        get_metrics:    Method to return limit and queue counters.
+    """
+
+    def __init__(self,
+                 max_concurrency: int = 8,
+                 queue_timeout: float = None,
+                 batch_limit: int = None,
+                 adaptive: bool = False,
+                 min_concurrency: int = 1,
+                 latency_target: float = None,
+                 latency_tolerance: float = 2.0,
+                 decrease_factor: float = 0.7,
+                 window: int = 20):
+        """
+        Initialization function to initlaize the admission controller
+
+        ***********
+        Attributes:
+        -----------
+
+            max_concurrency:    (Optional) => Maximum operations running at
+                                once per database. Starting limit of
+                                adaptive mode.
+                                Default: 8
+            queue_timeout:      (Optional) => Seconds operation wait for
+                                slot before TimeoutError.
+                                Default: None to wait without limit.
+            batch_limit:        (Optional) => Maximum batch operations
+                                running at once, keeping slots free for
+                                interactive operations.
+                                Default: None for no separate limit.
+            adaptive:           (Optional) => Adapt limit between
+                                min_concurrency and max_concurrency to
+                                latency using AIMD.
+                                Default: False
+            min_concurrency:    (Optional) => Lowest limit of adaptive mode.
+                                Default: 1
+            latency_target:     (Optional) => Seconds of average latency
+                                above which limit is decreased.
+                                Default: None to use recent lowest average
+                                latency times latency_tolerance.
+            latency_tolerance:  (Optional) => Ratio of lowest observed
+                                latency tolerated without latency_target.
+                                Default: 2.0
+            decrease_factor:    (Optional) => Ratio applied on limit when
+                                latency exceed target.
+                                Default: 0.7
+            window:             (Optional) => Operations averaged before
+                                limit is adjusted.
+                                Default: 20
+        """
+
+        if max_concurrency < 1 or min_concurrency < 1 \
+                or min_concurrency > max_concurrency:
+            msg = f"Invalid concurrency limits min {min_concurrency} and max {max_concurrency}"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self.batch_limit = batch_limit
+        self.adaptive = adaptive
+        self.min_concurrency = min_concurrency
+        self.latency_target = latency_target
+        self.latency_tolerance = latency_tolerance
+        self.decrease_factor = decrease_factor
+        self.window = window
+        self.__lock = threading.Lock()
+        self.__states = {}
+        self.__sequence = 0
+
+    def _state(self, identity: str):
+        """
+        Method to return the state of identity, created on first use.
+        Caller must hold the lock.
+        """
+
+        state = self.__states.get(identity)
+        if state is None:
+            state = {"limit": float(self.max_concurrency),
+                     "in_use": 0,
+                     "batch_in_use": 0,
+                     "queue": [],
+                     "latency": None,
+                     "baseline": None,
+                     "window_latency": 0.0,
+                     "window_count": 0,
+                     "metrics": {"admitted": 0,
+                                 "queued": 0,
+                                 "timed_out": 0,
+                                 "wait_seconds": 0.0,
+                                 "max_queue_depth": 0,
+                                 "increases": 0,
+                                 "decreases": 0}}
+            self.__states[identity] = state
+        return state
+
+    def _can_admit(self, state: dict, is_batch: bool):
+        """
+        Method to check if operation can take a slot now.
+        """
+
+        if state["in_use"] >= max(int(state["limit"]), 1):
+            return False
+        if is_batch and self.batch_limit is not None \
+                and state["batch_in_use"] >= self.batch_limit:
+            return False
+        return True
+
+    def _admit(self, state: dict, is_batch: bool):
+        """
+        Method to take a slot. Caller must hold the lock.
+        """
+
+        state["in_use"] += 1
+        if is_batch:
+            state["batch_in_use"] += 1
+        state["metrics"]["admitted"] += 1
+
+    def _dispatch(self, state: dict):
+        """
+        Method to hand free slots to waiting operations in queue order.
+        Caller must hold the lock.
+        """
+
+        queue = state["queue"]
+        while queue:
+            waiter = queue[0][2]
+            if not self._can_admit(state, waiter["is_batch"]):
+                # Interactive operations are ahead of batch ones, so the
+                # head blocked by batch limit means no interactive waiter.
+                break
+            heapq.heappop(queue)
+            self._admit(state, waiter["is_batch"])
+            waiter["granted"] = True
+            waiter["event"].set()
+
+    def acquire(self, identity: str, priority: str = "interactive", timeout: float = None):
+        """
+        Method to wait for slot of identity.
+
+        ***********
+        Attributes:
+        -----------
+
+            identity:   (Required) => Identity of database like URL.
+            priority:   (Optional) => One of interactive or batch.
+                        Default: interactive
+            timeout:    (Optional) => Seconds to wait in queue.
+                        Default: None to use queue_timeout.
+        """
+
+        if priority not in PRIORITIES:
+            msg = f"Unsupported priority '{priority}'. Supported are '{PRIORITIES}'"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        is_batch = priority == "batch"
+        timeout = self.queue_timeout if timeout is None else timeout
+        with self.__lock:
+            state = self._state(identity)
+            if not state["queue"] and self._can_admit(state, is_batch):
+                self._admit(state, is_batch)
+                return
+
+            self.__sequence += 1
+            waiter = {"is_batch": is_batch,
+                      "granted": False,
+                      "event": threading.Event()}
+            heapq.heappush(state["queue"], (PRIORITIES.index(priority),
+                                            self.__sequence, waiter))
+            metrics = state["metrics"]
+            metrics["queued"] += 1
+            metrics["max_queue_depth"] = max(metrics["max_queue_depth"],
+                                             len(state["queue"]))
+            # Queue may only hold batch operations blocked by batch limit,
+            # so interactive operation is admitted ahead of them at once.
+            self._dispatch(state)
+            if waiter["granted"]:
+                return
+
+        start = time.monotonic()
+        waiter["event"].wait(timeout)
+        with self.__lock:
+            state["metrics"]["wait_seconds"] += time.monotonic() - start
+            if waiter["granted"]:
+                return
+            state["queue"] = [item for item in state["queue"]
+                              if item[2] is not waiter]
+            heapq.heapify(state["queue"])
+            state["metrics"]["timed_out"] += 1
+
+        msg = f"Timed out after {timeout} seconds waiting for {priority} slot of database"
+        logger.error(msg)
+        raise TimeoutError(msg)
+
+    def _adjust(self, state: dict, elapsed: float):
+        """
+        Method to adjust limit of identity from latency of operation.
+        Caller must hold the lock.
+        """
+
+        state["latency"] = elapsed if state["latency"] is None else \
+            LATENCY_ALPHA * elapsed + (1 - LATENCY_ALPHA) * state["latency"]
+        state["window_latency"] += elapsed
+        state["window_count"] += 1
+        if state["window_count"] < self.window:
+            return
+
+        average = state["window_latency"] / state["window_count"]
+        state["window_latency"] = 0.0
+        state["window_count"] = 0
+        baseline = state["baseline"]
+        state["baseline"] = average if baseline is None else \
+            min(average, baseline + BASELINE_DECAY * (average - baseline))
+        target = self.latency_target or state["baseline"] * self.latency_tolerance
+
+        limit = state["limit"]
+        if average > target:
+            state["limit"] = max(float(self.min_concurrency),
+                                 limit * self.decrease_factor)
+            state["metrics"]["decreases"] += 1
+        else:
+            state["limit"] = min(float(self.max_concurrency), limit + 1)
+            state["metrics"]["increases"] += 1
+        if int(state["limit"]) != int(limit):
+            logger.info(f'Concurrency limit changed from {int(limit)} to {int(state["limit"])} at average latency {average:.3f} seconds')
+
+    def release(self, identity: str, priority: str = "interactive", elapsed: float = None):
+        """
+        Method to return slot of identity and admit next waiting operation.
+
+        ***********
+        Attributes:
+        -----------
+
+            identity:   (Required) => Identity of database like URL.
+            priority:   (Optional) => Priority slot was acquired with.
+                        Default: interactive
+            elapsed:    (Optional) => Seconds operation ran, used by
+                        adaptive mode.
+                        Default: None to not adjust limit.
+        """
+
+        with self.__lock:
+            state = self._state(identity)
+            state["in_use"] -= 1
+            if priority == "batch":
+                state["batch_in_use"] -= 1
+            if self.adaptive and elapsed is not None:
+                self._adjust(state, elapsed)
+            self._dispatch(state)
+
+    def run(self, identity: str, func, priority: str = "interactive", timeout: float = None):
+        """
+        Method to execute function within slot of identity.
+
+        ***********
+        Attributes:
+        -----------
+
+            identity:   (Required) => Identity of database like URL.
+            func:       (Required) => Function executing the operation.
+            priority:   (Optional) => One of interactive or batch.
+                        Default: interactive
+            timeout:    (Optional) => Seconds to wait in queue.
+                        Default: None to use queue_timeout.
+        *******
+        Return:
+        -------
+
+            result:     Result of function.
+        """
+
+        self.acquire(identity, priority=priority, timeout=timeout)
+        start = time.monotonic()
+        elapsed = None
+        try:
+            result = func()
+            elapsed = time.monotonic() - start
+            return result
+        finally:
+            # Failed operations do not tell latency of database.
+            self.release(identity, priority=priority, elapsed=elapsed)
+
+    def get_metrics(self, identity: str = None):
+        """
+        Method to return limit, slots in use, queue depth and admission
+        counters per identity.
+
+        ***********
+        Attributes:
+        -----------
+
+            identity:   (Optional) => Identity of database like URL.
+                        Default: None for all identities.
+        *******
+        Return:
+        -------
+
+            metrics:    Dictonary of counters, or dictonary of identity to
+                        counters.
+        """
+
+        def snapshot(state: dict):
+            metrics = dict(state["metrics"])
+            depth = {priority: 0 for priority in PRIORITIES}
+            for rank, _, _ in state["queue"]:
+                depth[PRIORITIES[rank]] += 1
+            metrics.update({"limit": int(state["limit"]),
+                            "in_use": state["in_use"],
+                            "queue_depth": len(state["queue"]),
+                            "queue_depth_by_priority": depth,
+                            "latency": state["latency"]})
+            return metrics
+
+        with self.__lock:
+            if identity is not None:
+                return snapshot(self._state(identity))
+            return {key: snapshot(state) for key, state in self.__states.items()}
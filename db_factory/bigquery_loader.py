@@ -0,0 +1,323 @@
+#!/usr/bin/env python
+
+"""
+File holds the module to load Pandas DataFrame in BigQuery using load jobs
+from in-memory Parquet and to read query results using BigQuery Storage Read
+API streams in Arrow format.
+"""
+
+import io
+import re
+import queue
+import logging
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from pandas import DataFrame
+
+logger = logging.getLogger(__name__)
+
+# Write disposition of load job per exist action of DataFrame.
+WRITE_DISPOSITION = {"append": "WRITE_APPEND",
+                     "replace": "WRITE_TRUNCATE",
+                     "fail": "WRITE_EMPTY"}
+# Query with ORDER BY is read from single stream, as rows of parallel
+# streams are not ordered.
+ORDER_BY_PATTERN = re.compile(r"\bORDER\s+BY\b", re.IGNORECASE)
+# Record batches buffered per stream while chunks are read.
+BUFFERED_BATCHES = 2
+
+
+class BigQueryLoader(object):
+    """
+    Class handle the BigQuery native paths to load and read Pandas DataFrame.
+    Clients are pluggable so the loader can be exercised against fakes
+    implementing the used methods of google-cloud-bigquery and
+    google-cloud-bigquery-storage clients.
+
+    ********
+    Methods:
+    --------
+
+        __init__:       Initaization functions, holds the clients.
+        get_client:     Method to return BigQuery client.
+        get_read_client:    Method to return BigQuery Storage read client.
+        load_df:        Method to load DataFrame in table using load job.
+        read_df:        Method to read query result using Storage Read API.
+    """
+
+    def __init__(self,
+                 project: str,
+                 dataset: str,
+                 client=None,
+                 read_client=None,
+                 credentials_path: str = None,
+                 max_streams: int = 4):
+        """
+        Initialization function to initlaize the BigQuery loader
+
+        ***********
+        Attributes:
+        -----------
+
+            project:            (Required) => Project id of Google Cloud
+                                Platform.
+            dataset:            (Required) => BigQuery dataset of tables.
+            client:             (Optional) => BigQuery client.
+                                Default: None to create client from
+                                credentials.
+            read_client:        (Optional) => BigQuery Storage read client.
+                                Default: None to create client from
+                                credentials.
+            credentials_path:   (Optional) => Service account file used to
+                                create clients.
+                                Default: None to use default credentials.
+            max_streams:        (Optional) => Maximum read streams read in
+                                parallel.
+                                Default: 4
+        """
+
+        self.project = project
+        self.dataset = dataset
+        self.client = client
+        self.read_client = read_client
+        self.credentials_path = credentials_path
+        self.max_streams = max_streams
+
+    def __get_credentials__(self):
+        """
+        Method to return credentials of service account file if provided.
+        """
+
+        if not self.credentials_path:
+            return None
+
+        from google.oauth2.service_account import Credentials
+        return Credentials.from_service_account_file(self.credentials_path)
+
+    def get_client(self):
+        """
+        Method to return BigQuery client, created on first use.
+        """
+
+        if self.client is None:
+            from google.cloud import bigquery
+            self.client = bigquery.Client(
+                project=self.project,
+                credentials=self.__get_credentials__())
+        return self.client
+
+    def get_read_client(self):
+        """
+        Method to return BigQuery Storage read client, created on first use.
+        """
+
+        if self.read_client is None:
+            from google.cloud import bigquery_storage
+            self.read_client = bigquery_storage.BigQueryReadClient(
+                credentials=self.__get_credentials__())
+        return self.read_client
+
+    def load_df(self,
+                panda_df: DataFrame,
+                table_name: str,
+                exist_action: str = "append"):
+        """
+        Method to load DataFrame in table using load job from in-memory
+        Parquet. Table is created from Parquet schema if not exist.
+
+        ***********
+        Attributes:
+        -----------
+
+            panda_df:       (Required) => Pandas DataFrame to load.
+            table_name:     (Required) => Name of table in dataset.
+            exist_action:   (Optional) => Action on if table already exist.
+                            Default: append mode. Others modes are replace
+                            or fail (fail if table holds rows).
+        *******
+        Return:
+        -------
+
+            result:         Dictonary of job id and loaded rows.
+        """
+
+        if exist_action not in WRITE_DISPOSITION:
+            msg = f"Unsupported exist action '{exist_action}'"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        try:
+            from google.cloud import bigquery
+            buffer = io.BytesIO()
+            panda_df.to_parquet(buffer,
+                                engine="pyarrow",
+                                index=False,
+                                coerce_timestamps="us",
+                                allow_truncated_timestamps=True)
+            buffer.seek(0)
+
+            job_config = bigquery.LoadJobConfig(
+                source_format=bigquery.SourceFormat.PARQUET,
+                write_disposition=WRITE_DISPOSITION[exist_action])
+            destination = f"{self.project}.{self.dataset}.{table_name}"
+            logger.info(f'Start BigQuery load job for table {destination}')
+
+            job = self.get_client().load_table_from_file(
+                buffer, destination, job_config=job_config)
+            job.result()
+
+            logger.info(
+                f'BigQuery load job {job.job_id} loaded {job.output_rows} rows')
+            return {"job_id": job.job_id, "output_rows": job.output_rows}
+        except Exception as err:
+            logger.exception(f'Failed to load DataFrame in BigQuery: {err}')
+            traceback.print_tb(err.__traceback__)
+
+            # Propagate the exception
+            raise
+
+    def _read_stream(self, stream_name: str):
+        """
+        Method to read single stream of read session as Arrow table.
+        """
+
+        reader = self.get_read_client().read_rows(stream_name)
+        return reader.to_arrow()
+
+    def read_df(self, sql: str, chunk_size: int = None, timeout: float = None):
+        """
+        Method to run the query and read the result table using Storage Read
+        API with multiple Arrow streams read in parallel. Ordered query is
+        read from single stream to keep its order.
+
+        ***********
+        Attributes:
+        -----------
+
+            sql:            (Required) => DML select query.
+            chunk_size:     (Optional) => If specified, return an iterator
+                            of DataFrames of chunk_size rows.
+                            Default: None to return single DataFrame.
+            timeout:        (Optional) => Seconds allowed for the query job.
+                            Default: None for no timeout.
+        *******
+        Return:
+        -------
+
+            panda_df:       Pandas DataFrame or iterator of DataFrames.
+        """
+
+        try:
+            import pyarrow
+
+            options = {}
+            if timeout:
+                from google.cloud import bigquery
+                options["job_config"] = bigquery.QueryJobConfig(
+                    job_timeout_ms=max(int(timeout * 1000), 1))
+
+            logger.info(f'Run BigQuery query job: {sql}')
+            job = self.get_client().query(sql, **options)
+            rows = job.result(timeout=timeout)
+            table = job.destination
+
+            max_streams = 1 if ORDER_BY_PATTERN.search(sql) else self.max_streams
+            request = {
+                "parent": f"projects/{self.project}",
+                "read_session": {
+                    "table": f"projects/{table.project}/datasets/"
+                             f"{table.dataset_id}/tables/{table.table_id}",
+                    "data_format": "ARROW"},
+                "max_stream_count": max_streams}
+            session = self.get_read_client().create_read_session(
+                request=request)
+            streams = [stream.name for stream in session.streams]
+            logger.info(f'Reading query result with {len(streams)} streams')
+
+            if not streams:
+                panda_df = rows.to_dataframe()
+                if chunk_size:
+                    return iter([panda_df])
+                return panda_df
+
+            if chunk_size:
+                return self._iter_chunks(session=session,
+                                         streams=streams,
+                                         chunk_size=chunk_size)
+
+            with ThreadPoolExecutor(max_workers=len(streams)) as executor:
+                tables = list(executor.map(self._read_stream, streams))
+            return pyarrow.concat_tables(tables).to_pandas()
+        except Exception as err:
+            logger.exception(f'Failed to read query result from BigQuery: {err}')
+            traceback.print_tb(err.__traceback__)
+
+            # Propagate the exception
+            raise
+
+    def _read_batches(self, session, stream_name: str, batches: queue.Queue,
+                      stop: threading.Event):
+        """
+        Method to put record batches of single stream in queue, followed by
+        None once stream is read or by the error. Reading stops when stop is
+        set, as chunks are no longer consumed.
+        """
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    batches.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        try:
+            reader = self.get_read_client().read_rows(stream_name)
+            for page in reader.rows(session).pages:
+                if not put(page.to_arrow()):
+                    return
+            put(None)
+        except Exception as err:
+            put(err)
+
+    def _iter_chunks(self, session, streams: list, chunk_size: int):
+        """
+        Method to yield DataFrames of chunk_size rows while streams are read
+        in parallel. Streams are read batch by batch into a bounded queue,
+        so memory is bounded by chunk and buffered batches rather than the
+        result.
+        """
+
+        import pyarrow
+
+        batches = queue.Queue(maxsize=BUFFERED_BATCHES * len(streams))
+        stop = threading.Event()
+        with ThreadPoolExecutor(max_workers=len(streams)) as executor:
+            try:
+                for stream_name in streams:
+                    executor.submit(self._read_batches, session,
+                                    stream_name, batches, stop)
+
+                pending = []
+                rows = 0
+                remaining = len(streams)
+                while remaining:
+                    batch = batches.get()
+                    if batch is None:
+                        remaining -= 1
+                        continue
+                    if isinstance(batch, Exception):
+                        raise batch
+                    pending.append(batch)
+                    rows += batch.num_rows
+                    while rows >= chunk_size:
+                        table = pyarrow.Table.from_batches(pending)
+                        yield table.slice(0, chunk_size).to_pandas()
+                        pending = table.slice(chunk_size).to_batches()
+                        rows -= chunk_size
+                if rows:
+                    yield pyarrow.Table.from_batches(pending).to_pandas()
+            finally:
+                stop.set()
@@ -0,0 +1,295 @@
+#!/usr/bin/env python
+
+"""
+File holds the module to coalesce identical in-flight queries, so callers
+issuing the same query at the same moment wait for and share one execution
+instead of running it each.
+"""
+
+import re
+import asyncio
+import logging
+import threading
+import contextvars
+from concurrent.futures import Future
+from pandas import DataFrame
+from .tenant import current_schema
+from .retry import LITERAL_PATTERN
+
+logger = logging.getLogger(__name__)
+
+# Key of query executed by current context, so the leader running the
+# query through the same coalesced path does not wait on itself.
+LEADING_KEY = contextvars.ContextVar("db_factory_leading_key", default=None)
+# Row locking clauses. Locks are held by session of leader only, so
+# locking reads must run per caller.
+LOCKING_PATTERN = re.compile(
+    r"\bfor\s+(no\s+key\s+)?update\b|\bfor\s+(key\s+)?share\b|"
+    r"\block\s+in\s+share\s+mode\b")
+# Functions returning new value per call, like sequences, random values,
+# clock and locks, so query using them must run per caller.
+VOLATILE_FUNCTIONS = ["nextval", "setval", "random", "rand", "uuid",
+                      "gen_random_uuid", "uuid_generate_v1",
+                      "uuid_generate_v4", "newid", "clock_timestamp",
+                      "timeofday", "sys_guid", "txid_current",
+                      "pg_advisory_lock", "pg_try_advisory_lock", "get_lock",
+                      "sleep", "pg_sleep", "last_insert_id"]
+
+
+class QueryCoalescer(object):
+    """
+    Class handle the single-flight execution of queries. First caller of a
+    key run the query, concurrent callers of same key wait for its result.
+    Result is shared copy on read: once other callers joined, each caller
+    get its own copy of DataFrame, list or column arrays. Nothing is kept
+    once the query completes. Locking reads and queries calling volatile
+    functions are not shareable and run per caller.
+
+    ********
+    Methods:
+    --------
+
+        __init__:       Initaization functions, holds in-flight queries.
+        is_shareable:   Method to check if result of query can be shared.
+        get_key:        Method to return the key of query.
+        copy:           Method to return copy of result for a caller.
+        run:            Method to run or join the query of key.
+        run_async:      Coroutine to run or join the query of key without
+                        blocking event loop.
+        get_metrics:    Method to return the coalescing counters.
+    """
+
+    def __init__(self, volatile_functions: list = None):
+        """
+        Initialization function to initlaize the query coalescer
+
+        ***********
+        Attributes:
+        -----------
+
+            volatile_functions: (Optional) => Extra names of functions
+                                returning new value per call, like user
+                                defined functions with side effects.
+                                Default: None to use VOLATILE_FUNCTIONS only.
+        """
+
+        names = VOLATILE_FUNCTIONS + [name.lower() for name in
+                                      volatile_functions or []]
+        self.volatile_pattern = re.compile(
+            r"\b(" + "|".join(re.escape(name) for name in names) + r")\s*\(")
+        self.__lock = threading.Lock()
+        self.__in_flight = {}
+        self.__metrics = {"executed": 0, "coalesced": 0}
+
+    @staticmethod
+    def _normalize(value):
+        """
+        Method to return order independent representation of argument.
+        """
+
+        if isinstance(value, dict):
+            return repr(sorted((str(key), QueryCoalescer._normalize(item))
+                               for key, item in value.items()))
+        return repr(value)
+
+    def is_shareable(self, sql: str):
+        """
+        Method to check if result of query can be shared with concurrent
+        callers. Query taking row locks or calling volatile function is
+        not, as each caller expect its own locks or values.
+
+        ***********
+        Attributes:
+        -----------
+
+            sql:    (Required) => Plain read only SQL statement.
+        *******
+        Return:
+        -------
+
+            is_shareable:   True if result can be shared.
+        """
+
+        statement = " ".join(LITERAL_PATTERN.sub(" ", str(sql)).lower().split())
+        return LOCKING_PATTERN.search(statement) is None and \
+            self.volatile_pattern.search(statement) is None
+
+    @staticmethod
+    def get_key(identity: str, method: str, arguments: dict):
+        """
+        Method to return the key of query from connection identity, schema
+        of context, method and its arguments.
+
+        ***********
+        Attributes:
+        -----------
+
+            identity:   (Required) => Identity of connection like URL.
+            method:     (Required) => Name of manager method.
+            arguments:  (Required) => Dictonary of arguments of method like
+                        sql and params.
+        *******
+        Return:
+        -------
+
+            key:        Key of query.
+        """
+
+        return (identity, current_schema(), method,
+                QueryCoalescer._normalize(arguments))
+
+    @staticmethod
+    def copy(result):
+        """
+        Method to return copy of result, so callers sharing one execution
+        can modify their result independently.
+
+        ***********
+        Attributes:
+        -----------
+
+            result:     (Required) => Result of query.
+        *******
+        Return:
+        -------
+
+            result:     Copy of DataFrame, list or dictonary of columns.
+                        Immutable results are returned as is.
+        """
+
+        if isinstance(result, DataFrame):
+            return result.copy()
+        if isinstance(result, list):
+            return list(result)
+        if isinstance(result, dict):
+            return {name: values.copy() if hasattr(values, "copy") else values
+                    for name, values in result.items()}
+        return result
+
+    def _join(self, key):
+        """
+        Method to return the in-flight entry of key and if caller lead it.
+        """
+
+        with self.__lock:
+            entry = self.__in_flight.get(key)
+            if entry is not None:
+                entry["followers"] += 1
+                self.__metrics["coalesced"] += 1
+                return entry, False
+            entry = {"future": Future(), "followers": 0}
+            self.__in_flight[key] = entry
+            self.__metrics["executed"] += 1
+            return entry, True
+
+    def _lead(self, key, entry: dict, func):
+        """
+        Method to run the query of key and publish its result to callers
+        waiting on it. Any failure, including interrupt of leader, is
+        published to callers and key is released for next execution.
+        """
+
+        token = LEADING_KEY.set(key)
+        try:
+            result = func()
+        except BaseException as err:
+            with self.__lock:
+                self.__in_flight.pop(key, None)
+            entry["future"].set_exception(err)
+            if not isinstance(err, Exception):
+                # Interrupt and exit are propagated in leader thread too.
+                raise
+            return
+        finally:
+            LEADING_KEY.reset(token)
+
+        with self.__lock:
+            # No caller can join once key is removed, so followers counted
+            # here are final.
+            self.__in_flight.pop(key, None)
+            followers = entry["followers"]
+        entry["future"].set_result(result)
+        if followers:
+            logger.info(f'Shared query result with {followers} coalesced callers')
+
+    def _result(self, entry: dict, result, is_leader: bool):
+        """
+        Method to return result of caller. Leader keep the original result
+        only if nobody joined.
+        """
+
+        if is_leader and not entry["followers"]:
+            return result
+        return self.copy(result)
+
+    def run(self, key, func):
+        """
+        Method to run the query of key, or wait for the execution already
+        in flight and share its result.
+
+        ***********
+        Attributes:
+        -----------
+
+            key:        (Required) => Key of query from get_key.
+            func:       (Required) => Callable executing the query.
+        *******
+        Return:
+        -------
+
+            result:     Result of query.
+        """
+
+        if LEADING_KEY.get() == key:
+            return func()
+
+        entry, is_leader = self._join(key)
+        if is_leader:
+            self._lead(key, entry, func)
+        result = entry["future"].result()
+        return self._result(entry, result, is_leader)
+
+    async def run_async(self, key, func):
+        """
+        Coroutine to run the query of key on executor thread, or await the
+        execution already in flight without holding a thread.
+
+        ***********
+        Attributes:
+        -----------
+
+            key:        (Required) => Key of query from get_key.
+            func:       (Required) => Callable executing the query.
+        *******
+        Return:
+        -------
+
+            result:     Result of query.
+        """
+
+        entry, is_leader = self._join(key)
+        if is_leader:
+            # Context is copied so schema selected by the task apply on
+            # executor thread.
+            context = contextvars.copy_context()
+            asyncio.get_running_loop().run_in_executor(
+                None, context.run, self._lead, key, entry, func)
+        result = await asyncio.wrap_future(entry["future"])
+        return self._result(entry, result, is_leader)
+
+    def get_metrics(self):
+        """
+        Method to return the coalescing counters.
+
+        *******
+        Return:
+        -------
+
+            metrics:    Dictonary of executed, coalesced and in_flight
+                        counters.
+        """
+
+        with self.__lock:
+            metrics = dict(self.__metrics)
+            metrics["in_flight"] = len(self.__in_flight)
+        return metrics
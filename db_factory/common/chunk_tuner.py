@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+
+"""
+File holds the module to size chunks of DataFrame loads and reads from row
+width and memory ceiling, and tune it by measured throughput while rows are
+transferred.
+"""
+
+import logging
+from pandas import DataFrame
+
+logger = logging.getLogger(__name__)
+
+# Value of chunk_size enabling the tuning.
+AUTO = "auto"
+# Default memory ceiling of single chunk in bytes.
+MEMORY_LIMIT = 64 * 1024 * 1024
+# Ratio of memory used by rows converted by serializer or driver to memory
+# of DataFrame rows.
+EXPANSION = 3
+# Lowest rows per chunk.
+MIN_ROWS = 1000
+# Rows sampled to estimate row width of DataFrame.
+SAMPLE_ROWS = 10000
+# Relative drop of throughput considered as worse rather than noise.
+TOLERANCE = 0.1
+# Lowest ratio of size change once tuning reversed direction.
+MIN_FACTOR = 1.25
+
+
+class ChunkTuner(object):
+    """
+    Class handle the chunk size of single load or read. Size start from an
+    eighth of the rows fitting memory ceiling, then hill climb on rows per
+    second: it keep moving up or down while throughput improve, reverse
+    with smaller step when it drop, hold when it stay within noise and
+    never exceed the memory ceiling.
+
+    ********
+    Methods:
+    --------
+
+        __init__:           Initaization functions, holds size limits.
+        estimate_row_bytes: Method to return average memory of DataFrame
+                            row.
+        record:             Method to record throughput of chunk and return
+                            size of next chunk.
+    """
+
+    def __init__(self, row_bytes: float, memory_limit: int = None):
+        """
+        Initialization function to initlaize the chunk tuner
+
+        ***********
+        Attributes:
+        -----------
+
+            row_bytes:      (Required) => Average memory of row in bytes.
+            memory_limit:   (Optional) => Memory ceiling of chunk in bytes.
+                            Default: None to use 64 MB.
+        """
+
+        self.memory_limit = memory_limit or MEMORY_LIMIT
+        self.max_rows = max(1, int(self.memory_limit //
+                                   max(row_bytes * EXPANSION, 1)))
+        self.min_rows = min(MIN_ROWS, self.max_rows)
+        self.size = max(self.min_rows, self.max_rows // 8)
+        self.__factor = 2.0
+        self.__direction = 1
+        self.__throughput = None
+        logger.info(f'Auto chunk size start at {self.size} rows, ceiling {self.max_rows} rows of {row_bytes:.0f} bytes')
+
+    @staticmethod
+    def estimate_row_bytes(panda_df: DataFrame):
+        """
+        Method to return average memory of DataFrame row, measured on
+        evenly spaced sample of rows.
+
+        ***********
+        Attributes:
+        -----------
+
+            panda_df:   (Required) => Pandas DataFrame.
+        *******
+        Return:
+        -------
+
+            row_bytes:  Average bytes per row.
+        """
+
+        if not len(panda_df):
+            return 1.0
+        step = max(1, len(panda_df) // SAMPLE_ROWS)
+        sample = panda_df.iloc[::step]
+        return float(sample.memory_usage(deep=True, index=False).sum()) / len(sample)
+
+    def record(self, rows: int, elapsed: float):
+        """
+        Method to record throughput of chunk and return size of next chunk.
+        Partial chunk at the end of rows is ignored.
+
+        ***********
+        Attributes:
+        -----------
+
+            rows:       (Required) => Rows of chunk.
+            elapsed:    (Required) => Seconds chunk took.
+        *******
+        Return:
+        -------
+
+            size:       Rows of next chunk.
+        """
+
+        if rows < self.size:
+            return self.size
+
+        throughput = rows / max(elapsed, 1e-6)
+        previous, self.__throughput = self.__throughput, throughput
+        if previous is not None:
+            if throughput < previous * (1 - TOLERANCE):
+                self.__direction = -self.__direction
+                self.__factor = max(MIN_FACTOR, self.__factor ** 0.5)
+            elif throughput <= previous * (1 + TOLERANCE):
+                # Size does not matter within noise, so it is kept.
+                return self.size
+
+        if self.__direction > 0:
+            size = self.size * self.__factor
+        else:
+            size = self.size / self.__factor
+        self.size = int(min(max(size, self.min_rows), self.max_rows))
+        logger.debug(f'Chunk of {rows} rows at {throughput:.0f} rows/sec, next chunk {self.size} rows')
+        return self.size
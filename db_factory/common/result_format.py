@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+
+"""
+File holds the methods to fetch SQLAlchemy result in compact formats,
+exposed as static under ResultFormat class.
+"""
+
+import logging
+import numpy
+
+logger = logging.getLogger(__name__)
+
+# Supported formats of execute_sql result.
+RESULT_FORMATS = ["rows", "tuples", "columns", "iterator", "scalar", "first"]
+# Rows fetched per fetchmany call.
+FETCH_SIZE = 10000
+# NumPy dtype of cursor description type code per DBAPI driver.
+DESCRIPTION_DTYPE = {
+    "pg8000": {16: "bool", 20: "int64", 21: "int16", 23: "int32",
+               26: "int64", 700: "float32", 701: "float64",
+               1114: "datetime64[us]", 1184: "datetime64[us]",
+               1082: "datetime64[D]"},
+    "psycopg2": {16: "bool", 20: "int64", 21: "int16", 23: "int32",
+                 26: "int64", 700: "float32", 701: "float64",
+                 1114: "datetime64[us]", 1184: "datetime64[us]",
+                 1082: "datetime64[D]"},
+    "pymysql": {1: "int8", 2: "int16", 3: "int32", 4: "float32",
+                5: "float64", 8: "int64", 9: "int32", 7: "datetime64[us]",
+                12: "datetime64[us]", 10: "datetime64[D]"},
+}
+# Flag of pymysql field holding UNSIGNED integer column.
+PYMYSQL_UNSIGNED_FLAG = 32
+# Unsigned NumPy dtype of signed integer dtype.
+UNSIGNED_DTYPE = {"int8": "uint8", "int16": "uint16", "int32": "uint32",
+                  "int64": "uint64"}
+
+
+class ResultFormat(object):
+    """
+    Class handle the fetch of SQLAlchemy result as list of tuples, columnar
+    NumPy arrays, scalar or first row instead of list of Row objects.
+
+    ********
+    Methods:
+    --------
+
+        fetch:          Method to fetch result in requested format.
+        get_cursor:     Method to return the DBAPI cursor of result.
+        iterate:        Method to yield rows as tuples by fetchmany batches.
+        to_columns:     Method to fetch result as dictonary of column to
+                        NumPy array.
+    """
+
+    @staticmethod
+    def fetch(result, result_format: str, fetch_size: int = None):
+        """
+        Method to fetch the result in requested format.
+
+        ***********
+        Attributes:
+        -----------
+
+            result:         (Required) => SQLAlchemy result returning rows.
+            result_format:  (Required) => One of rows, tuples, columns,
+                            scalar or first.
+            fetch_size:     (Optional) => Rows per fetchmany call.
+                            Default: None to use FETCH_SIZE.
+        *******
+        Return:
+        -------
+
+            rows:           Result in requested format.
+        """
+
+        if result_format == "rows":
+            return result.fetchall()
+        if result_format == "tuples":
+            cursor = ResultFormat.get_cursor(result)
+            return [tuple(row) for row in cursor.fetchall()]
+        if result_format == "columns":
+            return ResultFormat.to_columns(result, fetch_size)
+        if result_format == "scalar":
+            return result.scalar()
+        if result_format == "first":
+            row = result.first()
+            return None if row is None else tuple(row)
+
+        msg = f"Unsupported result format '{result_format}'. Supported are '{RESULT_FORMATS}'"
+        logger.error(msg)
+        raise ValueError(msg)
+
+    @staticmethod
+    def get_cursor(result):
+        """
+        Method to return the DBAPI cursor of result, so rows of plain SQL
+        are fetched as driver tuples without building SQLAlchemy Row.
+
+        ***********
+        Attributes:
+        -----------
+
+            result:         (Required) => SQLAlchemy result returning rows.
+        *******
+        Return:
+        -------
+
+            cursor:         DBAPI cursor, or result if it has none.
+        """
+
+        cursor = getattr(result, "cursor", None)
+        return result if cursor is None else cursor
+
+    @staticmethod
+    def iterate(result, fetch_size: int = None):
+        """
+        Method to yield the rows as plain tuples, fetching fetch_size rows
+        at a time.
+
+        ***********
+        Attributes:
+        -----------
+
+            result:         (Required) => SQLAlchemy result returning rows.
+            fetch_size:     (Optional) => Rows per fetchmany call.
+                            Default: None to use FETCH_SIZE.
+        """
+
+        cursor = ResultFormat.get_cursor(result)
+        while True:
+            rows = cursor.fetchmany(fetch_size or FETCH_SIZE)
+            if not rows:
+                break
+            for row in rows:
+                yield tuple(row)
+
+    @staticmethod
+    def _to_array(values: tuple, dtype: str):
+        """
+        Method to convert values of column to NumPy array of dtype. Column
+        with NULL or unknown type is kept as object array, and integers out
+        of range of dtype keep the inferred dtype instead of wrapping.
+        """
+
+        if dtype and numpy.dtype(dtype).kind in "iu":
+            array = numpy.array(values)
+            if array.dtype.kind not in "iu":
+                return numpy.array(values, dtype=object)
+            info = numpy.iinfo(dtype)
+            if len(array) and (array.min() < info.min or array.max() > info.max):
+                return array
+            return array.astype(dtype)
+
+        if dtype:
+            try:
+                return numpy.array(values, dtype=dtype)
+            except (TypeError, ValueError, OverflowError):
+                return numpy.array(values, dtype=object)
+
+        array = numpy.array(values)
+        if array.dtype.kind not in "biufcmM":
+            return numpy.array(values, dtype=object)
+        return array
+
+    @staticmethod
+    def _unsigned(cursor, dtypes: list):
+        """
+        Method to return the dtypes with unsigned integer dtype for columns
+        of pymysql cursor flagged UNSIGNED, as its description has no flag.
+        """
+
+        fields = getattr(getattr(cursor, "_result", None), "fields", None)
+        if not fields or len(fields) != len(dtypes):
+            return dtypes
+        return [UNSIGNED_DTYPE.get(dtype, dtype)
+                if getattr(field, "flags", 0) & PYMYSQL_UNSIGNED_FLAG else dtype
+                for field, dtype in zip(fields, dtypes)]
+
+    @staticmethod
+    def to_columns(result, fetch_size: int = None):
+        """
+        Method to fetch the result by fetchmany batches into dictonary of
+        column to NumPy array, typed from cursor description when driver
+        type is known.
+
+        ***********
+        Attributes:
+        -----------
+
+            result:         (Required) => SQLAlchemy result returning rows.
+            fetch_size:     (Optional) => Rows per fetchmany call.
+                            Default: None to use FETCH_SIZE.
+        *******
+        Return:
+        -------
+
+            columns:        Dictonary of column name to NumPy array.
+        """
+
+        names = list(result.keys())
+        dtypes = [None] * len(names)
+        cursor = getattr(result, "cursor", None)
+        if cursor is not None and cursor.description:
+            driver = result.context.dialect.driver \
+                if getattr(result, "context", None) is not None else None
+            type_map = DESCRIPTION_DTYPE.get(driver, {})
+            dtypes = [type_map.get(item[1]) for item in cursor.description]
+            if driver == "pymysql":
+                dtypes = ResultFormat._unsigned(cursor, dtypes)
+
+        batches = [[] for _ in names]
+        cursor = ResultFormat.get_cursor(result)
+        while True:
+            rows = cursor.fetchmany(fetch_size or FETCH_SIZE)
+            if not rows:
+                break
+            for index, values in enumerate(zip(*rows)):
+                batches[index].append(
+                    ResultFormat._to_array(values, dtypes[index]))
+
+        columns = {}
+        for name, arrays, dtype in zip(names, batches, dtypes):
+            if not arrays:
+                columns[name] = numpy.array([], dtype=dtype or object)
+            elif len(arrays) == 1:
+                columns[name] = arrays[0]
+            else:
+                columns[name] = numpy.concatenate(arrays)
+        return columns
@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+
+"""
+File holds the methods to serialize Pandas DataFrame into driver ready
+buffers, exposed as static under Serializer class.
+Conversion is done column wise with NumPy so no Python code runs per cell.
+"""
+
+import io
+import logging
+from decimal import Decimal
+import numpy
+import pandas
+from pandas import DataFrame
+from pandas.api import types as pdtypes
+
+logger = logging.getLogger(__name__)
+
+# Marker used for NULL in CSV buffers generated for COPY.
+CSV_NULL = "\\N"
+# Placeholder of string value equal to NULL marker, replaced by the quoted
+# marker which COPY read as string. NUL character can not be in text value.
+CSV_NULL_LITERAL = "\x00db_factory_null_literal\x00"
+# Placeholder of single positional parameter per DBAPI paramstyle.
+PARAM_PLACEHOLDER = {"qmark": "?",
+                     "format": "%s",
+                     "pyformat": "%s"}
+# Inferred types of object column holding only driver native values.
+NATIVE_INFERRED_TYPES = ["string", "bytes", "empty", "boolean", "floating"]
+
+
+class Serializer(object):
+    """
+    Class handle the vectorized serialization of Pandas DataFrame to driver
+    ready buffers.
+
+    ********
+    Methods:
+    --------
+
+        to_columns:         Method to convert every column of DataFrame to
+                            NumPy object array of driver native values.
+        to_parameters:      Method to convert DataFrame to packed list of
+                            tuples for DBAPI executemany.
+        to_csv_bytes:       Method to convert DataFrame to CSV bytes for
+                            COPY FROM STDIN.
+        get_placeholders:   Method to return the positional parameter
+                            markers for DBAPI paramstyle.
+    """
+
+    @staticmethod
+    def _to_native(values: numpy.ndarray, native_decimal: bool):
+        """
+        Method to convert values of object column to Python scalars every
+        driver bind. Decimal is sent as float to database without native
+        decimal, as SQLAlchemy Numeric type does.
+        """
+
+        def convert(value):
+            if isinstance(value, Decimal):
+                return value if native_decimal else float(value)
+            if isinstance(value, pandas.Timestamp):
+                return value.to_pydatetime()
+            if isinstance(value, numpy.generic):
+                return value.item()
+            return value
+
+        return numpy.frompyfunc(convert, 1, 1)(values).astype(object)
+
+    @staticmethod
+    def to_columns(panda_df: DataFrame, dialect=None):
+        """
+        Method to convert every column of DataFrame to NumPy object array.
+        Null values (NaN, NaT, None, pd.NA) are replaced by None using a
+        null mask per column and datetimes are converted to Python datetime
+        objects understood by every DBAPI driver. Object columns holding
+        Decimal, NumPy or Pandas scalars are converted to Python scalars.
+
+        ***********
+        Attributes:
+        -----------
+
+            panda_df:   (Required) => Pandas DataFrame to convert.
+            dialect:    (Optional) => SQLAlchemy dialect of database, to
+                        send Decimal as float when it has no native decimal.
+                        Default: None to keep Decimal.
+        *******
+        Return:
+        -------
+
+            columns:    List of NumPy object arrays, one per column.
+        """
+
+        native_decimal = getattr(dialect, "supports_native_decimal", True)
+        columns = []
+        for column in panda_df.columns:
+            series = panda_df[column]
+            mask = series.isna().to_numpy()
+
+            if pdtypes.is_datetime64_any_dtype(series):
+                values = numpy.asarray(series.dt.to_pydatetime(),
+                                       dtype=object)
+            else:
+                # Casting to object produce Python scalars in C
+                values = series.to_numpy(dtype=object)
+                if pdtypes.is_object_dtype(series) and pdtypes.infer_dtype(
+                        series, skipna=True) not in NATIVE_INFERRED_TYPES:
+                    values = Serializer._to_native(values, native_decimal)
+
+            if mask.any():
+                values = values.copy()
+                values[mask] = None
+            columns.append(values)
+        return columns
+
+    @staticmethod
+    def to_parameters(panda_df: DataFrame, dialect=None):
+        """
+        Method to convert DataFrame to packed list of tuples which can be
+        passed as is to DBAPI cursor executemany.
+
+        ***********
+        Attributes:
+        -----------
+
+            panda_df:   (Required) => Pandas DataFrame to convert.
+            dialect:    (Optional) => SQLAlchemy dialect of database.
+                        Default: None
+        *******
+        Return:
+        -------
+
+            parameters: List of tuples, one per row of DataFrame.
+        """
+
+        columns = Serializer.to_columns(panda_df, dialect=dialect)
+        return list(zip(*columns))
+
+    @staticmethod
+    def to_csv_bytes(panda_df: DataFrame, encoding: str = "utf-8"):
+        """
+        Method to convert DataFrame to CSV bytes for COPY FROM STDIN. NULL
+        values are written as CSV_NULL marker and datetimes as ISO 8601.
+        String equal to CSV_NULL marker is quoted so it is not read as NULL.
+
+        ***********
+        Attributes:
+        -----------
+
+            panda_df:   (Required) => Pandas DataFrame to convert.
+            encoding:   (Optional) => Encoding of CSV bytes.
+                        Default: utf-8
+        *******
+        Return:
+        -------
+
+            buffer:     CSV bytes without header.
+        """
+
+        literals = {}
+        for column in panda_df.columns:
+            series = panda_df[column]
+            if pdtypes.is_object_dtype(series) or pdtypes.is_string_dtype(series):
+                mask = (series == CSV_NULL).fillna(False).to_numpy(dtype=bool)
+                if mask.any():
+                    literals[column] = mask
+        if literals:
+            panda_df = panda_df.copy()
+            for column, mask in literals.items():
+                panda_df.loc[mask, column] = CSV_NULL_LITERAL
+
+        buffer = io.StringIO()
+        panda_df.to_csv(buffer,
+                        index=False,
+                        header=False,
+                        na_rep=CSV_NULL,
+                        date_format="%Y-%m-%d %H:%M:%S.%f%z")
+        text = buffer.getvalue()
+        if literals:
+            text = text.replace(CSV_NULL_LITERAL, f'"{CSV_NULL}"')
+        return text.encode(encoding)
+
+    @staticmethod
+    def get_placeholders(paramstyle: str, count: int):
+        """
+        Method to return the comma separated positional parameter markers.
+
+        ***********
+        Attributes:
+        -----------
+
+            paramstyle: (Required) => DBAPI paramstyle of driver.
+            count:      (Required) => Number of parameters.
+        *******
+        Return:
+        -------
+
+            placeholders:   Comma separated parameter markers.
+        """
+
+        if paramstyle == "numeric":
+            return ", ".join(f":{index}" for index in range(1, count + 1))
+
+        if paramstyle not in PARAM_PLACEHOLDER:
+            msg = f"Unsupported DBAPI paramstyle '{paramstyle}'"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        return ", ".join([PARAM_PLACEHOLDER[paramstyle]] * count)
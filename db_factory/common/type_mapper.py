@@ -0,0 +1,520 @@
+#!/usr/bin/env python
+
+"""
+File holds the methods to map Pandas DataFrame dtypes to compact SQLAlchemy
+column types, exposed as static under TypeMapper class.
+"""
+
+import logging
+import numpy
+import pandas
+from pandas import DataFrame
+from pandas.api import types as pdtypes
+from pandas.api.types import union_categoricals
+from sqlalchemy import types as satypes
+
+logger = logging.getLogger(__name__)
+
+# Dialects which keep ENUM inline with the table definition.
+NATIVE_ENUM_DIALECT = ["mysql", "mariadb"]
+# Dialects where sized VARCHAR does not reduce storage or help the planner.
+UNSIZED_STRING_DIALECT = ["snowflake", "bigquery"]
+# Maximum number of distinct values to treat a column as low-cardinality.
+LOW_CARDINALITY_LIMIT = 255
+# Maximum ratio of distinct to total values to store strings as category.
+CATEGORY_RATIO = 0.5
+
+
+class TypeMapper(object):
+    """
+    Class handle the mapping of Pandas DataFrame dtypes to SQLAlchemy column
+    types. Types are derived column wise using vectorized operations on the
+    DataFrame rather than inspecting values row by row.
+
+    ********
+    Methods:
+    --------
+
+        infer_sql_types:    Method to derive the tightest SQLAlchemy type
+                            for every column of DataFrame.
+        get_column_type:    Method to derive the SQLAlchemy type of single
+                            column of DataFrame.
+        infer_object_types: Method to derive SQLAlchemy types of object
+                            columns from their values.
+        optimize_df:        Method to apply dtype map and downcast columns
+                            of DataFrame to reduce memory.
+        optimize_chunks:    Method to optimize DataFrame chunks keeping
+                            same dtypes across chunks.
+        concat_df:          Method to concatenate optimized DataFrame chunks
+                            keeping category columns.
+    """
+
+    @staticmethod
+    def infer_sql_types(panda_df: DataFrame,
+                        dialect: str = None,
+                        dtype: dict = None):
+        """
+        Method to derive the tightest SQLAlchemy type for every column of
+        DataFrame using dtypes and observed value ranges.
+
+        ***********
+        Attributes:
+        -----------
+
+            panda_df:   (Required) => Pandas DataFrame to derive types.
+            dialect:    (Optional) => SQLAlchemy dialect name of database.
+                        Used to decide on ENUM and VARCHAR support.
+                        Default: None for generic types.
+            dtype:      (Optional) => Explicit mapping of column name to
+                        SQLAlchemy type. Explicit types take priority over
+                        derived types.
+                        Default: None
+        *******
+        Return:
+        -------
+
+            sql_types:  Dictonary of column name to SQLAlchemy type.
+        """
+
+        sql_types = {}
+        dtype = dtype or {}
+        for column in panda_df.columns:
+            if column in dtype:
+                sql_types[column] = dtype[column]
+                continue
+
+            sql_type = TypeMapper.get_column_type(panda_df[column],
+                                                  dialect=dialect)
+            if sql_type is not None:
+                sql_types[column] = sql_type
+
+        logger.info(f'Derived SQL types for {len(sql_types)} columns')
+        return sql_types
+
+    @staticmethod
+    def get_column_type(series: pandas.Series, dialect: str = None):
+        """
+        Method to derive the SQLAlchemy type of single column of DataFrame.
+
+        ***********
+        Attributes:
+        -----------
+
+            series:     (Required) => Pandas Series of DataFrame column.
+            dialect:    (Optional) => SQLAlchemy dialect name of database.
+                        Default: None for generic types.
+        *******
+        Return:
+        -------
+
+            sql_type:   SQLAlchemy type or None to let Pandas decide.
+        """
+
+        if pdtypes.is_bool_dtype(series):
+            return satypes.Boolean()
+
+        if isinstance(series.dtype, pandas.CategoricalDtype):
+            return TypeMapper._category_type(series, dialect=dialect)
+
+        if pdtypes.is_datetime64_any_dtype(series):
+            has_tz = getattr(series.dt, "tz", None) is not None
+            return satypes.DateTime(timezone=has_tz)
+
+        if pdtypes.is_integer_dtype(series):
+            return TypeMapper._integer_type(series)
+
+        if pdtypes.is_float_dtype(series):
+            if series.dtype == numpy.float32:
+                return satypes.Float(precision=24)
+            return satypes.Float(precision=53)
+
+        if pdtypes.is_object_dtype(series) or pdtypes.is_string_dtype(series):
+            inferred = pdtypes.infer_dtype(series, skipna=True)
+            if inferred == "decimal":
+                return TypeMapper._decimal_type(series)
+            if inferred == "date":
+                return satypes.Date()
+            if inferred in ["string", "empty"]:
+                return TypeMapper._string_type(series, dialect=dialect)
+            if inferred == "bytes":
+                return satypes.LargeBinary()
+
+        return None
+
+    @staticmethod
+    def infer_object_types(panda_df: DataFrame, dtype: dict = None):
+        """
+        Method to derive SQLAlchemy types of object columns from their
+        values, so table created from empty frame get the types Pandas
+        to_sql derive from rows instead of TEXT.
+
+        ***********
+        Attributes:
+        -----------
+
+            panda_df:   (Required) => Pandas DataFrame to derive types.
+            dtype:      (Optional) => Explicit mapping of column name to
+                        SQLAlchemy type. Explicit types take priority over
+                        derived types.
+                        Default: None
+        *******
+        Return:
+        -------
+
+            sql_types:  Dictonary of column name to SQLAlchemy type.
+        """
+
+        sql_types = {}
+        dtype = dtype or {}
+        for column in panda_df.columns:
+            series = panda_df[column]
+            if column in dtype:
+                sql_types[column] = dtype[column]
+                continue
+            if not pdtypes.is_object_dtype(series):
+                continue
+
+            inferred = pdtypes.infer_dtype(series, skipna=True)
+            if inferred in ["datetime", "datetime64"]:
+                first = series.dropna().iloc[0]
+                has_tz = getattr(first, "tzinfo", None) is not None
+                sql_types[column] = satypes.DateTime(timezone=has_tz)
+            elif inferred == "date":
+                sql_types[column] = satypes.Date()
+            elif inferred == "time":
+                sql_types[column] = satypes.Time()
+            elif inferred == "decimal":
+                sql_types[column] = TypeMapper._decimal_type(series)
+            elif inferred == "bytes":
+                sql_types[column] = satypes.LargeBinary()
+            elif inferred == "boolean":
+                sql_types[column] = satypes.Boolean()
+            elif inferred == "integer":
+                sql_types[column] = satypes.BigInteger()
+            elif inferred in ["floating", "mixed-integer-float"]:
+                sql_types[column] = satypes.Float(precision=53)
+        return sql_types
+
+    @staticmethod
+    def _integer_type(series: pandas.Series):
+        """
+        Method to return the smallest integer type holding the range of
+        the column. Unsigned values beyond BIGINT are kept as NUMERIC.
+        """
+
+        values = series.dropna()
+        if not len(values):
+            return satypes.SmallInteger()
+
+        low, high = int(values.min()), int(values.max())
+        if low >= -2 ** 15 and high < 2 ** 15:
+            return satypes.SmallInteger()
+        if low >= -2 ** 31 and high < 2 ** 31:
+            return satypes.Integer()
+        if low >= -2 ** 63 and high < 2 ** 63:
+            return satypes.BigInteger()
+        return satypes.Numeric(precision=20, scale=0)
+
+    @staticmethod
+    def _string_type(series: pandas.Series, dialect: str = None):
+        """
+        Method to return VARCHAR sized by the longest value of the column.
+        """
+
+        if dialect in UNSIZED_STRING_DIALECT:
+            return satypes.String()
+
+        lengths = series.dropna().astype(str).str.len()
+        max_length = int(lengths.max()) if len(lengths) else 1
+        return satypes.String(length=max(max_length, 1))
+
+    @staticmethod
+    def _category_type(series: pandas.Series, dialect: str = None):
+        """
+        Method to return ENUM for categorical column where dialect support it
+        inline, else VARCHAR sized by the longest category.
+        """
+
+        categories = [str(value) for value in series.cat.categories]
+        if dialect in NATIVE_ENUM_DIALECT and \
+                len(categories) <= LOW_CARDINALITY_LIMIT:
+            return satypes.Enum(*categories, native_enum=True)
+
+        return TypeMapper._string_type(series.astype(object),
+                                       dialect=dialect)
+
+    @staticmethod
+    def _decimal_type(series: pandas.Series):
+        """
+        Method to return NUMERIC with precision and scale large enough for
+        every Decimal value of the column.
+        """
+
+        text = series.dropna().astype(str).str.lstrip("-")
+        parts = text.str.partition(".")
+        scale = int(parts[2].str.len().max()) if len(parts) else 0
+        integral = int(parts[0].str.len().max()) if len(parts) else 1
+        return satypes.Numeric(precision=integral + scale, scale=scale)
+
+    @staticmethod
+    def optimize_df(panda_df: DataFrame,
+                    dtype: dict = None,
+                    downcast: bool = False):
+        """
+        Method to apply dtype map and downcast columns of DataFrame to reduce
+        memory. Downcast narrows numeric columns, converts integral float
+        columns holding NULLs to nullable integer dtypes and low-cardinality
+        string columns to category.
+
+        ***********
+        Attributes:
+        -----------
+
+            panda_df:   (Required) => Pandas DataFrame to optimize.
+            dtype:      (Optional) => Mapping of column name to Pandas dtype.
+                        Columns in mapping are not downcasted.
+                        Default: None
+            downcast:   (Optional) => Downcast columns missing in dtype.
+                        Default: False
+        *******
+        Return:
+        -------
+
+            panda_df:   Optimized Pandas DataFrame.
+        """
+
+        dtype = {column: value for column, value in (dtype or {}).items()
+                 if column in panda_df.columns}
+        if dtype:
+            panda_df = panda_df.astype(dtype)
+
+        if downcast:
+            for column in panda_df.columns:
+                if column in dtype:
+                    continue
+                panda_df[column] = TypeMapper._downcast_series(
+                    panda_df[column])
+        return panda_df
+
+    @staticmethod
+    def optimize_chunks(chunks, dtype: dict = None, downcast: bool = False):
+        """
+        Method to optimize DataFrame chunks as they are fetched. Dtypes of
+        first chunk are applied on next chunks, and widened when values of a
+        chunk do not fit them, so chunks share dtypes as long as possible.
+
+        ***********
+        Attributes:
+        -----------
+
+            chunks:     (Required) => Iterator of Pandas DataFrame chunks.
+            dtype:      (Optional) => Mapping of column name to Pandas dtype.
+                        Default: None
+            downcast:   (Optional) => Downcast columns missing in dtype.
+                        Default: False
+        *******
+        Return:
+        -------
+
+            chunks:     Iterator of optimized Pandas DataFrame chunks.
+        """
+
+        target = None
+        for chunk in chunks:
+            if target is None or not downcast:
+                chunk = TypeMapper.optimize_df(panda_df=chunk,
+                                               dtype=dtype,
+                                               downcast=downcast)
+                target = dict(chunk.dtypes)
+                yield chunk
+                continue
+
+            for column in chunk.columns:
+                series = chunk[column]
+                expected = target.get(column)
+                if expected is None:
+                    continue
+                if not TypeMapper._fits(series, expected):
+                    expected = TypeMapper._common_dtype(
+                        expected, TypeMapper._downcast_series(series))
+                    logger.info(f'Widened dtype of column {column} to {expected}')
+                    target[column] = expected
+                chunk[column] = TypeMapper._cast(series, expected)
+            yield chunk
+
+    @staticmethod
+    def _fits(series: pandas.Series, dtype):
+        """
+        Method to check if values of column are kept unchanged by dtype.
+        Column of NULL only fits any dtype holding missing values.
+        """
+
+        if series.dtype == dtype:
+            return True
+        if len(series) and series.isna().all():
+            return not (pdtypes.is_integer_dtype(dtype) or
+                        pdtypes.is_bool_dtype(dtype)) or \
+                pdtypes.is_extension_array_dtype(dtype)
+        if isinstance(dtype, pandas.CategoricalDtype):
+            return bool(series.dropna().isin(dtype.categories).all())
+        if pdtypes.is_object_dtype(dtype):
+            return True
+        if pdtypes.is_bool_dtype(dtype) or pdtypes.is_bool_dtype(series):
+            return False
+        if not pdtypes.is_numeric_dtype(series):
+            return False
+
+        values = series.dropna()
+        if pdtypes.is_integer_dtype(dtype):
+            if len(values) < len(series) and \
+                    not pdtypes.is_extension_array_dtype(dtype):
+                return False
+            if not len(values):
+                return True
+            if pdtypes.is_float_dtype(values) and not (values % 1 == 0).all():
+                return False
+            info = numpy.iinfo(numpy.dtype(str(dtype).lower()))
+            return info.min <= values.min() and values.max() <= info.max
+        if pdtypes.is_float_dtype(dtype):
+            if numpy.dtype(dtype) == numpy.float64:
+                return True
+            values = values.astype(numpy.float64)
+            return bool((values.astype(dtype).astype(numpy.float64) == values).all())
+        return False
+
+    @staticmethod
+    def _common_dtype(dtype, series: pandas.Series):
+        """
+        Method to return dtype holding values of dtype and of column. NULL
+        only column widen integer and boolean to their nullable dtype.
+        """
+
+        other = series.dtype
+        if len(series) and series.isna().all():
+            if pdtypes.is_bool_dtype(dtype):
+                return pandas.BooleanDtype()
+            if pdtypes.is_integer_dtype(dtype):
+                name = str(dtype)
+                return "UInt" + name[4:] if name.startswith("uint") else \
+                    name.capitalize()
+        if isinstance(dtype, pandas.CategoricalDtype):
+            categories = list(dtype.categories)
+            known = set(categories)
+            categories.extend(value for value in series.dropna().unique()
+                              if value not in known)
+            return pandas.CategoricalDtype(categories)
+        if pdtypes.is_numeric_dtype(dtype) and pdtypes.is_numeric_dtype(other) \
+                and not pdtypes.is_bool_dtype(dtype) \
+                and not pdtypes.is_bool_dtype(other):
+            nullable = pdtypes.is_extension_array_dtype(dtype) or \
+                pdtypes.is_extension_array_dtype(other)
+            common = numpy.promote_types(numpy.dtype(str(dtype).lower()),
+                                         numpy.dtype(str(other).lower()))
+            if nullable and common.kind in "iu":
+                name = str(common)
+                return "UInt" + name[4:] if common.kind == "u" else \
+                    name.capitalize()
+            return common
+        return numpy.dtype(object)
+
+    @staticmethod
+    def _cast(series: pandas.Series, dtype):
+        """
+        Method to cast column to dtype, keeping NULL as missing value.
+        """
+
+        if series.dtype == dtype:
+            return series
+        if pdtypes.is_object_dtype(dtype):
+            return series.astype(object).where(series.notna(), None)
+        return series.astype(dtype)
+
+    @staticmethod
+    def concat_df(chunks: list):
+        """
+        Method to concatenate optimized DataFrame chunks. Columns are cast
+        to dtype holding values of every chunk and categories of category
+        columns are unified so column stays as category.
+
+        ***********
+        Attributes:
+        -----------
+
+            chunks:     (Required) => List of Pandas DataFrame chunks.
+        *******
+        Return:
+        -------
+
+            panda_df:   Concatenated Pandas DataFrame.
+        """
+
+        if not chunks:
+            return DataFrame()
+
+        if len(chunks) == 1:
+            return chunks[0].reset_index(drop=True)
+
+        for column in chunks[0].columns:
+            having = [chunk for chunk in chunks if column in chunk.columns]
+            dtype = having[0][column].dtype
+            for chunk in having[1:]:
+                if not TypeMapper._fits(chunk[column], dtype):
+                    dtype = TypeMapper._common_dtype(dtype, chunk[column])
+
+            if isinstance(dtype, pandas.CategoricalDtype):
+                series = [chunk[column].astype("category") for chunk in having]
+                categories = union_categoricals(series).categories
+                for chunk, item in zip(having, series):
+                    chunk[column] = item.cat.set_categories(categories)
+            else:
+                for chunk in having:
+                    chunk[column] = TypeMapper._cast(chunk[column], dtype)
+        return pandas.concat(chunks, ignore_index=True)
+
+    @staticmethod
+    def _downcast_series(series: pandas.Series):
+        """
+        Method to return the column using the narrowest dtype holding its
+        values.
+        """
+
+        if pdtypes.is_bool_dtype(series) or \
+                isinstance(series.dtype, pandas.CategoricalDtype):
+            return series
+
+        if pdtypes.is_integer_dtype(series):
+            if pdtypes.is_extension_array_dtype(series):
+                return TypeMapper._nullable_integer(series)
+            return pandas.to_numeric(series, downcast="integer")
+
+        if pdtypes.is_float_dtype(series):
+            values = series.dropna()
+            if len(values) and (values % 1 == 0).all():
+                return TypeMapper._nullable_integer(series)
+            if TypeMapper._fits(series, numpy.dtype(numpy.float32)):
+                # Float32 only when every value round trip unchanged.
+                return series.astype(numpy.float32)
+            return series
+
+        if pdtypes.is_object_dtype(series) and len(series):
+            if pdtypes.infer_dtype(series, skipna=True) == "string" and \
+                    series.nunique() <= len(series) * CATEGORY_RATIO:
+                return series.astype("category")
+        return series
+
+    @staticmethod
+    def _nullable_integer(series: pandas.Series):
+        """
+        Method to return the column as smallest nullable integer dtype.
+        """
+
+        values = series.dropna()
+        if not len(values):
+            return series.astype("Int8")
+
+        low, high = values.min(), values.max()
+        for name in ["Int8", "Int16", "Int32"]:
+            info = numpy.iinfo(name.lower())
+            if low >= info.min and high <= info.max:
+                return series.astype(name)
+        return series.astype("Int64")
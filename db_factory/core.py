@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+
+"""
+File holds the module of Core execution path running statements on pooled
+SQLAlchemy Connection, without building ORM Session per operation.
+"""
+
+import logging
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+
+class CoreSession(object):
+    """
+    Class expose the subset of ORM Session used by Operations on top of
+    single pooled Connection. Connection is checked out on first use and
+    returned to pool on close, with explicit transaction like Session so
+    commit and rollback behave the same.
+
+    ********
+    Methods:
+    --------
+
+        __init__:       Initaization functions, holds SQLAlchemy engine.
+        connection:     Method to return the connection in transaction.
+        execute:        Method to execute statement on connection.
+        commit:         Method to commit the transaction.
+        rollback:       Method to rollback the transaction.
+        invalidate:     Method to discard the connection from pool.
+        close:          Method to rollback and return connection to pool.
+    """
+
+    def __init__(self, engine: Engine):
+        """
+        Initialization function to initlaize the Core session
+
+        ***********
+        Attributes:
+        -----------
+
+            engine:     (Required) => SQLAlchemy engine of database.
+        """
+
+        self.bind = engine
+        self.__connection = None
+        self.__transaction = None
+
+    def connection(self):
+        """
+        Method to return the pooled connection with transaction begun.
+
+        *******
+        Return:
+        -------
+
+            connection: SQLAlchemy Connection.
+        """
+
+        if self.__connection is None:
+            self.__connection = self.bind.connect()
+        if self.__transaction is None:
+            self.__transaction = self.__connection.begin()
+        return self.__connection
+
+    def execute(self, statement, params: dict = None):
+        """
+        Method to execute statement on connection. Plain SQL is executed as
+        text like Session.execute.
+
+        ***********
+        Attributes:
+        -----------
+
+            statement:  (Required) => Plain SQL or SQLAlchemy statement.
+            params:     (Optional) => Dictonary of bind parameters.
+                        Default: None
+        *******
+        Return:
+        -------
+
+            result:     SQLAlchemy result.
+        """
+
+        if isinstance(statement, str):
+            statement = text(statement)
+        if params:
+            return self.connection().execute(statement, params)
+        return self.connection().execute(statement)
+
+    def commit(self):
+        """
+        Method to commit the transaction.
+        """
+
+        if self.__transaction is not None:
+            transaction, self.__transaction = self.__transaction, None
+            transaction.commit()
+
+    def rollback(self):
+        """
+        Method to rollback the transaction.
+        """
+
+        if self.__transaction is not None:
+            transaction, self.__transaction = self.__transaction, None
+            if transaction.is_active:
+                transaction.rollback()
+
+    def invalidate(self):
+        """
+        Method to discard the connection, so pool does not hand it out
+        again.
+        """
+
+        if self.__connection is not None:
+            self.__transaction = None
+            self.__connection.invalidate()
+
+    def close(self):
+        """
+        Method to rollback pending transaction and return connection to
+        pool.
+        """
+
+        try:
+            self.rollback()
+        finally:
+            if self.__connection is not None:
+                connection, self.__connection = self.__connection, None
+                connection.close()
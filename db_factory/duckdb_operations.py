@@ -0,0 +1,318 @@
+#!/usr/bin/env python
+
+"""
+File holds the module of DuckDB operations exchanging Arrow data with
+Pandas DataFrames without row conversion, registering DataFrames as views
+and scanning Parquet / CSV files directly.
+"""
+
+import os
+import uuid
+import logging
+import threading
+from contextlib import contextmanager
+from pandas import DataFrame
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Key of connection record info holding views registered on connection.
+VIEWS_INFO_KEY = "db_factory_views"
+# Table function of DuckDB per file extension.
+FILE_READER = {".parquet": "read_parquet",
+               ".csv": "read_csv_auto",
+               ".tsv": "read_csv_auto",
+               ".json": "read_json_auto"}
+
+
+class DuckDBOperations(object):
+    """
+    Class handle the DuckDB native operations on pooled connections of
+    engine. Every thread check out a connection of its own, as DuckDB
+    connection can not run queries of several threads. DataFrames and
+    Arrow tables are registered zero-copy as views on every connection when
+    it is checked out, and results are fetched as Arrow then converted
+    column wise to Pandas. Chunks are streamed from a duplicate connection
+    of their own, as any other query on connection would end the stream.
+
+    ********
+    Methods:
+    --------
+
+        __init__:       Initaization functions, holds SQLAlchemy engine.
+        register_df:    Method to register DataFrame or Arrow table as view.
+        unregister:     Method to remove registered view.
+        register_file:  Method to create view scanning Parquet or CSV file.
+        read_df:        Method to execute query and return DataFrame.
+        load_df:        Method to create, replace or append table from
+                        DataFrame.
+    """
+
+    def __init__(self, engine: Engine):
+        """
+        Initialization function to initlaize the DuckDB operations
+
+        ***********
+        Attributes:
+        -----------
+
+            engine:     (Required) => SQLAlchemy engine of DuckDB.
+        """
+
+        self.engine = engine
+        self.preparer = engine.dialect.identifier_preparer
+        self.__lock = threading.RLock()
+        self.__views = {}
+        event.listen(engine, "checkout", self._on_checkout)
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        """
+        Method to register views missing on connection checked out of pool
+        and remove views unregistered since its last checkout, so every
+        query of manager see the registered frames.
+        """
+
+        with self.__lock:
+            views = dict(self.__views)
+        registered = connection_record.info.setdefault(VIEWS_INFO_KEY, {})
+        for view_name in list(registered):
+            if view_name not in views:
+                dbapi_connection.unregister(view_name)
+                registered.pop(view_name)
+        for view_name, frame in views.items():
+            if registered.get(view_name) is not frame:
+                dbapi_connection.register(view_name, frame)
+                registered[view_name] = frame
+
+    @contextmanager
+    def _connection(self):
+        """
+        Method to check out DuckDB connection of engine for the block and
+        return it to pool on exit.
+        """
+
+        pooled = self.engine.raw_connection()
+        try:
+            yield pooled.connection
+        finally:
+            pooled.close()
+
+    def register_df(self, view_name: str, frame):
+        """
+        Method to register DataFrame or Arrow table as view without copy.
+
+        ***********
+        Attributes:
+        -----------
+
+            view_name:  (Required) => Name of view to query the frame.
+            frame:      (Required) => Pandas DataFrame or Arrow table.
+        """
+
+        with self.__lock:
+            self.__views[view_name] = frame
+        # View is registered by checkout, so registration errors surface.
+        with self._connection():
+            pass
+        logger.info(f'Registered frame as DuckDB view {view_name}')
+
+    def unregister(self, view_name: str):
+        """
+        Method to remove registered view.
+
+        ***********
+        Attributes:
+        -----------
+
+            view_name:  (Required) => Name of registered view.
+        """
+
+        with self.__lock:
+            self.__views.pop(view_name, None)
+        with self._connection():
+            pass
+
+    def register_file(self, view_name: str, path: str):
+        """
+        Method to create view scanning Parquet, CSV or JSON file directly.
+        Glob patterns are supported.
+
+        ***********
+        Attributes:
+        -----------
+
+            view_name:  (Required) => Name of view to query the file.
+            path:       (Required) => Path of file or glob pattern.
+        """
+
+        extension = os.path.splitext(path)[1].lower()
+        if extension not in FILE_READER:
+            msg = f"Unsupported file type '{extension}'. Supported are '{list(FILE_READER)}'"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        location = path.replace("'", "''")
+        with self._connection() as connection:
+            connection.execute(
+                f'CREATE OR REPLACE VIEW {self.preparer.quote(view_name)} AS '
+                f"SELECT * FROM {FILE_READER[extension]}('{location}')")
+        logger.info(f'Registered file {path} as DuckDB view {view_name}')
+
+    def read_df(self,
+                sql: str,
+                chunk_size: int = None,
+                as_arrow: bool = False):
+        """
+        Method to execute query and return the result fetched as Arrow.
+
+        ***********
+        Attributes:
+        -----------
+
+            sql:            (Required) => DML select query.
+            chunk_size:     (Optional) => If specified, return an iterator of
+                            chunk_size rows.
+                            Default: None to return all rows.
+            as_arrow:       (Optional) => Return Arrow table instead of
+                            Pandas DataFrame.
+                            Default: False
+        *******
+        Return:
+        -------
+
+            panda_df:       Pandas DataFrame, Arrow table or iterator.
+        """
+
+        if chunk_size:
+            return self._iter_chunks(sql, chunk_size, as_arrow)
+
+        with self._connection() as connection:
+            table = connection.sql(sql).fetch_arrow_table()
+        if as_arrow:
+            return table
+        return table.to_pandas()
+
+    def _cursor(self, connection):
+        """
+        Method to return new connection to database of connection with its
+        database, schema and registered views, so query of cursor run
+        independently of it. Cursor of duckdb_engine connection is the
+        connection itself, so connection is duplicated instead.
+        """
+
+        database, schema = connection.sql(
+            "SELECT current_database(), current_schema()").fetchone()
+        with self.__lock:
+            views = dict(self.__views)
+        cursor = connection.duplicate()
+        try:
+            cursor.execute(f"USE {self.preparer.quote(database)}."
+                           f"{self.preparer.quote(schema)}")
+            for view_name, frame in views.items():
+                cursor.register(view_name, frame)
+        except Exception:
+            cursor.close()
+            raise
+        return cursor
+
+    def _iter_chunks(self, sql: str, chunk_size: int, as_arrow: bool):
+        """
+        Method to start query on cursor of its own and return iterator of
+        its Arrow record batches as chunks. Connection is only held while
+        cursor is created, so iterator left unconsumed does not hold it.
+        """
+
+        with self._connection() as connection:
+            cursor = self._cursor(connection)
+        try:
+            reader = cursor.sql(sql).fetch_record_batch(chunk_size)
+        except Exception:
+            cursor.close()
+            raise
+        return self._iter_batches(cursor, reader, as_arrow)
+
+    def _iter_batches(self, cursor, reader, as_arrow: bool):
+        """
+        Method to yield record batches of reader and close its cursor once
+        iterator is consumed or closed.
+        """
+
+        try:
+            for batch in reader:
+                yield batch if as_arrow else batch.to_pandas()
+        finally:
+            cursor.close()
+
+    def _table_exist(self, connection, table_name: str):
+        """
+        Method to check if table exist in current schema of connection.
+        """
+
+        connection.execute("SELECT count(*) FROM information_schema.tables "
+                           "WHERE table_name = ? AND table_schema = current_schema() "
+                           "AND table_type = 'BASE TABLE'",
+                           [table_name])
+        return bool(connection.fetchone()[0])
+
+    def load_df(self,
+                panda_df,
+                table_name: str,
+                exist_action: str = "append",
+                dtype: dict = None):
+        """
+        Method to create, replace or append table from DataFrame or Arrow
+        table registered as view, so rows are copied inside DuckDB. Columns
+        of dtype are cast to their type in the copy.
+
+        ***********
+        Attributes:
+        -----------
+
+            panda_df:       (Required) => Pandas DataFrame or Arrow table.
+            table_name:     (Required) => Name of table.
+            exist_action:   (Optional) => Action on if table already exist.
+                            Default: append mode. Others modes are replace
+                            or fail.
+            dtype:          (Optional) => Mapping of column name to
+                            SQLAlchemy type of table column.
+                            Default: None to keep types of frame.
+        """
+
+        view_name = f"db_factory_{uuid.uuid4().hex}"
+        names = [str(column) for column in
+                 (panda_df.columns if isinstance(panda_df, DataFrame)
+                  else panda_df.column_names)]
+        columns = ", ".join(self.preparer.quote(name) for name in names)
+        values = []
+        for name in names:
+            column = self.preparer.quote(name)
+            sql_type = (dtype or {}).get(name)
+            if sql_type is not None:
+                if isinstance(sql_type, type):
+                    sql_type = sql_type()
+                type_name = sql_type.compile(dialect=self.engine.dialect)
+                column = f"CAST({column} AS {type_name}) AS {column}"
+            values.append(column)
+        values = ", ".join(values)
+        view = self.preparer.quote(view_name)
+        table = self.preparer.quote(table_name)
+        with self._connection() as connection:
+            connection.register(view_name, panda_df)
+            try:
+                is_exist = self._table_exist(connection, table_name)
+                if is_exist and exist_action == "fail":
+                    msg = f"Table '{table_name}' already exists."
+                    logger.error(msg)
+                    raise ValueError(msg)
+
+                if is_exist and exist_action == "append":
+                    sql = f'INSERT INTO {table} ({columns}) ' \
+                        f'SELECT {values} FROM {view}'
+                else:
+                    sql = f'CREATE OR REPLACE TABLE {table} AS ' \
+                        f'SELECT {values} FROM {view}'
+                logger.info(f'DuckDB load statement: {sql}')
+                connection.execute(sql)
+            finally:
+                connection.unregister(view_name)
@@ -0,0 +1,232 @@
+#!/usr/bin/env python
+
+"""
+File holds the module to run independent queries concurrently on one or
+many DatabaseManager, so total latency is close to the slowest query
+instead of the sum of all queries.
+"""
+
+import time
+import logging
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import AssertionPool
+from .common.type_mapper import TypeMapper
+
+logger = logging.getLogger(__name__)
+
+# Manager methods a task can run.
+TASK_METHODS = ["get_df", "execute_sql"]
+
+
+class QueryExecutor(object):
+    """
+    Class handle the concurrent execution of (manager, sql, params) tasks
+    on a bounded thread pool. Tasks of same manager never run more queries
+    at once than the connections kept by its pool. Failure of a task is
+    recorded in its result and does not stop other tasks.
+
+    ********
+    Methods:
+    --------
+
+        __init__:       Initaization functions, holds the pool size.
+        get_limit:      Method to return concurrent queries allowed on
+                        manager.
+        iterate:        Method to yield task results as they complete.
+        run:            Method to run tasks and return results in submission
+                        order or concatenated DataFrame.
+        concat:         Method to concatenate DataFrames of task results.
+    """
+
+    def __init__(self, max_workers: int = 8, method: str = "get_df"):
+        """
+        Initialization function to initlaize the query executor
+
+        ***********
+        Attributes:
+        -----------
+
+            max_workers:    (Optional) => Threads running tasks.
+                            Default: 8
+            method:         (Optional) => Manager method run by tasks.
+                            Supported are get_df and execute_sql.
+                            Default: get_df
+        """
+
+        if method not in TASK_METHODS:
+            msg = f"Unsupported method '{method}'. Supported are '{TASK_METHODS}'"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        self.max_workers = max_workers
+        self.method = method
+        self.__lock = threading.Lock()
+        self.__limits = {}
+
+    @staticmethod
+    def get_limit(manager, default: int = 1):
+        """
+        Method to return the concurrent queries allowed on manager, which is
+        the number of connections its pool can hand out at once. Pools
+        opening connection per checkout or per thread, like NullPool and
+        SingletonThreadPool, are bounded by default.
+
+        ***********
+        Attributes:
+        -----------
+
+            manager:    (Required) => DatabaseManager with created session.
+            default:    (Optional) => Limit of pools without fixed size.
+                        Default: 1
+        *******
+        Return:
+        -------
+
+            limit:      Number of concurrent queries.
+        """
+
+        pool = manager.engine.pool
+        if isinstance(pool, (StaticPool, AssertionPool)):
+            # Pool holding single connection
+            return 1
+        if isinstance(pool, QueuePool):
+            overflow = getattr(pool, "_max_overflow", 0)
+            if overflow < 0:
+                return max(default, 1)
+            return max(pool.size() + overflow, 1)
+        return max(default, 1)
+
+    def _semaphore(self, manager):
+        """
+        Method to return the semaphore bounding the queries of manager.
+        """
+
+        with self.__lock:
+            key = id(manager)
+            if key not in self.__limits:
+                self.__limits[key] = threading.BoundedSemaphore(
+                    self.get_limit(manager, default=self.max_workers))
+            return self.__limits[key]
+
+    def _run_task(self, index: int, task: tuple, kwargs: dict):
+        """
+        Method to run single task and return its result with timing and
+        error.
+        """
+
+        manager, sql = task[0], task[1]
+        params = task[2] if len(task) > 2 else None
+        result = {"index": index, "sql": sql, "result": None,
+                  "error": None, "elapsed": None}
+        with self._semaphore(manager):
+            start = time.perf_counter()
+            try:
+                func = getattr(manager, self.method)
+                result["result"] = func(sql=sql, params=params, **kwargs)
+            except Exception as err:
+                logger.error(f'Task {index} failed: {err}')
+                result["error"] = err
+            result["elapsed"] = time.perf_counter() - start
+        logger.info(f'Task {index} finished in {result["elapsed"]:.3f} seconds')
+        return result
+
+    def iterate(self, tasks: list, **kwargs):
+        """
+        Method to run tasks concurrently and yield their results as they
+        complete.
+
+        ***********
+        Attributes:
+        -----------
+
+            tasks:      (Required) => List of tuple (manager, sql) or
+                        (manager, sql, params).
+            kwargs:     (Optional) => Extra arguments of manager method like
+                        dtype or downcast, applied to every task.
+        *******
+        Return:
+        -------
+
+            results:    Iterator of dictonary with index of task, sql,
+                        result, error and elapsed seconds.
+        """
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(contextvars.copy_context().run,
+                                       self._run_task, index, task, kwargs)
+                       for index, task in enumerate(tasks)]
+            for future in as_completed(futures):
+                yield future.result()
+
+    def run(self,
+            tasks: list,
+            concat: bool = False,
+            raise_on_error: bool = False,
+            **kwargs):
+        """
+        Method to run tasks concurrently and return results in submission
+        order.
+
+        ***********
+        Attributes:
+        -----------
+
+            tasks:          (Required) => List of tuple (manager, sql) or
+                            (manager, sql, params).
+            concat:         (Optional) => Return single DataFrame
+                            concatenating DataFrames of tasks.
+                            Default: False
+            raise_on_error: (Optional) => Raise the error of first failed
+                            task once all tasks completed.
+                            Default: False to record errors in results.
+            kwargs:         (Optional) => Extra arguments of manager method
+                            like dtype or downcast, applied to every task.
+        *******
+        Return:
+        -------
+
+            results:        List of dictonary with index of task, sql,
+                            result, error and elapsed seconds or DataFrame if
+                            concat.
+        """
+
+        start = time.perf_counter()
+        results = sorted(self.iterate(tasks, **kwargs),
+                         key=lambda result: result["index"])
+        failed = [result for result in results if result["error"]]
+        logger.info(
+            f'Ran {len(results)} tasks in {time.perf_counter() - start:.3f} '
+            f'seconds, {len(failed)} failed')
+
+        if failed and raise_on_error:
+            raise failed[0]["error"]
+        if concat:
+            return self.concat(results)
+        return results
+
+    @staticmethod
+    def concat(results: list):
+        """
+        Method to concatenate DataFrames of successful task results in order
+        of results.
+
+        ***********
+        Attributes:
+        -----------
+
+            results:    (Required) => List of task results.
+        *******
+        Return:
+        -------
+
+            panda_df:   Pandas DataFrame.
+        """
+
+        frames = [result["result"] for result in results
+                  if result["error"] is None and result["result"] is not None]
+        return TypeMapper.concat_df(frames)
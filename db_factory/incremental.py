@@ -0,0 +1,339 @@
+#!/usr/bin/env python
+
+"""
+File holds the module of incremental extraction reading only rows changed
+since last run, using watermark of column kept in local state store.
+"""
+
+import os
+import json
+import logging
+import threading
+import datetime
+import numpy
+import pandas
+
+logger = logging.getLogger(__name__)
+
+# Postgres system column of inserting or updating transaction id.
+XMIN_COLUMN = "xmin"
+# Alias of xmin in query of Postgres.
+XMIN_ALIAS = "db_factory_xmin"
+# Oldest transaction id still running. Every row with lower xmin is final.
+XMIN_BOUND = "txid_snapshot_xmin(txid_current_snapshot())"
+# 32 bit xmin of row extended to 64 bit transaction id with epoch of bound,
+# so watermark keep increasing when xmin wraps around.
+XMIN_EXPRESSION = f"({XMIN_BOUND} + 2147483648 - " \
+    f"((({XMIN_BOUND} + 2147483648 - xmin::text::bigint) % 4294967296) " \
+    f"+ 4294967296) % 4294967296)"
+# Lag subtracted from maximum of timestamp column, so rows of transactions
+# still running and committed later with lower timestamp are not skipped.
+SAFETY_LAG = datetime.timedelta(minutes=1)
+
+
+class WatermarkStore(object):
+    """
+    Class handle the watermarks of incremental reads persisted as JSON in
+    local file. Any object exposing get(name) and set(name, value) can be
+    used in place of it.
+
+    ********
+    Methods:
+    --------
+
+        __init__:   Initaization functions, holds the state file.
+        get:        Method to return the watermark of name.
+        set:        Method to record the watermark of name atomically.
+    """
+
+    def __init__(self, state_path: str = None):
+        """
+        Initialization function to initlaize the watermark store
+
+        ***********
+        Attributes:
+        -----------
+
+            state_path:     (Optional) => JSON file of watermarks.
+                            Default: db_factory_watermarks.json in current
+                            user home directory.
+        """
+
+        self.state_path = state_path or os.path.join(
+            os.environ["HOME"], "db_factory_watermarks.json")
+        self.__lock = threading.Lock()
+
+    def _load(self):
+        """
+        Method to return all watermarks of state file.
+        """
+
+        if not os.path.exists(self.state_path):
+            return {}
+        with open(self.state_path, mode="r") as file:
+            return json.load(file)
+
+    def get(self, name: str):
+        """
+        Method to return the watermark of name.
+
+        ***********
+        Attributes:
+        -----------
+
+            name:       (Required) => Name of incremental read.
+        *******
+        Return:
+        -------
+
+            watermark:  Last acknowledged value or None.
+        """
+
+        with self.__lock:
+            state = self._load().get(name)
+        if state is None:
+            return None
+        if state["type"] == "datetime":
+            return pandas.Timestamp(state["value"]).to_pydatetime()
+        return state["value"]
+
+    def set(self, name: str, value):
+        """
+        Method to record the watermark of name atomically.
+
+        ***********
+        Attributes:
+        -----------
+
+            name:       (Required) => Name of incremental read.
+            value:      (Required) => Watermark value.
+        """
+
+        if isinstance(value, numpy.generic):
+            value = value.item()
+        if isinstance(value, (datetime.datetime, datetime.date)):
+            state = {"type": "datetime", "value": value.isoformat()}
+        elif isinstance(value, (int, float)):
+            state = {"type": "number", "value": value}
+        else:
+            state = {"type": "string", "value": str(value)}
+
+        with self.__lock:
+            watermarks = self._load()
+            watermarks[name] = state
+            temp_path = f"{self.state_path}.tmp"
+            with open(temp_path, mode="w") as file:
+                json.dump(watermarks, file, indent=2)
+            os.replace(temp_path, self.state_path)
+        logger.info(f'Watermark of {name} advanced to {state["value"]}')
+
+
+class IncrementalBatch(object):
+    """
+    Class handle a batch of incremental read bounded by last acknowledged
+    watermark and maximum value of column at start of read. Iterating the
+    batch stream its chunks and ack() advance the watermark once consumer
+    processed them.
+
+    ********
+    Methods:
+    --------
+
+        __init__:   Initaization functions, holds the bounded query.
+        __iter__:   Method to stream DataFrame chunks of batch.
+        ack:        Method to advance the watermark to upper bound of batch.
+    """
+
+    def __init__(self,
+                 manager,
+                 store,
+                 name: str,
+                 sql: str,
+                 params: dict,
+                 high,
+                 chunk_size: int = None,
+                 **kwargs):
+        """
+        Initialization function to initlaize the incremental batch
+
+        ***********
+        Attributes:
+        -----------
+
+            manager:    (Required) => DatabaseManager to read from.
+            store:      (Required) => Watermark store.
+            name:       (Required) => Name of incremental read.
+            sql:        (Required) => Bounded DML select query.
+            params:     (Required) => Bind parameters of query.
+            high:       (Required) => Upper bound of batch, None if no rows.
+            chunk_size: (Optional) => Rows per chunk.
+                        Default: None to read single DataFrame.
+            kwargs:     (Optional) => Extra arguments of get_df.
+        """
+
+        self.manager = manager
+        self.store = store
+        self.name = name
+        self.sql = sql
+        self.params = params
+        self.high = high
+        self.chunk_size = chunk_size
+        self.kwargs = kwargs
+        self.rows = 0
+        self.exhausted = False
+
+    def __iter__(self):
+        """
+        Method to stream DataFrame chunks of batch.
+        """
+
+        if self.high is None:
+            return
+        chunks = self.manager.get_df(sql=self.sql,
+                                     params=self.params,
+                                     chunk_size=self.chunk_size,
+                                     **self.kwargs)
+        if not self.chunk_size:
+            chunks = [chunks]
+        for chunk in chunks:
+            self.rows += len(chunk)
+            yield chunk
+        self.exhausted = True
+
+    def ack(self):
+        """
+        Method to advance the watermark to upper bound of batch, once every
+        chunk is processed by consumer. Batch must be iterated to the end
+        before, so watermark never pass rows that were not read.
+        """
+
+        if self.high is None:
+            logger.info(f'No new rows for {self.name}, watermark is unchanged')
+            return
+        if not self.exhausted:
+            msg = f"Batch of {self.name} must be read to the end before ack, {self.rows} rows read"
+            logger.error(msg)
+            raise ValueError(msg)
+        self.store.set(self.name, self.high)
+
+
+class IncrementalReader(object):
+    """
+    Class build the bounded query of incremental read from watermark of
+    column. Column can be a timestamp like updated_at, a monotonically
+    increasing id, or xmin of Postgres table. Upper bound of xmin is kept
+    below oldest running transaction and upper bound of timestamp is lowered
+    by safety lag, so rows committed after the read are not skipped.
+
+    ********
+    Methods:
+    --------
+
+        __init__:   Initaization functions, holds manager and store.
+        read:       Method to return batch of rows changed since watermark.
+    """
+
+    def __init__(self, manager, store=None):
+        """
+        Initialization function to initlaize the incremental reader
+
+        ***********
+        Attributes:
+        -----------
+
+            manager:    (Required) => DatabaseManager to read from.
+            store:      (Optional) => Watermark store.
+                        Default: None to use WatermarkStore in home
+                        directory.
+        """
+
+        self.manager = manager
+        self.store = store or WatermarkStore()
+
+    def read(self,
+             name: str,
+             watermark_column: str,
+             table_name: str = None,
+             sql: str = None,
+             chunk_size: int = None,
+             safety_lag: datetime.timedelta = SAFETY_LAG,
+             **kwargs):
+        """
+        Method to return the batch of rows with watermark column greater
+        than last acknowledged watermark and not greater than its current
+        maximum, ordered by watermark column.
+
+        ***********
+        Attributes:
+        -----------
+
+            name:               (Required) => Name of incremental read.
+            watermark_column:   (Required) => Column tracking changes or
+                                xmin for Postgres table.
+            table_name:         (Optional) => Name of table to read.
+            sql:                (Optional) => DML select query to read. One
+                                of table_name or sql is required. xmin
+                                require table_name.
+            chunk_size:         (Optional) => Rows per chunk.
+                                Default: None to read single DataFrame.
+            safety_lag:         (Optional) => Lag subtracted from maximum of
+                                timestamp column. Should exceed duration of
+                                longest writing transaction.
+                                Default: 1 minute
+            kwargs:             (Optional) => Extra arguments of get_df.
+        *******
+        Return:
+        -------
+
+            batch:              IncrementalBatch to iterate and ack.
+        """
+
+        if not table_name and not sql:
+            msg = f"One of table_name or sql is required for incremental read"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        column = watermark_column
+        query = sql or f"SELECT * FROM {table_name}"
+        if watermark_column == XMIN_COLUMN:
+            if self.manager.engine.dialect.name != "postgresql" or not table_name:
+                msg = f"xmin watermark require table_name of postgres"
+                logger.error(msg)
+                raise ValueError(msg)
+            query = f"SELECT {XMIN_EXPRESSION} AS {XMIN_ALIAS}, * FROM {table_name}"
+            column = XMIN_ALIAS
+
+        maximum = f"MAX({column})"
+        if watermark_column == XMIN_COLUMN:
+            maximum = f"LEAST({maximum}, {XMIN_BOUND} - 1)"
+        high = self.manager.get_df(
+            sql=f"SELECT {maximum} AS high FROM ({query}) AS src")["high"][0]
+        if pandas.isna(high):
+            high = None
+        elif isinstance(high, (pandas.Timestamp, numpy.datetime64)):
+            high = pandas.Timestamp(high).to_pydatetime() - safety_lag
+        elif isinstance(high, datetime.datetime):
+            high = high - safety_lag
+        elif isinstance(high, numpy.generic):
+            high = high.item()
+
+        low = self.store.get(name)
+        if high is not None and low is not None and high <= low:
+            # Nothing committed beyond watermark, it must not move back.
+            high = None
+        params = {"high": high}
+        predicate = f"{column} <= :high"
+        if low is not None:
+            params["low"] = low
+            predicate = f"{column} > :low AND {predicate}"
+        bounded = f"SELECT * FROM ({query}) AS src WHERE {predicate} ORDER BY {column}"
+        logger.info(f'Incremental read of {name} from {low} to {high}')
+
+        return IncrementalBatch(manager=self.manager,
+                                store=self.store,
+                                name=name,
+                                sql=bounded,
+                                params=params,
+                                high=high,
+                                chunk_size=chunk_size,
+                                **kwargs)
@@ -0,0 +1,225 @@
+#!/usr/bin/env python
+
+"""
+File holds the module to stage large list of keys in temporary table and
+join queries against it on the same connection, instead of building giant
+IN clauses.
+"""
+
+import uuid
+import logging
+import pandas
+from pandas import DataFrame
+from pandas.io.sql import get_schema
+from sqlalchemy import text
+from .operations import Operations
+from .common.type_mapper import TypeMapper
+
+logger = logging.getLogger(__name__)
+
+# Placeholder of temporary table in query.
+KEYS_PLACEHOLDER = "{keys}"
+# Column name of keys given as list, array or unnamed Series.
+KEY_COLUMN = "key"
+# Dialects without session temporary tables.
+UNSUPPORTED_DIALECT = ["bigquery"]
+# Dialects which can not refer to temporary table twice in one query.
+SINGLE_REFERENCE_DIALECT = ["mysql", "mariadb"]
+
+
+class KeyStaging(object):
+    """
+    Class handle the staging of keys in session temporary table of single
+    connection. Keys are loaded with COPY or executemany, query referencing
+    {keys} is run on the same connection and table is dropped before
+    connection return to pool. If query fails, table is left to rollback or
+    end of session, so the error of query is not hidden by the drop. MySQL
+    can not refer to temporary table twice in one query, so {keys} must
+    appear only once in its queries.
+
+    ********
+    Methods:
+    --------
+
+        __init__:       Initaization functions, holds SQLAlchemy engine.
+        to_frame:       Method to convert keys to DataFrame.
+        get_df:         Method to read query joined with staged keys.
+        execute:        Method to execute DML joined with staged keys.
+    """
+
+    def __init__(self, engine, chunk_size: int = 50000):
+        """
+        Initialization function to initlaize the key staging
+
+        ***********
+        Attributes:
+        -----------
+
+            engine:         (Required) => SQLAlchemy engine of database.
+            chunk_size:     (Optional) => Keys sent per batch.
+                            Default: 50000
+        """
+
+        if engine.dialect.name in UNSUPPORTED_DIALECT:
+            msg = f"Temporary key table is not supported for '{engine.dialect.name}'"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        self.engine = engine
+        self.chunk_size = chunk_size
+
+    @staticmethod
+    def to_frame(keys):
+        """
+        Method to convert DataFrame, Series, array or list of keys to
+        DataFrame of unique keys.
+
+        ***********
+        Attributes:
+        -----------
+
+            keys:       (Required) => Keys to stage.
+        *******
+        Return:
+        -------
+
+            panda_df:   Pandas DataFrame of keys.
+        """
+
+        if isinstance(keys, DataFrame):
+            frame = keys
+        elif isinstance(keys, pandas.Series):
+            frame = keys.to_frame(name=keys.name or KEY_COLUMN)
+        else:
+            frame = DataFrame({KEY_COLUMN: keys})
+        return frame.drop_duplicates().reset_index(drop=True)
+
+    def _stage(self, connection, keys: DataFrame):
+        """
+        Method to create temporary table on connection and load keys in it.
+        Return the name of table.
+        """
+
+        table_name = f"db_factory_keys_{uuid.uuid4().hex[:12]}"
+        schema = get_schema(keys, table_name, con=connection)
+        create = schema.replace("CREATE TABLE", "CREATE TEMPORARY TABLE", 1)
+        connection.execute(text(create))
+
+        cursor = connection.connection.cursor()
+        try:
+            Operations.write_rows(cursor=cursor,
+                                  dialect=self.engine.dialect,
+                                  panda_df=keys,
+                                  table_name=table_name,
+                                  chunk_size=self.chunk_size)
+        finally:
+            cursor.close()
+        logger.info(f'Staged {len(keys)} keys in temporary table {table_name}')
+        return table_name
+
+    def _check_sql(self, sql: str):
+        """
+        Method to reject query referencing the temporary table more than
+        once on dialect not supporting it.
+        """
+
+        if self.engine.dialect.name in SINGLE_REFERENCE_DIALECT and \
+                sql.count(KEYS_PLACEHOLDER) > 1:
+            msg = f"Temporary key table can be referenced only once per query on '{self.engine.dialect.name}'"
+            logger.error(msg)
+            raise ValueError(msg)
+
+    def _drop(self, connection, table_name: str):
+        """
+        Method to drop temporary table from connection.
+        """
+
+        preparer = self.engine.dialect.identifier_preparer
+        connection.execute(text(f"DROP TABLE IF EXISTS {preparer.quote(table_name)}"))
+
+    def get_df(self,
+               keys,
+               sql: str,
+               params: dict = None,
+               dtype: dict = None,
+               parse_dates: list = None,
+               downcast: bool = False):
+        """
+        Method to stage keys and read query joined with them.
+
+        ***********
+        Attributes:
+        -----------
+
+            keys:           (Required) => DataFrame, Series, array or list
+                            of keys.
+            sql:            (Required) => DML select query referencing the
+                            temporary table as {keys}.
+            params:         (Optional) => Dictonary of bind parameters.
+                            Default: None
+            dtype:          (Optional) => Mapping of column name to Pandas
+                            dtype of result.
+                            Default: None
+            parse_dates:    (Optional) => List of columns to parse as dates.
+                            Default: None
+            downcast:       (Optional) => Downcast columns of result.
+                            Default: False
+        *******
+        Return:
+        -------
+
+            panda_df:       Pandas DataFrame.
+        """
+
+        self._check_sql(sql)
+        keys = self.to_frame(keys)
+        with self.engine.connect() as connection:
+            with connection.begin():
+                table_name = self._stage(connection, keys)
+                panda_df = pandas.read_sql(
+                    sql=text(sql.replace(KEYS_PLACEHOLDER, table_name)),
+                    con=connection,
+                    params=params,
+                    parse_dates=parse_dates)
+                self._drop(connection, table_name)
+
+        if dtype or downcast:
+            panda_df = TypeMapper.optimize_df(panda_df=panda_df,
+                                              dtype=dtype,
+                                              downcast=downcast)
+        return panda_df
+
+    def execute(self, keys, sql: str, params: dict = None):
+        """
+        Method to stage keys and execute DML like DELETE or UPDATE joined
+        with them, committed with the staging in single transaction.
+
+        ***********
+        Attributes:
+        -----------
+
+            keys:       (Required) => DataFrame, Series, array or list of
+                        keys or rows of values.
+            sql:        (Required) => DML query referencing the temporary
+                        table as {keys}.
+            params:     (Optional) => Dictonary of bind parameters.
+                        Default: None
+        *******
+        Return:
+        -------
+
+            rowcount:   Number of rows affected as reported by driver.
+        """
+
+        self._check_sql(sql)
+        keys = self.to_frame(keys)
+        with self.engine.connect() as connection:
+            with connection.begin():
+                table_name = self._stage(connection, keys)
+                result = connection.execute(
+                    text(sql.replace(KEYS_PLACEHOLDER, table_name)),
+                    params or {})
+                rowcount = result.rowcount
+                self._drop(connection, table_name)
+        logger.info(f'Executed DML joined with {len(keys)} keys, {rowcount} rows affected')
+        return rowcount
@@ -7,22 +7,42 @@ URI of database handled automatically for multiple databases using SQLAlchemy
 """
 
 import os
+import asyncio
+import inspect
 import logging
 import traceback
+import functools
+import contextvars
 from urllib.parse import quote_plus as urlquote
 from pandas import DataFrame
 from sqlalchemy import create_engine
 from sqlalchemy.orm import scoped_session
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import MetaData
+from sqlalchemy.pool import StaticPool
 
 from .common.common import Common
 from .operations import Operations
+from .bigquery_loader import BigQueryLoader
+from .metadata_cache import SchemaCache
+from .sqlite_profile import SqliteProfile
+from .duckdb_operations import DuckDBOperations
+from .incremental import IncrementalReader
+from .incremental import SAFETY_LAG
+from .core import CoreSession
+from .pagination import KeysetPaginator
+from .key_staging import KeyStaging
+from .retry import RetryPolicy
+from .timeout import CancelHandle
+from .warmup import ConnectionWarmer
+from .tenant import SchemaSwitcher
+from .coalesce import QueryCoalescer
+from .admission import AdmissionController
 
 logger = logging.getLogger(__name__)
 
 SUPPORTED_ENGINE = ["postgres", "mysql", "mariadb",
-                    "snowflake", "bigquery", "sqlite"]
+                    "snowflake", "bigquery", "sqlite", "duckdb"]
 SUPPORTED_SECRET_MANAGER_CLOUD = ["aws", "gcp"]
 
 
@@ -47,6 +67,24 @@ class DatabaseManager(object):
         execute_df:             Function to execute Pandas DataFrame object.
         get_df:                 Function to execute DML select queries and return
                                 as Pandas DataFrame.
+        get_df_incremental:     Function to read rows changed since last
+                                acknowledged watermark.
+        get_pages:              Function to walk table or query by keyset
+                                pagination.
+        get_df_by_keys:         Function to read query joined with keys
+                                staged in temporary table.
+        execute_sql_by_keys:    Function to execute DML joined with keys
+                                staged in temporary table.
+        use_schema:             Context manager selecting schema of shared
+                                pool for current thread or asyncio task.
+        execute_sql_async:      Coroutine of execute_sql for asyncio.
+        get_df_async:           Coroutine of get_df for asyncio.
+        register_df:            Function to register DataFrame or Arrow table
+                                as DuckDB view.
+        register_file:          Function to register Parquet or CSV file as
+                                DuckDB view.
+        dispose_session:        Method to stop background threads and close
+                                pooled connections.
         object
     """
 
@@ -64,7 +102,27 @@ class DatabaseManager(object):
                  snowflake_account: str = None,
                  secret_id: str = None,
                  secrete_manager_cloud: str = "aws",
-                 aws_region: str = "us-east-1"
+                 aws_region: str = "us-east-1",
+                 pool_size: int = None,
+                 max_overflow: int = None,
+                 warm_up_connections: int = 0,
+                 min_idle_connections: int = 0,
+                 idle_check_interval: int = 30,
+                 retry_policy: RetryPolicy = None,
+                 statement_timeout: float = None,
+                 bigquery_client=None,
+                 bigquery_read_client=None,
+                 metadata_cache: bool = False,
+                 metadata_cache_path: str = None,
+                 sqlite_profile: bool = False,
+                 sqlite_pragmas: dict = None,
+                 sqlite_in_memory: bool = False,
+                 core_execution: bool = False,
+                 schema_switching: bool = False,
+                 coalesce_queries: bool = False,
+                 admission_controller: AdmissionController = None,
+                 priority: str = "interactive",
+                 chunk_memory_limit: int = None
                  ):
         """
         Initialization function to initlaize the object
@@ -81,11 +139,13 @@ class DatabaseManager(object):
                                     * snowflake
                                     * bigquery
                                     * sqlite
+                                    * duckdb
             database:               (Required) => Database name to connect.
                                     Database must be precreated.
             sqlite_db_path:         (Optional) => Fully qualifiled path where
                                     database will be created. Database file be
-                                    named as per database paramater.
+                                    named as per database paramater. Used
+                                    by sqlite and duckdb.
                                     Default: Current user home directory
             username:               (Optional) => Username to connect database.
                                     User should have all permissions on
@@ -130,6 +190,108 @@ class DatabaseManager(object):
             aws_region:             (Optional) => AWS region for secret manager
                                     service.
                                     Default: is 'us-east-1'
+            pool_size:              (Optional) => Number of connections kept
+                                    in SQLAlchemy connection pool.
+                                    Default: None to use SQLAlchemy default.
+            max_overflow:           (Optional) => Number of connections
+                                    allowed above pool size.
+                                    Default: None to use SQLAlchemy default.
+            warm_up_connections:    (Optional) => Number of pooled
+                                    connections pre-opened concurrently at
+                                    session creation. Dialect initialization
+                                    is run once before.
+                                    Default: 0 to disable warm up.
+            min_idle_connections:   (Optional) => Number of idle connections
+                                    kept open by background thread.
+                                    Default: 0 to disable background thread.
+            idle_check_interval:    (Optional) => Seconds between checks of
+                                    idle connections by background thread.
+                                    Default: 30
+            retry_policy:           (Optional) => Policy to retry idempotent
+                                    operations on transient errors like
+                                    failover, dropped connection, deadlock
+                                    or serialization failure. Retry counters
+                                    are exposed by retry_policy.get_metrics.
+                                    Default: None to not retry.
+            statement_timeout:      (Optional) => Seconds allowed for every
+                                    query of execute_sql and get_df, applied
+                                    with native timeout of database.
+                                    Default: None for no timeout.
+            bigquery_client:        (Optional) => BigQuery client used by
+                                    load jobs and query jobs of BigQuery
+                                    engine.
+                                    Default: None to create from credentials.
+            bigquery_read_client:   (Optional) => BigQuery Storage read
+                                    client used by get_df of BigQuery engine.
+                                    Default: None to create from credentials.
+            metadata_cache:         (Optional) => Cache reflected tables so
+                                    execute_df appending to existing tables
+                                    skip catalog queries. Cache is
+                                    invalidated on DDL issued through
+                                    execute_sql and execute_df.
+                                    Default: False
+            metadata_cache_path:    (Optional) => Local file to persist the
+                                    metadata cache across restarts. Use one
+                                    file per manager. Enables metadata_cache.
+                                    Default: None to keep cache in memory.
+            sqlite_profile:         (Optional) => Apply SQLite performance
+                                    profile: WAL journal, synchronous NORMAL,
+                                    page cache, mmap, in-memory temp store,
+                                    busy timeout and connection pool shared
+                                    by threads.
+                                    Default: False
+            sqlite_pragmas:         (Optional) => PRAGMAs overriding the
+                                    SQLite profile. Enables sqlite_profile.
+                                    Default: None
+            sqlite_in_memory:       (Optional) => Use named in-memory
+                                    database shared by connections of
+                                    process. Enables sqlite_profile.
+                                    Default: False
+            core_execution:         (Optional) => Run operations on pooled
+                                    SQLAlchemy Connection instead of ORM
+                                    Session. Session is then created on
+                                    first access of session attribute only.
+                                    Default: False
+            schema_switching:       (Optional) => Let tenant schemas share
+                                    the pool of manager. Schema selected by
+                                    use_schema or schema argument of calls
+                                    is set with search_path or USE on
+                                    connection checkout and default schema
+                                    is restored on checkin. Valid for
+                                    Postgres, MySQL, MariaDB, Snowflake and
+                                    DuckDB.
+                                    Default: False
+            coalesce_queries:       (Optional) => Run identical read only
+                                    queries issued concurrently by
+                                    execute_sql or get_df once, with same
+                                    SQL, parameters and schema. Waiting
+                                    callers share the result, each getting
+                                    own copy. Chunked, iterator and
+                                    cancellable queries, locking reads like
+                                    SELECT FOR UPDATE and queries calling
+                                    volatile functions like nextval are not
+                                    coalesced. More volatile functions are
+                                    declared by replacing coalescer with
+                                    QueryCoalescer(volatile_functions=...).
+                                    Counters are exposed by
+                                    coalescer.get_metrics.
+                                    Default: False
+            admission_controller:   (Optional) => Controller limiting
+                                    concurrent operations per database.
+                                    Operations above the limit wait in
+                                    queue by priority. Share controller
+                                    across managers to share limits of same
+                                    database. Queue depth and limits are
+                                    exposed by its get_metrics.
+                                    Default: None for no limit.
+            priority:               (Optional) => Admission priority of
+                                    operations of manager, interactive or
+                                    batch.
+                                    Default: interactive
+            chunk_memory_limit:     (Optional) => Memory ceiling in bytes of
+                                    chunks of execute_df and get_df with
+                                    chunk_size auto.
+                                    Default: None to use 64 MB.
         """
         self.engine_type = engine_type
         self.database = database
@@ -145,8 +307,50 @@ class DatabaseManager(object):
         self.secret_id = secret_id
         self.secrete_manager_cloud = secrete_manager_cloud
         self.aws_region = aws_region
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.warm_up_connections = warm_up_connections
+        self.min_idle_connections = min_idle_connections
+        self.idle_check_interval = idle_check_interval
+        self.retry_policy = retry_policy
+        self.statement_timeout = statement_timeout
+        self.bigquery_client = bigquery_client
+        self.bigquery_read_client = bigquery_read_client
+        self.bigquery_loader = None
+        self.gcp_project = None
+        self.metadata_cache = metadata_cache
+        self.metadata_cache_path = metadata_cache_path
+        self.schema_cache = None
+        self.duckdb_operations = None
+        self.sqlite_profile = None
+        if sqlite_profile or sqlite_pragmas or sqlite_in_memory:
+            self.sqlite_profile = SqliteProfile(pragmas=sqlite_pragmas,
+                                                in_memory=sqlite_in_memory)
+        self.core_execution = core_execution
+        self.schema_switching = schema_switching
+        self.schema_switcher = None
+        self.coalescer = QueryCoalescer() if coalesce_queries else None
+        self.admission_controller = admission_controller
+        self.priority = priority
+        self.chunk_memory_limit = chunk_memory_limit
         self.engine = None
         self.session = None
+        self.warmer = None
+
+    @property
+    def session(self):
+        """
+        SQLAlchemy scoped session of engine. Created lazily in case of
+        core_execution.
+        """
+
+        if self.__session is None and self.engine is not None:
+            self.__session = scoped_session(sessionmaker(bind=self.engine))
+        return self.__session
+
+    @session.setter
+    def session(self, session: scoped_session):
+        self.__session = session
 
     def fetch_from_secret(self):
         """
@@ -170,7 +374,7 @@ class DatabaseManager(object):
                     aws_region=self.aws_region)
             except Exception as err:
                 logger.exception(
-                    f'Failed to fetch secrets from the Secret Manager Service', err)
+                    f'Failed to fetch secrets from the Secret Manager Service: {err}')
         else:
             logger.info(
                 f'Secret id is not set. Will use plain authentication.')
@@ -236,6 +440,17 @@ class DatabaseManager(object):
         if self.engine_type in ["sqlite"]:
             uri = 'sqlite:///' + os.path.join(self.sqlite_db_path,
                                               f"{self.database}.db")
+            if self.sqlite_profile:
+                uri = self.sqlite_profile.get_uri(
+                    path=os.path.join(self.sqlite_db_path,
+                                      f"{self.database}.db"),
+                    database=self.database)
+                param = self.sqlite_profile.get_engine_args()
+        elif self.engine_type in ["duckdb"]:
+            uri = 'duckdb:///' + os.path.join(self.sqlite_db_path,
+                                              f"{self.database}.duckdb")
+            # Pooled connections of the same file share its database, and
+            # DuckDBOperations register views on every checked out one.
         elif self.engine_type in ["postgres"]:
             uri = f"postgres+pg8000://{self.username}:{self.password}@{self.host}:{self.port}/{self.database}"
             param = dict(client_encoding="utf8")
@@ -260,6 +475,7 @@ class DatabaseManager(object):
 
             gcp_auth = GcpAuthManager(service_accout_file=gcp_service_file)
             project_name = gcp_auth.get_project_name()
+            self.gcp_project = project_name
 
             uri = f"bigquery://{project_name}/{self.database}"
             if gcp_service_file:
@@ -277,6 +493,14 @@ class DatabaseManager(object):
         try:
             logger.info(f'Creating SQLAlchemy Dialects session scope.')
             uri, param, is_not_dialect_desc = self.create_uri()
+            param = dict(param or {})
+            # Single connection pool take no size arguments.
+            is_sized = param.get("poolclass") is not StaticPool
+            if self.pool_size is not None and is_sized:
+                param["pool_size"] = self.pool_size
+            if self.max_overflow is not None and is_sized:
+                param["max_overflow"] = self.max_overflow
+
             if param:
                 self.engine = create_engine(uri, echo=True, **param)
             else:
@@ -286,17 +510,441 @@ class DatabaseManager(object):
                 # https: // github.com/sqlalchemy/sqlalchemy/issues/5645
                 self.engine.dialect.description_encoding = None
 
-            self.session = scoped_session(sessionmaker(bind=self.engine))
+            if self.sqlite_profile and self.engine_type in ["sqlite"]:
+                self.sqlite_profile.apply(self.engine)
+
+            if self.schema_switching:
+                self.schema_switcher = SchemaSwitcher(
+                    engine=self.engine,
+                    default_schema=self._default_schema())
+                self.schema_switcher.attach()
+
+            if not self.core_execution:
+                self.session = scoped_session(sessionmaker(bind=self.engine))
             logger.info(f'SQLAlchemy Dialects session scope is created')
+
+            if self.metadata_cache or self.metadata_cache_path:
+                self.schema_cache = SchemaCache(
+                    engine=self.engine,
+                    cache_path=self.metadata_cache_path)
+
+            if self.engine_type in ["duckdb"]:
+                self.duckdb_operations = DuckDBOperations(engine=self.engine)
+
+            if self.engine_type in ["bigquery"]:
+                # Load jobs and Storage Read API replace the row by row
+                # paths of SQLAlchemy dialect for DataFrames.
+                self.bigquery_loader = BigQueryLoader(
+                    project=self.gcp_project,
+                    dataset=self.database,
+                    client=self.bigquery_client,
+                    read_client=self.bigquery_read_client,
+                    credentials_path=os.environ.get(
+                        'GOOGLE_APPLICATION_CREDENTIALS') or None)
+
+            if self.warm_up_connections or self.min_idle_connections:
+                self.warmer = ConnectionWarmer(
+                    engine=self.engine,
+                    warm_up_connections=self.warm_up_connections,
+                    min_idle_connections=self.min_idle_connections,
+                    idle_check_interval=self.idle_check_interval)
+                self.warmer.warm_up()
+                self.warmer.start()
         except Exception as err:
             logger.exception(
-                f'Failed to create session with given paramaters for Database', err)
+                f'Failed to create session with given paramaters for Database: {err}')
             traceback.print_tb(err.__traceback__)
 
             # Propagate the exception
             raise
 
-    def execute_sql(self, sql: str):
+    def get_df_incremental(self,
+                           name: str,
+                           watermark_column: str,
+                           table_name: str = None,
+                           sql: str = None,
+                           chunk_size: int = None,
+                           state_store=None,
+                           safety_lag=SAFETY_LAG,
+                           **kwargs):
+        """
+        Function to read only rows changed since last acknowledged watermark
+        of column. Returned batch stream the chunks and its ack() advance the
+        watermark once consumer processed them.
+
+        ***********
+        Attributes:
+        -----------
+
+            name:               (Required) => Name of incremental read
+                                identifying its watermark.
+            watermark_column:   (Required) => Column tracking changes like
+                                updated_at or increasing id, or xmin for
+                                Postgres table.
+            table_name:         (Optional) => Name of table to read.
+            sql:                (Optional) => DML select query to read. One
+                                of table_name or sql is required.
+            chunk_size:         (Optional) => Rows per chunk.
+                                Default: None to read single DataFrame.
+            state_store:        (Optional) => Store with get(name) and
+                                set(name, value) of watermarks.
+                                Default: None to use JSON file in current
+                                user home directory.
+            safety_lag:         (Optional) => Timedelta subtracted from
+                                maximum of timestamp column, so rows of
+                                transactions committing late are not skipped.
+                                Default: 1 minute
+            kwargs:             (Optional) => Extra arguments of get_df like
+                                dtype or downcast.
+        *******
+        Return:
+        -------
+
+            batch:              IncrementalBatch to iterate and ack.
+        """
+
+        reader = IncrementalReader(manager=self, store=state_store)
+        return reader.read(name=name,
+                           watermark_column=watermark_column,
+                           table_name=table_name,
+                           sql=sql,
+                           chunk_size=chunk_size,
+                           safety_lag=safety_lag,
+                           **kwargs)
+
+    def get_pages(self,
+                  key_columns: list,
+                  table_name: str = None,
+                  sql: str = None,
+                  page_size: int = 10000,
+                  as_frame: bool = True,
+                  prefetch: bool = True,
+                  start_after: list = None,
+                  **kwargs):
+        """
+        Function to walk table or query ordered by unique key, page by page
+        with WHERE key > last key ORDER BY key LIMIT page_size, so every
+        page cost the same and no server side cursor is needed.
+
+        ***********
+        Attributes:
+        -----------
+
+            key_columns:    (Required) => Column or list of columns of unique
+                            key.
+            table_name:     (Optional) => Name of table to walk.
+            sql:            (Optional) => DML select query to walk. One of
+                            table_name or sql is required.
+            page_size:      (Optional) => Rows per page.
+                            Default: 10000
+            as_frame:       (Optional) => Yield Pandas DataFrame per page.
+                            Default: True. False yield list of rows.
+            prefetch:       (Optional) => Fetch next page on background
+                            thread while current page is processed.
+                            Default: True
+            start_after:    (Optional) => Key values to resume after.
+                            Default: None to start from first row.
+            kwargs:         (Optional) => Extra arguments of get_df.
+        *******
+        Return:
+        -------
+
+            pages:          Iterator of pages.
+        """
+
+        paginator = KeysetPaginator(manager=self,
+                                    key_columns=key_columns,
+                                    page_size=page_size,
+                                    prefetch=prefetch)
+        return paginator.iterate(table_name=table_name,
+                                 sql=sql,
+                                 as_frame=as_frame,
+                                 start_after=start_after,
+                                 **kwargs)
+
+    def get_df_by_keys(self,
+                       keys,
+                       sql: str,
+                       params: dict = None,
+                       dtype: dict = None,
+                       parse_dates: list = None,
+                       downcast: bool = False):
+        """
+        Function to load keys in temporary table and read query joined with
+        it on the same connection, instead of building giant IN clause.
+
+        ***********
+        Attributes:
+        -----------
+
+            keys:           (Required) => DataFrame, Series, array or list
+                            of keys. Columns of DataFrame become columns of
+                            temporary table, else column is named key.
+            sql:            (Required) => DML select query referencing the
+                            temporary table as {keys}. Example:
+                            SELECT o.* FROM orders o JOIN {keys} k
+                            ON o.id = k.key
+            params:         (Optional) => Dictonary of bind parameters.
+                            Default: None
+            dtype:          (Optional) => Mapping of column name to Pandas
+                            dtype of result.
+                            Default: None
+            parse_dates:    (Optional) => List of columns to parse as dates.
+                            Default: None
+            downcast:       (Optional) => Downcast columns of result.
+                            Default: False
+        *******
+        Return:
+        -------
+
+            panda_df:       Pandas DataFrame.
+        """
+
+        def operation():
+            staging = KeyStaging(engine=self.engine)
+            return staging.get_df(keys=keys,
+                                  sql=sql,
+                                  params=params,
+                                  dtype=dtype,
+                                  parse_dates=parse_dates,
+                                  downcast=downcast)
+
+        return self._run(operation, idempotent=True)
+
+    def execute_sql_by_keys(self, keys, sql: str, params: dict = None):
+        """
+        Function to load keys in temporary table and execute DML like
+        DELETE or UPDATE joined with it, in single transaction.
+
+        ***********
+        Attributes:
+        -----------
+
+            keys:       (Required) => DataFrame, Series, array or list of
+                        keys or rows of values.
+            sql:        (Required) => DML query referencing the temporary
+                        table as {keys}. Example:
+                        DELETE FROM orders WHERE id IN
+                        (SELECT key FROM {keys})
+            params:     (Optional) => Dictonary of bind parameters.
+                        Default: None
+        *******
+        Return:
+        -------
+
+            rowcount:   Number of rows affected as reported by driver.
+        """
+
+        def operation():
+            staging = KeyStaging(engine=self.engine)
+            return staging.execute(keys=keys, sql=sql, params=params)
+
+        if self.schema_cache:
+            self.schema_cache.invalidate_sql(sql)
+        return self._run(operation, idempotent=False)
+
+    def _duckdb(self):
+        """
+        Method to return DuckDB operations or raise if engine is not DuckDB.
+        """
+
+        if not self.duckdb_operations:
+            msg = f"Operation is supported for 'duckdb' engine only"
+            logger.error(msg)
+            raise ValueError(msg)
+        return self.duckdb_operations
+
+    def register_df(self, view_name: str, frame):
+        """
+        Function to register Pandas DataFrame or Arrow table as DuckDB view
+        without copying it, so it can be queried by execute_sql and get_df.
+
+        ***********
+        Attributes:
+        -----------
+
+            view_name:  (Required) => Name of view to query the frame.
+            frame:      (Required) => Pandas DataFrame or Arrow table.
+        """
+
+        self._duckdb().register_df(view_name=view_name, frame=frame)
+
+    def register_file(self, view_name: str, path: str):
+        """
+        Function to register Parquet, CSV or JSON file as DuckDB view, so file
+        is scanned directly by queries.
+
+        ***********
+        Attributes:
+        -----------
+
+            view_name:  (Required) => Name of view to query the file.
+            path:       (Required) => Path of file or glob pattern.
+        """
+
+        self._duckdb().register_file(view_name=view_name, path=path)
+
+    def dispose_session(self):
+        """
+        Method to stop background threads of the manager and close all
+        pooled connections of engine.
+        """
+
+        if self.warmer:
+            self.warmer.stop()
+            self.warmer = None
+        if self.__session:
+            self.__session.remove()
+        if self.schema_switcher:
+            self.schema_switcher.detach()
+            self.schema_switcher = None
+        if self.engine:
+            self.engine.dispose()
+        logger.info(f'SQLAlchemy Dialects session scope is disposed')
+
+    def _operations(self):
+        """
+        Method to return the Operations object for the session of manager.
+        """
+
+        if self.core_execution:
+            session = self._core_session
+        else:
+            session = self.session
+        return Operations(session,
+                          bigquery_loader=self.bigquery_loader,
+                          schema_cache=self.schema_cache,
+                          duckdb_operations=self.duckdb_operations,
+                          chunk_memory_limit=self.chunk_memory_limit)
+
+    def _core_session(self):
+        """
+        Method to return the Core session on pooled connection of engine.
+        """
+
+        return CoreSession(engine=self.engine)
+
+    def _default_schema(self):
+        """
+        Method to return the schema connections hold outside of use_schema.
+        """
+
+        if self.engine_type in ["mysql", "mariadb"]:
+            return self.database
+        if self.engine_type in ["snowflake"]:
+            return self.schema
+        # Postgres reset search_path and DuckDB use its main schema.
+        return None
+
+    def use_schema(self, schema: str):
+        """
+        Context manager selecting schema for operations of current thread or
+        asyncio task, on pooled connections shared by all schemas. Worker
+        threads of executor, pagination, sharding, migration, diff and swap
+        run in copy of caller context, so they use the selected schema.
+
+        ***********
+        Attributes:
+        -----------
+
+            schema:     (Required) => Name of schema.
+        """
+
+        if schema is not None and not self.schema_switcher:
+            msg = f"Schema switching is not enabled. Create manager with schema_switching=True"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        return SchemaSwitcher.use(schema)
+
+    def _coalesce_key(self, method: str, arguments: dict):
+        """
+        Method to return the coalescing key of call, or None if call must
+        run on its own.
+        """
+
+        if not self.coalescer:
+            return None
+
+        bound = inspect.signature(getattr(self, method)).bind(**arguments)
+        bound.apply_defaults()
+        arguments = dict(bound.arguments)
+        # Retry behaviour and admission do not change the result.
+        arguments.pop("idempotent", None)
+        arguments.pop("priority", None)
+        if arguments.get("chunk_size") or arguments.get("cancel_handle") \
+                or arguments.get("result_format") == "iterator" \
+                or not RetryPolicy.is_read_only(arguments["sql"]) \
+                or not self.coalescer.is_shareable(arguments["sql"]):
+            # Lazy results can not be shared, and DML, locking reads and
+            # volatile functions must run per call.
+            return None
+        return QueryCoalescer.get_key(identity=repr(self.engine.url),
+                                      method=method,
+                                      arguments=arguments)
+
+    def _coalesce(self, key, func):
+        """
+        Method to run the call or share execution of identical call in
+        flight.
+        """
+
+        if key is None:
+            return func()
+        return self.coalescer.run(key, func)
+
+    async def _run_async(self, method: str, arguments: dict):
+        """
+        Coroutine to run method of manager on executor thread. Identical
+        call in flight is awaited without holding a thread.
+        """
+
+        func = functools.partial(getattr(self, method), **arguments)
+        key = self._coalesce_key(method, arguments)
+        if key is not None:
+            return await self.coalescer.run_async(key, func)
+
+        # Context is copied so schema selected by the task apply on
+        # executor thread.
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(
+            None, context.run, func)
+
+    def _run(self,
+             func,
+             idempotent: bool = True,
+             schema: str = None,
+             priority: str = None):
+        """
+        Method to run the database operation with retry policy and
+        admission control if set. Every attempt wait for its own slot, so
+        backoff between retries does not hold one.
+        """
+
+        if self.admission_controller:
+            func = functools.partial(self.admission_controller.run,
+                                     repr(self.engine.url),
+                                     func,
+                                     priority=priority or self.priority)
+
+        with self.use_schema(schema):
+            if not self.retry_policy:
+                return func()
+
+            return self.retry_policy.call(func,
+                                          idempotent=idempotent,
+                                          dialect=self.engine.dialect.name)
+
+    def execute_sql(self,
+                    sql: str,
+                    idempotent: bool = None,
+                    timeout: float = None,
+                    cancel_handle: CancelHandle = None,
+                    params: dict = None,
+                    result_format: str = "rows",
+                    fetch_size: int = None,
+                    schema: str = None,
+                    priority: str = None):
         """
         Function to execute DML or DDL queries and return if rows exist.
 
@@ -309,6 +957,35 @@ class DatabaseManager(object):
                         Default is None. One of paramater sql_query or
                         panda_df is required. If both is provided panda_df
                         will be taken as priority and sql_query is ignored.
+            idempotent: (Optional) => True if query can be retried on
+                        transient errors without side effects.
+                        Default: None to retry read only queries only.
+            timeout:    (Optional) => Seconds allowed for the query.
+                        Default: None to use statement_timeout of manager.
+            cancel_handle:  (Optional) => Handle to cancel the running query
+                        from other thread using cancel_handle.cancel().
+                        Default: None
+            params:     (Optional) => Dictonary of bind parameters referenced
+                        as :name in query.
+                        Default: None
+            result_format:  (Optional) => Format of returned rows:
+                        * rows: list of SQLAlchemy Row
+                        * tuples: list of plain tuples
+                        * columns: dictonary of column to NumPy array
+                        * iterator: lazy iterator of tuples, to consume
+                          before next operation of same thread
+                        * scalar: first column of first row
+                        * first: first row as tuple
+                        Default: rows
+            fetch_size: (Optional) => Rows per fetchmany call of tuples,
+                        columns and iterator formats.
+                        Default: None to use 10000 rows.
+            schema:     (Optional) => Schema to run query in, when
+                        schema_switching is enabled.
+                        Default: None to use schema of context.
+            priority:   (Optional) => Admission priority, interactive or
+                        batch.
+                        Default: None to use priority of manager.
         *******
         Return:
         -------
@@ -317,16 +994,55 @@ class DatabaseManager(object):
         """
 
         rows = None
+        if idempotent is None:
+            idempotent = RetryPolicy.is_read_only(sql)
+
+        def operation():
+            db_operation = self._operations()
+            return db_operation.execute(
+                sql=sql,
+                timeout=timeout or self.statement_timeout,
+                cancel_handle=cancel_handle,
+                params=params,
+                result_format=result_format,
+                fetch_size=fetch_size)
 
-        db_operation = Operations(self.session)
-        rows = db_operation.execute(sql=sql)
+        key = self._coalesce_key("execute_sql", dict(
+            sql=sql, timeout=timeout,
+            cancel_handle=cancel_handle, params=params,
+            result_format=result_format, fetch_size=fetch_size,
+            schema=schema))
+        rows = self._coalesce(key, lambda: self._run(
+            operation, idempotent=idempotent, schema=schema,
+            priority=priority))
         return rows
 
+    async def execute_sql_async(self, sql: str, **kwargs):
+        """
+        Coroutine to execute DML or DDL queries on executor thread without
+        blocking event loop. Accept arguments of execute_sql.
+
+        *******
+        Return:
+        -------
+
+            rows:       If rows in case of DML select queries else none.
+        """
+
+        return await self._run_async("execute_sql", dict(sql=sql, **kwargs))
+
     def execute_df(self,
                    panda_df: DataFrame,
                    table_name: str,
                    chunk_size: int = None,
-                   exist_action: str = "append"):
+                   exist_action: str = "append",
+                   dtype: dict = None,
+                   infer_dtype: bool = False,
+                   fast_load: bool = False,
+                   defer_indexes: bool = False,
+                   atomic_swap: bool = False,
+                   schema: str = None,
+                   priority: str = None):
         """
         Function to execute Pandas DataFrame object to create, replace or
         append table with DataFrame table objects.
@@ -343,30 +1059,88 @@ class DatabaseManager(object):
             table_name:     (Optional) => Name of table .
             chunk_size:     (Optional) => chunck size to update the table in
                             chunks for performance rather than insert row one
-                            by one.
+                            by one. auto start from row width and memory
+                            ceiling and tune size by throughput while
+                            loading. Ignored by BigQuery and DuckDB loads.
                             Default: 1 row at a time.
             exist_action:   (Optional) => Action on if table already exist.
                             Default: append mode. Others modes are replace
                             or fail.
+            dtype:          (Optional) => Mapping of column name to
+                            SQLAlchemy type used when table is created.
+                            Default: None to let Pandas infer the types.
+            infer_dtype:    (Optional) => Derive compact column types like
+                            sized VARCHAR, SMALLINT or ENUM from DataFrame
+                            dtypes and value ranges for columns missing in
+                            dtype.
+                            Default: False
+            fast_load:      (Optional) => Serialize DataFrame column wise
+                            with NumPy and load using COPY for PostgreSQL or
+                            DBAPI executemany for others, avoiding per row
+                            conversion of Pandas to_sql. Snowflake load
+                            compressed Parquet chunks through PUT to
+                            temporary internal stage and COPY INTO.
+                            BigQuery always load using load job from
+                            in-memory Parquet.
+                            Default: False
+            defer_indexes:  (Optional) => For SQLite fast_load, drop indexes
+                            of table before load and create them once rows
+                            are loaded in the same transaction.
+                            Default: False
+            atomic_swap:    (Optional) => For replace, load staging table
+                            without indexes, rebuild indexes, primary key
+                            and unique constraints of existing table on it
+                            and swap it in atomically. Not supported for
+                            BigQuery.
+                            Default: False
+            schema:         (Optional) => Schema to load table in, when
+                            schema_switching is enabled.
+                            Default: None to use schema of context.
+            priority:       (Optional) => Admission priority, interactive
+                            or batch.
+                            Default: None to use priority of manager.
         *******
         Return:
         -------
 
-            rows:           If rows in case of DDL queries else none.
+            rows:           Load result per file in case of Snowflake
+                            fast_load, load job result in case of BigQuery
+                            else none.
         """
 
         rows = None
 
-        db_operation = Operations(self.session)
-        rows = db_operation.execute(panda_df=panda_df,
-                                    table_name=table_name,
-                                    chunk_size=chunk_size,
-                                    exist_action=exist_action)
+        def operation():
+            db_operation = self._operations()
+            return db_operation.execute(panda_df=panda_df,
+                                        table_name=table_name,
+                                        chunk_size=chunk_size,
+                                        exist_action=exist_action,
+                                        dtype=dtype,
+                                        infer_dtype=infer_dtype,
+                                        fast_load=fast_load,
+                                        defer_indexes=defer_indexes,
+                                        atomic_swap=atomic_swap)
+
+        # Replace rebuild the table from scratch so repeating it is safe.
+        rows = self._run(operation,
+                         idempotent=exist_action == "replace",
+                         schema=schema,
+                         priority=priority)
         return rows
 
     def get_df(self,
                sql: str,
-               chunk_size: int = None):
+               chunk_size: int = None,
+               dtype: dict = None,
+               parse_dates: list = None,
+               downcast: bool = False,
+               columns: list = None,
+               timeout: float = None,
+               cancel_handle: CancelHandle = None,
+               params: dict = None,
+               schema: str = None,
+               priority: str = None):
         """
         Function to execute DML select queries and return Pandas DataFrame
         object.
@@ -382,8 +1156,40 @@ class DatabaseManager(object):
                             will be taken as priority and sql_query is ignored.
             chunk_size:     (Optional) => If specified, return an iterator
                             where chunk_size is the number of rows to include
-                            in each chunk.
+                            in each chunk. auto size chunks from row width
+                            and memory ceiling and tune them by fetch
+                            throughput.
                             Default: None to include all records.
+            dtype:          (Optional) => Mapping of column name to Pandas
+                            dtype applied on every chunk while fetching.
+                            Default: None to keep dtypes inferred by Pandas.
+            parse_dates:    (Optional) => List of columns to parse as dates
+                            or dictonary of column to format.
+                            Default: None
+            downcast:       (Optional) => Narrow numeric columns, use
+                            nullable integer dtypes for integer columns with
+                            NULL and store low-cardinality strings as
+                            category while fetching.
+                            Default: False
+            columns:        (Optional) => List of columns to keep from the
+                            query result.
+                            Default: None to keep all columns.
+            timeout:        (Optional) => Seconds allowed for the query.
+                            Default: None to use statement_timeout of
+                            manager.
+            cancel_handle:  (Optional) => Handle to cancel the running query
+                            from other thread using cancel_handle.cancel().
+                            Default: None
+            params:         (Optional) => Dictonary of bind parameters
+                            referenced as :name in query.
+                            Default: None
+            schema:         (Optional) => Schema to run query in, when
+                            schema_switching is enabled.
+                            Default: None to use schema of context.
+            priority:       (Optional) => Admission priority, interactive
+                            or batch. Chunks of iterator are fetched
+                            after slot is released.
+                            Default: None to use priority of manager.
         *******
         Return:
         -------
@@ -393,8 +1199,38 @@ class DatabaseManager(object):
 
         rows = None
 
-        db_operation = Operations(self.session)
-        rows = db_operation.execute(sql=sql,
-                                    chunk_size=chunk_size,
-                                    get_df=True)
+        def operation():
+            db_operation = self._operations()
+            return db_operation.execute(sql=sql,
+                                        chunk_size=chunk_size,
+                                        get_df=True,
+                                        dtype=dtype,
+                                        parse_dates=parse_dates,
+                                        downcast=downcast,
+                                        columns=columns,
+                                        timeout=timeout or self.statement_timeout,
+                                        cancel_handle=cancel_handle,
+                                        params=params)
+
+        key = self._coalesce_key("get_df", dict(
+            sql=sql, chunk_size=chunk_size, dtype=dtype,
+            parse_dates=parse_dates, downcast=downcast, columns=columns,
+            timeout=timeout, cancel_handle=cancel_handle, params=params,
+            schema=schema))
+        rows = self._coalesce(key, lambda: self._run(
+            operation, idempotent=True, schema=schema, priority=priority))
         return rows
+
+    async def get_df_async(self, sql: str, **kwargs):
+        """
+        Coroutine to execute DML select queries on executor thread without
+        blocking event loop. Accept arguments of get_df.
+
+        *******
+        Return:
+        -------
+
+            rows:           Pandas DataFrame or iterator of chunks.
+        """
+
+        return await self._run_async("get_df", dict(sql=sql, **kwargs))
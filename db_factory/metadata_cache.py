@@ -0,0 +1,323 @@
+#!/usr/bin/env python
+
+"""
+File holds the module to cache reflected table metadata of database, so
+table existence and columns are not queried from catalog on every load.
+Cache can be persisted to local file of JSON column specs for fast restarts.
+"""
+
+import os
+import re
+import json
+import logging
+import threading
+from sqlalchemy import Column
+from sqlalchemy import MetaData
+from sqlalchemy import Table
+from sqlalchemy import types as satypes
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import NoSuchTableError
+from .tenant import current_schema
+
+logger = logging.getLogger(__name__)
+
+# Statements changing the schema of database.
+DDL_PATTERN = re.compile(r"^\s*(create|alter|drop|truncate|rename)\b",
+                         re.IGNORECASE)
+# Table name of DDL statement, optionally qualified by schema and quoted.
+DDL_TABLE_PATTERN = re.compile(
+    r"\btable\s+(?:if\s+(?:not\s+)?exists\s+)?([\w\"`\[\].]+)",
+    re.IGNORECASE)
+# Journal records kept beyond cached tables before cache file is compacted.
+COMPACT_THRESHOLD = 100
+
+
+class SchemaCache(object):
+    """
+    Class handle the cache of reflected SQLAlchemy Table objects per
+    connection identity, schema and table. Tables are reflected lazily on
+    first use and invalidated on DDL issued through the manager. Cache file
+    is a journal of JSON lines: reflected tables and invalidations are
+    appended, and file is only rewritten when it is compacted. Column types
+    of tables loaded from file are resolved by type name of dialect, without
+    length or precision.
+
+    ********
+    Methods:
+    --------
+
+        __init__:       Initaization functions, holds SQLAlchemy engine.
+        get_table:      Method to return the cached or reflected table.
+        has_table:      Method to check if table exist using the cache.
+        invalidate:     Method to remove table or all tables from cache.
+        invalidate_sql: Method to invalidate tables changed by DDL query.
+        save:           Method to rewrite cache file with cached tables.
+        load:           Method to load cache from local file.
+    """
+
+    def __init__(self, engine: Engine, cache_path: str = None):
+        """
+        Initialization function to initlaize the schema cache
+
+        ***********
+        Attributes:
+        -----------
+
+            engine:         (Required) => SQLAlchemy engine of database.
+            cache_path:     (Optional) => Local file to persist the cache.
+                            Loaded at initialization if exist.
+                            Default: None to keep cache in memory.
+        """
+
+        self.engine = engine
+        self.cache_path = cache_path
+        # Password is masked in representation of URL.
+        self.identity = repr(engine.url)
+        self.__lock = threading.RLock()
+        self.__tables = {}
+        if cache_path and os.path.exists(cache_path):
+            self.load()
+
+    def _key(self, table_name: str, schema: str = None):
+        """
+        Method to return the cache key of table. Table of default schema is
+        keyed by schema selected by context, so tenants sharing the engine
+        do not share cache entries.
+        """
+
+        return (self.identity, schema or current_schema(), table_name)
+
+    def get_table(self, table_name: str, schema: str = None):
+        """
+        Method to return the cached table or reflect it from database.
+
+        ***********
+        Attributes:
+        -----------
+
+            table_name:     (Required) => Name of table.
+            schema:         (Optional) => Schema of table.
+                            Default: None for default schema.
+        *******
+        Return:
+        -------
+
+            table:          SQLAlchemy Table object.
+        """
+
+        key = self._key(table_name, schema)
+        with self.__lock:
+            if key in self.__tables:
+                return self.__tables[key]
+
+        logger.info(f'Reflect metadata of table {table_name}')
+        table = Table(table_name, MetaData(), schema=schema,
+                      autoload_with=self.engine)
+        with self.__lock:
+            self.__tables[key] = table
+            self._append([{"key": list(key), "table": self._spec(table)}])
+        return table
+
+    def has_table(self, table_name: str, schema: str = None):
+        """
+        Method to check if table exist. Only tables found are cached.
+
+        ***********
+        Attributes:
+        -----------
+
+            table_name:     (Required) => Name of table.
+            schema:         (Optional) => Schema of table.
+                            Default: None for default schema.
+        *******
+        Return:
+        -------
+
+            is_exist:       True if table exist.
+        """
+
+        try:
+            self.get_table(table_name=table_name, schema=schema)
+            return True
+        except NoSuchTableError:
+            return False
+
+    def invalidate(self, table_name: str = None, schema: str = None):
+        """
+        Method to remove table or all tables from cache.
+
+        ***********
+        Attributes:
+        -----------
+
+            table_name:     (Optional) => Name of table.
+                            Default: None to remove all tables.
+            schema:         (Optional) => Schema of table.
+                            Default: None for default schema.
+        """
+
+        with self.__lock:
+            if table_name is None:
+                keys = list(self.__tables)
+            else:
+                keys = [self._key(table_name, schema)]
+            self._drop([key for key in keys if key in self.__tables])
+
+    def invalidate_sql(self, sql: str):
+        """
+        Method to invalidate tables changed by DDL query. If table name can
+        not be found in DDL query, all tables are invalidated.
+
+        ***********
+        Attributes:
+        -----------
+
+            sql:            (Required) => Plain SQL query.
+        *******
+        Return:
+        -------
+
+            is_ddl:         True if query is DDL.
+        """
+
+        if not DDL_PATTERN.match(str(sql)):
+            return False
+
+        match = DDL_TABLE_PATTERN.search(str(sql))
+        if not match:
+            self.invalidate()
+            return True
+
+        parts = [part.strip('"`[]') for part in match.group(1).split(".")]
+        table_name = parts[-1]
+        schema = parts[-2] if len(parts) > 1 else None
+        logger.info(f'Invalidate cached metadata of table {table_name}')
+        with self.__lock:
+            self._drop([key for key in self.__tables
+                        if key[2].lower() == table_name.lower() and
+                        (schema is None or
+                            (key[1] or "").lower() == schema.lower())])
+        return True
+
+    def _drop(self, keys: list):
+        """
+        Method to remove keys from cache and record their removal in cache
+        file. Caller must hold the lock.
+        """
+
+        for key in keys:
+            self.__tables.pop(key, None)
+        self._append([{"key": list(key), "table": None} for key in keys])
+
+    def _spec(self, table: Table):
+        """
+        Method to return the JSON column spec of table.
+        """
+
+        columns = []
+        for column in table.columns:
+            try:
+                type_name = str(column.type.compile(dialect=self.engine.dialect))
+            except Exception:
+                type_name = None
+            columns.append({"name": column.name,
+                            "type": type_name,
+                            "nullable": column.nullable,
+                            "primary_key": column.primary_key})
+        return {"name": table.name, "schema": table.schema, "columns": columns}
+
+    def _type(self, type_name: str):
+        """
+        Method to return the SQLAlchemy type of dialect type name, or
+        NullType if dialect does not know it.
+        """
+
+        if not type_name:
+            return satypes.NullType()
+
+        names = getattr(self.engine.dialect, "ischema_names", None) or {}
+        base = type_name.split("(")[0].strip()
+        for name in [base, base.upper(), base.lower()]:
+            if name in names:
+                try:
+                    return names[name]()
+                except TypeError:
+                    break
+        return satypes.NullType()
+
+    def _table(self, spec: dict):
+        """
+        Method to build SQLAlchemy Table object from JSON column spec.
+        """
+
+        columns = [Column(column["name"],
+                          self._type(column["type"]),
+                          nullable=column["nullable"],
+                          primary_key=column["primary_key"])
+                   for column in spec["columns"]]
+        return Table(spec["name"], MetaData(), *columns, schema=spec["schema"])
+
+    def _append(self, records: list):
+        """
+        Method to append records at the end of cache file. Caller must hold
+        the lock.
+        """
+
+        if not self.cache_path or not records:
+            return
+
+        with open(self.cache_path, mode="a") as file:
+            for record in records:
+                file.write(json.dumps(record) + "\n")
+
+    def save(self):
+        """
+        Method to rewrite cache file with cached tables only, dropping
+        records of invalidated tables.
+        """
+
+        if not self.cache_path:
+            return
+
+        with self.__lock:
+            temp_path = f"{self.cache_path}.tmp"
+            with open(temp_path, mode="w") as file:
+                for key, table in self.__tables.items():
+                    record = {"key": list(key), "table": self._spec(table)}
+                    file.write(json.dumps(record) + "\n")
+            os.replace(temp_path, self.cache_path)
+
+    def load(self):
+        """
+        Method to load cache from local file by replaying its records.
+        Tables of other connection identity are ignored and unreadable
+        records are skipped. File is compacted once it holds too many
+        records of invalidated tables.
+        """
+
+        tables = {}
+        records = 0
+        try:
+            with open(self.cache_path, mode="r") as file:
+                for line in file:
+                    try:
+                        record = json.loads(line)
+                        key = tuple(record["key"])
+                        if key[0] != self.identity:
+                            continue
+                        records += 1
+                        if record["table"] is None:
+                            tables.pop(key, None)
+                        else:
+                            tables[key] = self._table(record["table"])
+                    except (ValueError, KeyError, TypeError) as err:
+                        logger.warning(f'Skipped unreadable schema cache record: {err}')
+        except (OSError, UnicodeDecodeError) as err:
+            logger.warning(f'Failed to load schema cache, ignored: {err}')
+            return
+
+        with self.__lock:
+            self.__tables = tables
+        logger.info(f'Loaded {len(tables)} tables from schema cache')
+        if records > len(tables) + COMPACT_THRESHOLD:
+            self.save()
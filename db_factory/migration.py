@@ -0,0 +1,441 @@
+#!/usr/bin/env python
+
+"""
+File holds the module to copy table or query result from one database to
+another by streaming chunks between reader and writer threads, so memory
+stay bounded whatever the size of table.
+"""
+
+import os
+import json
+import queue
+import hashlib
+import logging
+import contextvars
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import MetaData
+from sqlalchemy import Table
+from sqlalchemy import text
+from sqlalchemy import inspect
+
+logger = logging.getLogger(__name__)
+
+# Marker put on queue by reader once all chunks are read.
+END_OF_STREAM = object()
+# Seconds to wait on full or empty queue before checking for failures.
+QUEUE_POLL_INTERVAL = 1
+# Rows sampled from source to create target table.
+SAMPLE_ROWS = 1000
+# Prefix of table staging rows of single partition in target.
+STAGE_PREFIX = "db_factory_stage"
+
+
+class TableCopier(object):
+    """
+    Class handle the streaming copy of table or query result between two
+    DatabaseManager. Each partition is read in chunks by reader thread and
+    written by writer threads through a bounded queue. Partitions run in
+    parallel and started and finished partitions are recorded in checkpoint
+    file so an interrupted copy can be resumed. Every partition is written
+    in its own staging table of target and moved in target table in single
+    transaction, so partition interrupted midway is copied again from a
+    fresh staging table and rows target held before the copy are kept.
+
+    ********
+    Methods:
+    --------
+
+        __init__:           Initaization functions, holds the managers.
+        range_partitions:   Method to build range predicates of column.
+        get_target_types:   Method to map column types of source table to
+                            generic SQLAlchemy types of target.
+        copy:               Method to copy table or query in target table.
+    """
+
+    def __init__(self,
+                 source,
+                 target,
+                 chunk_size: int = 100000,
+                 queue_size: int = 4,
+                 writers: int = 1,
+                 parallel: int = 1,
+                 checkpoint_path: str = None):
+        """
+        Initialization function to initlaize the table copier
+
+        ***********
+        Attributes:
+        -----------
+
+            source:             (Required) => DatabaseManager to read from.
+                                Session must be created.
+            target:             (Required) => DatabaseManager to write to.
+                                Session must be created.
+            chunk_size:         (Optional) => Rows per chunk.
+                                Default: 100000
+            queue_size:         (Optional) => Chunks buffered between reader
+                                and writers per partition.
+                                Default: 4
+            writers:            (Optional) => Writer threads per partition.
+                                Default: 1
+            parallel:           (Optional) => Partitions copied in parallel.
+                                Default: 1
+            checkpoint_path:    (Optional) => JSON file recording started
+                                and finished partitions to resume the copy.
+                                File is bound to source, target, table and
+                                query of the copy.
+                                Default: None to not record checkpoints.
+        """
+
+        self.source = source
+        self.target = target
+        self.chunk_size = chunk_size
+        self.queue_size = queue_size
+        self.writers = writers
+        self.parallel = parallel
+        self.checkpoint_path = checkpoint_path
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def range_partitions(column: str, low: int, high: int, count: int):
+        """
+        Method to build predicates splitting the range of column in equal
+        partitions.
+
+        ***********
+        Attributes:
+        -----------
+
+            column:     (Required) => Numeric column to split.
+            low:        (Required) => Minimum value of column.
+            high:       (Required) => Maximum value of column.
+            count:      (Required) => Number of partitions.
+        *******
+        Return:
+        -------
+
+            partitions: List of SQL predicates.
+        """
+
+        step = max((high - low + count) // count, 1)
+        partitions = []
+        for start in range(low, high + 1, step):
+            partitions.append(f"{column} >= {start} AND {column} < {start + step}")
+        return partitions
+
+    def _load_checkpoint(self, copy_key: dict):
+        """
+        Method to return the checkpoint of copy. Checkpoint file of another
+        source, target, table or query is rejected.
+        """
+
+        checkpoint = {"copy": copy_key, "partitions": {}}
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return checkpoint
+
+        with open(self.checkpoint_path, mode="r") as file:
+            saved = json.load(file)
+        if saved.get("copy") != copy_key:
+            msg = f"Checkpoint file {self.checkpoint_path} belong to another copy: {saved.get('copy')}"
+            logger.error(msg)
+            raise ValueError(msg)
+        checkpoint["partitions"] = saved.get("partitions", {})
+        return checkpoint
+
+    def _save_checkpoint(self,
+                         checkpoint: dict,
+                         partition: str,
+                         status: str,
+                         rows: int = None):
+        """
+        Method to record status of partition in checkpoint file atomically.
+        """
+
+        if not self.checkpoint_path:
+            return
+
+        with self.__lock:
+            checkpoint["partitions"][partition] = {"status": status,
+                                                   "rows": rows}
+            temp_path = f"{self.checkpoint_path}.tmp"
+            with open(temp_path, mode="w") as file:
+                json.dump(checkpoint, file, indent=2)
+            os.replace(temp_path, self.checkpoint_path)
+
+    def get_target_types(self, table_name: str, type_map: dict = None):
+        """
+        Method to reflect the source table and map its column types to
+        generic SQLAlchemy types understood by dialect of target.
+
+        ***********
+        Attributes:
+        -----------
+
+            table_name: (Required) => Name of source table.
+            type_map:   (Optional) => Mapping of column name to SQLAlchemy
+                        type overriding the mapped types.
+                        Default: None
+        *******
+        Return:
+        -------
+
+            sql_types:  Dictonary of column name to SQLAlchemy type.
+        """
+
+        table = Table(table_name, MetaData(),
+                      autoload_with=self.source.engine)
+        sql_types = {}
+        for column in table.columns:
+            try:
+                sql_types[column.name] = column.type.as_generic()
+            except (AttributeError, NotImplementedError):
+                logger.info(
+                    f'No generic type for column {column.name}, type is inferred')
+        sql_types.update(type_map or {})
+        return sql_types
+
+    def _prepare_target(self,
+                        query: str,
+                        target_table: str,
+                        exist_action: str,
+                        sql_types: dict):
+        """
+        Method to create, replace or check target table using columns of
+        query. Rows are only sampled when some column types are unknown.
+        """
+
+        sample = self.source.get_df(
+            sql=f"SELECT * FROM ({query}) AS sample LIMIT 0")
+        if any(column not in sql_types for column in sample.columns):
+            sample = self.source.get_df(
+                sql=f"SELECT * FROM ({query}) AS sample LIMIT {SAMPLE_ROWS}")
+        sample.head(0).to_sql(name=target_table,
+                              con=self.target.engine,
+                              if_exists=exist_action,
+                              index=False,
+                              dtype=sql_types or None)
+
+    def _put(self, chunks: queue.Queue, item, failed: threading.Event):
+        """
+        Method to put item on queue unless copy of partition failed.
+        """
+
+        while not failed.is_set():
+            try:
+                chunks.put(item, timeout=QUEUE_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _read(self, query: str, chunks: queue.Queue, failed: threading.Event):
+        """
+        Method run by reader thread putting chunks of query on queue.
+        """
+
+        try:
+            for chunk in self.source.get_df(sql=query,
+                                            chunk_size=self.chunk_size):
+                if not self._put(chunks, chunk, failed):
+                    return
+            for _ in range(self.writers):
+                self._put(chunks, END_OF_STREAM, failed)
+        except Exception:
+            failed.set()
+            raise
+
+    def _write(self,
+               target_table: str,
+               chunks: queue.Queue,
+               failed: threading.Event):
+        """
+        Method run by writer thread appending chunks of queue in target.
+        """
+
+        rows = 0
+        try:
+            while not failed.is_set():
+                try:
+                    chunk = chunks.get(timeout=QUEUE_POLL_INTERVAL)
+                except queue.Empty:
+                    continue
+                if chunk is END_OF_STREAM:
+                    break
+                if len(chunk):
+                    self.target.execute_df(panda_df=chunk,
+                                           table_name=target_table,
+                                           exist_action="append",
+                                           fast_load=True)
+                    rows += len(chunk)
+            return rows
+        except Exception:
+            failed.set()
+            raise
+
+    def _stage_table(self, predicate: str, target_table: str):
+        """
+        Method to return the name of staging table of partition, the same
+        on every run of the copy.
+        """
+
+        digest = hashlib.md5(
+            f"{target_table}\n{predicate}".encode("utf-8")).hexdigest()
+        return f"{STAGE_PREFIX}_{digest[:16]}"
+
+    def _create_stage(self, stage: str, target_table: str):
+        """
+        Method to create empty staging table with columns of target table,
+        dropping the staging table left by interrupted run.
+        """
+
+        preparer = self.target.engine.dialect.identifier_preparer
+        with self.target.engine.begin() as connection:
+            connection.execute(text(
+                f"DROP TABLE IF EXISTS {preparer.quote(stage)}"))
+            connection.execute(text(
+                f"CREATE TABLE {preparer.quote(stage)} AS SELECT * FROM "
+                f"{preparer.quote(target_table)} WHERE 1 = 0"))
+
+    def _move_stage(self, stage: str, target_table: str):
+        """
+        Method to move rows of staging table in target table and drop it in
+        single transaction.
+        """
+
+        preparer = self.target.engine.dialect.identifier_preparer
+        with self.target.engine.begin() as connection:
+            connection.execute(text(
+                f"INSERT INTO {preparer.quote(target_table)} "
+                f"SELECT * FROM {preparer.quote(stage)}"))
+            connection.execute(text(f"DROP TABLE {preparer.quote(stage)}"))
+
+    def _copy_partition(self, query: str, target_table: str):
+        """
+        Method to stream single partition from source to target.
+        """
+
+        chunks = queue.Queue(maxsize=self.queue_size)
+        failed = threading.Event()
+        with ThreadPoolExecutor(max_workers=self.writers + 1) as executor:
+            reader = executor.submit(contextvars.copy_context().run,
+                                     self._read, query, chunks, failed)
+            writers = [executor.submit(contextvars.copy_context().run,
+                                       self._write, target_table,
+                                       chunks, failed)
+                       for _ in range(self.writers)]
+            reader.result()
+            rows = sum(writer.result() for writer in writers)
+        return rows
+
+    def copy(self,
+             target_table: str,
+             table_name: str = None,
+             sql: str = None,
+             exist_action: str = "append",
+             partitions: list = None,
+             type_map: dict = None):
+        """
+        Method to copy table or query result of source in target table.
+
+        ***********
+        Attributes:
+        -----------
+
+            target_table:   (Required) => Name of table in target.
+            table_name:     (Optional) => Name of source table. Column types
+                            are reflected and mapped to the target dialect.
+            sql:            (Optional) => DML select query of source. One of
+                            table_name or sql is required.
+            exist_action:   (Optional) => Action on if target table already
+                            exist. Ignored on resume from checkpoint.
+                            Default: append mode. Others modes are replace
+                            or fail.
+            partitions:     (Optional) => List of SQL predicates splitting
+                            source rows. Partitions are copied in parallel.
+                            Default: None to copy as single partition.
+            type_map:       (Optional) => Mapping of column name to
+                            SQLAlchemy type of target table.
+                            Default: None
+        *******
+        Return:
+        -------
+
+            summary:        Dictonary of partition to copied rows.
+        """
+
+        if not table_name and not sql:
+            msg = f"One of table_name or sql is required to copy"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        try:
+            preparer = self.source.engine.dialect.identifier_preparer
+            query = sql or f"SELECT * FROM {preparer.quote(table_name)}"
+            sql_types = dict(type_map or {})
+            if table_name:
+                sql_types = self.get_target_types(table_name=table_name,
+                                                  type_map=type_map)
+
+            copy_key = {"source": repr(self.source.engine.url),
+                        "target": repr(self.target.engine.url),
+                        "target_table": target_table,
+                        "query": query}
+            checkpoint = self._load_checkpoint(copy_key)
+            done = [predicate for predicate, state
+                    in checkpoint["partitions"].items()
+                    if state["status"] == "done"]
+            if checkpoint["partitions"]:
+                logger.info(
+                    f'Resume copy, {len(done)} partitions already done')
+            else:
+                self._prepare_target(query=query,
+                                     target_table=target_table,
+                                     exist_action=exist_action,
+                                     sql_types=sql_types)
+
+            pending = {}
+            for predicate in partitions or ["1 = 1"]:
+                if predicate in done:
+                    continue
+                pending[predicate] = \
+                    f"SELECT * FROM ({query}) AS part WHERE {predicate}"
+
+            def run(predicate: str):
+                stage = self._stage_table(predicate=predicate,
+                                          target_table=target_table)
+                state = checkpoint["partitions"].get(predicate, {})
+                if state.get("status") == "staged":
+                    # Partition was fully staged. Staging table is dropped
+                    # by the move, so its absence means the move committed.
+                    rows = state["rows"]
+                    if inspect(self.target.engine).has_table(stage):
+                        self._move_stage(stage=stage,
+                                         target_table=target_table)
+                else:
+                    self._save_checkpoint(checkpoint, predicate, "started")
+                    self._create_stage(stage=stage,
+                                       target_table=target_table)
+                    rows = self._copy_partition(query=pending[predicate],
+                                                target_table=stage)
+                    self._save_checkpoint(checkpoint, predicate, "staged",
+                                          rows)
+                    self._move_stage(stage=stage, target_table=target_table)
+                self._save_checkpoint(checkpoint, predicate, "done", rows)
+                logger.info(f'Copied {rows} rows of partition: {predicate}')
+                return rows
+
+            with ThreadPoolExecutor(max_workers=self.parallel) as executor:
+                futures = {predicate: executor.submit(
+                    contextvars.copy_context().run, run, predicate)
+                    for predicate in pending}
+                summary = {predicate: future.result()
+                           for predicate, future in futures.items()}
+            return summary
+        except Exception as err:
+            logger.exception(f'Failed to copy table between databases: {err}')
+            traceback.print_tb(err.__traceback__)
+
+            # Propagate the exception
+            raise
@@ -5,14 +5,38 @@ File holds the module to execute the DML or DDL queries on database.
 DML queries will automatically get commited as soon as query executed.
 """
 
+import io
+import time
 import logging
 import traceback
 import pandas
 from pandas import DataFrame
+from sqlalchemy import text
+from sqlalchemy.exc import NoSuchTableError
 from sqlalchemy.orm import scoped_session
 
+from .common.serializer import CSV_NULL
+from .common.serializer import Serializer
+from .common.type_mapper import TypeMapper
+from .common.result_format import ResultFormat
+from .common.chunk_tuner import AUTO
+from .common.chunk_tuner import MIN_ROWS
+from .common.chunk_tuner import ChunkTuner
+from .retry import RetryPolicy
+from .snowflake_loader import SnowflakeLoader
+from .bigquery_loader import BigQueryLoader
+from .metadata_cache import SchemaCache
+from .sqlite_profile import SqliteProfile
+from .duckdb_operations import DuckDBOperations
+from .table_swap import TableSwapper
+from .timeout import CancelHandle
+from .timeout import StatementTimeout
+
 logger = logging.getLogger(__name__)
 
+# Rows fetched per chunk when DataFrame is optimized during fetch.
+OPTIMIZE_CHUNK_SIZE = 100000
+
 
 class Operations(object):
     """
@@ -28,9 +52,17 @@ class Operations(object):
         execute:    Single function to execute DML or DDL queries.
                     Support for Pandas DataFrame object to create, replace
                     or append table with DataFrame table objects.
+        bulk_load:  Function to load Pandas DataFrame using vectorized
+                    serialization and COPY or DBAPI executemany, or
+                    Parquet files staged with COPY INTO for Snowflake.
     """
 
-    def __init__(self, session: scoped_session):
+    def __init__(self,
+                 session: scoped_session,
+                 bigquery_loader: BigQueryLoader = None,
+                 schema_cache: SchemaCache = None,
+                 duckdb_operations: DuckDBOperations = None,
+                 chunk_memory_limit: int = None):
         """
         Initialization function to initlaize the default class object
 
@@ -38,10 +70,28 @@ class Operations(object):
         Attributes:
         -----------
 
-            session:    (Required) => SQLAlchemy session object.
+            session:            (Required) => SQLAlchemy scoped session or
+                                callable returning CoreSession.
+            bigquery_loader:    (Optional) => BigQuery loader used for
+                                DataFrame loads and reads of BigQuery.
+                                Default: None
+            schema_cache:       (Optional) => Cache of reflected tables used
+                                to skip catalog queries and invalidated on
+                                DDL.
+                                Default: None
+            duckdb_operations:  (Optional) => DuckDB operations used for
+                                DataFrame loads and reads of DuckDB.
+                                Default: None
+            chunk_memory_limit: (Optional) => Memory ceiling in bytes of
+                                chunk sized with chunk_size auto.
+                                Default: None to use 64 MB.
         """
 
         self.session = session()
+        self.bigquery_loader = bigquery_loader
+        self.schema_cache = schema_cache
+        self.duckdb_operations = duckdb_operations
+        self.chunk_memory_limit = chunk_memory_limit
         logger.info(
             f'Database operation is initialized for {self.session.bind.name}')
 
@@ -51,7 +101,20 @@ class Operations(object):
                 table_name: str = None,
                 chunk_size: int = None,
                 exist_action: str = "append",
-                get_df: bool = False):
+                get_df: bool = False,
+                dtype: dict = None,
+                infer_dtype: bool = False,
+                fast_load: bool = False,
+                parse_dates: list = None,
+                downcast: bool = False,
+                columns: list = None,
+                timeout: float = None,
+                cancel_handle: CancelHandle = None,
+                defer_indexes: bool = False,
+                params: dict = None,
+                result_format: str = "rows",
+                fetch_size: int = None,
+                atomic_swap: bool = False):
         """
         Single function to execute DML or DDL queries. Support for Pandas
         DataFrame object to create, replace or append table with DataFrame
@@ -75,7 +138,9 @@ class Operations(object):
                             panda_df only.
             chunk_size:     (Optional) => chunck size to update the table in
                             chunks for performance rather than insert row one
-                            by one. Used in case of panda_df only.
+                            by one, or rows per chunk of get_df iterator.
+                            auto size chunks from row width and memory
+                            ceiling and tune them by throughput.
                             Default: 1 row at a time.
             exist_action:   (Optional) => Action on if table already exist.
                             Used in case of panda_df only.
@@ -85,6 +150,62 @@ class Operations(object):
                             return Pandas DataFrame.
                             Default: False to return rows. True will return
                             Pandas Dataframe.
+            dtype:          (Optional) => Mapping of column name to
+                            SQLAlchemy type used when table is created in
+                            case of panda_df. Mapping of column name to
+                            Pandas dtype applied per chunk in case of get_df.
+                            Default: None to let Pandas infer the types.
+            infer_dtype:    (Optional) => Derive compact column types from
+                            DataFrame dtypes and value ranges for columns
+                            missing in dtype. Used in case of panda_df only.
+                            Default: False
+            fast_load:      (Optional) => Serialize DataFrame column wise and
+                            load with COPY or DBAPI executemany instead of
+                            row by row conversion of Pandas to_sql.
+                            Used in case of panda_df only.
+                            Default: False
+            parse_dates:    (Optional) => List of columns to parse as dates
+                            or dictonary of column to format.
+                            Used in case of get_df only.
+                            Default: None
+            downcast:       (Optional) => Narrow numeric columns, use
+                            nullable integer dtypes and store low-cardinality
+                            strings as category per chunk during fetch.
+                            Used in case of get_df only.
+                            Default: False
+            columns:        (Optional) => List of columns to keep from the
+                            result. Query is wrapped so other columns are
+                            not fetched. Used in case of get_df only.
+                            Default: None to keep all columns.
+            timeout:        (Optional) => Seconds allowed for the query,
+                            applied with native statement timeout of
+                            database. Used in case of sql only.
+                            Default: None for no timeout.
+            cancel_handle:  (Optional) => Handle bound to the connection
+                            running query so query can be cancelled from
+                            other thread. Used in case of sql only.
+                            Default: None
+            defer_indexes:  (Optional) => Drop indexes of SQLite table before
+                            fast_load and create them after rows are loaded
+                            in the same transaction. Used in case of
+                            panda_df only.
+                            Default: False
+            params:         (Optional) => Dictonary of bind parameters of
+                            sql referenced as :name in query. Used in case of
+                            sql only.
+                            Default: None
+            result_format:  (Optional) => Format of rows of sql. One of rows,
+                            tuples, columns, iterator, scalar or first. Used
+                            in case of sql without get_df only.
+                            Default: rows for list of SQLAlchemy Row.
+            fetch_size:     (Optional) => Rows per fetchmany call of tuples,
+                            columns and iterator formats.
+                            Default: None to use 10000 rows.
+            atomic_swap:    (Optional) => With replace, load unindexed
+                            staging table, rebuild indexes and constraints
+                            of table on it and swap it in atomically. Used
+                            in case of panda_df only.
+                            Default: False
         *******
         Return:
         -------
@@ -94,6 +215,7 @@ class Operations(object):
         """
 
         rows = None
+        cleanups = []
         try:
             if isinstance(panda_df, DataFrame):
                 if len(panda_df):
@@ -103,11 +225,30 @@ class Operations(object):
                         f'Table name: {table_name} and action on table is already present: {exist_action}')
                     logger.info(f'Chunk size to insert data is: {chunk_size}')
 
-                    panda_df.to_sql(name=table_name,
-                                    con=self.session.bind,
-                                    if_exists=exist_action,
-                                    chunksize=chunk_size,
-                                    index=False)
+                    if infer_dtype:
+                        dtype = TypeMapper.infer_sql_types(
+                            panda_df=panda_df,
+                            dialect=self.session.bind.name,
+                            dtype=dtype)
+
+                    def load(name: str, action: str):
+                        return self._load_df(panda_df=panda_df,
+                                             table_name=name,
+                                             chunk_size=chunk_size,
+                                             exist_action=action,
+                                             dtype=dtype,
+                                             fast_load=fast_load,
+                                             defer_indexes=defer_indexes)
+
+                    if atomic_swap and exist_action == "replace":
+                        swapper = TableSwapper(engine=self.session.bind)
+                        rows = swapper.load(
+                            table_name=table_name,
+                            load=lambda name: load(name, "replace"))
+                        if self.schema_cache:
+                            self.schema_cache.invalidate(table_name)
+                    else:
+                        rows = load(table_name, exist_action)
                     self.session.commit()
                 else:
                     msg = f"Invalid DataFrame"
@@ -115,27 +256,540 @@ class Operations(object):
                     raise ValueError(msg)
             elif sql:
                 logger.info(f'Got SQL query to execute. Query: {sql}')
+                if self.schema_cache:
+                    self.schema_cache.invalidate_sql(sql)
+                connection = None
+                if timeout or cancel_handle:
+                    # Timeout and cancellation are bound to the connection
+                    # of session so query must run on it.
+                    connection = self.session.connection()
+                    cleanups = self._guard(connection=connection,
+                                           timeout=timeout,
+                                           cancel_handle=cancel_handle)
+
                 if get_df:
-                    rows = pandas.read_sql(sql=sql,
-                                           con=self.session.bind,
-                                           chunksize=chunk_size)
+                    rows = self._read_df(sql=sql,
+                                         chunk_size=chunk_size,
+                                         dtype=dtype,
+                                         parse_dates=parse_dates,
+                                         downcast=downcast,
+                                         columns=columns,
+                                         connection=connection,
+                                         params=params,
+                                         timeout=timeout)
+                    if connection is not None and chunk_size:
+                        # Chunks are fetched lazily from the connection of
+                        # session, so release it once iterator is consumed.
+                        rows = self._close_after(rows, cleanups)
+                        cleanups = None
                 else:
-                    result = self.session.execute(sql)
-
-                    if result.returns_rows:
-                        rows = result.fetchall()
+                    if params:
+                        result = self.session.execute(text(sql), params)
                     else:
+                        result = self.session.execute(sql)
+
+                    is_read_only = RetryPolicy.is_read_only(sql)
+                    if result.returns_rows and result_format == "iterator":
+                        rows = ResultFormat.iterate(result, fetch_size)
+                        if is_read_only:
+                            # Rows are fetched lazily from the connection of
+                            # session, so release it once iterator is
+                            # consumed.
+                            rows = self._close_after(rows, cleanups)
+                            cleanups = None
+                        else:
+                            rows = iter(list(rows))
+                    elif result.returns_rows:
+                        rows = ResultFormat.fetch(result=result,
+                                                  result_format=result_format,
+                                                  fetch_size=fetch_size)
+                    if not result.returns_rows or not is_read_only:
+                        # DML returning rows like RETURNING clause or
+                        # DuckDB row count must be committed as well.
                         self.session.commit()
             else:
                 msg = f"No DDL or DML quesries to execute"
                 logger.error(msg)
                 raise ValueError(msg)
         except Exception as err:
-            logger.exception(f"Failed to execute DDL/DML on database", err)
+            logger.exception(f"Failed to execute DDL/DML on database: {err}")
             traceback.print_tb(err.__traceback__)
 
+            if RetryPolicy.is_disconnect(
+                    err, dialect=self.session.bind.dialect.name):
+                # Discard the connection so pool does not hand it out again
+                self.session.invalidate()
+
             # Propagate the exception
             raise
         finally:
-            self.session.close()
+            if cleanups is not None:
+                self._cleanup(cleanups)
         return rows
+
+    def _load_df(self,
+                 panda_df: DataFrame,
+                 table_name: str,
+                 chunk_size: int,
+                 exist_action: str,
+                 dtype: dict,
+                 fast_load: bool,
+                 defer_indexes: bool):
+        """
+        Function to load Pandas DataFrame in table with the load path of
+        engine. Return the load result.
+        """
+
+        rows = None
+        if self.bigquery_loader:
+            rows = self.bigquery_loader.load_df(
+                panda_df=panda_df,
+                table_name=table_name,
+                exist_action=exist_action)
+        elif self.duckdb_operations:
+            self.duckdb_operations.load_df(
+                panda_df=panda_df,
+                table_name=table_name,
+                exist_action=exist_action,
+                dtype=dtype)
+        elif fast_load:
+            rows = self.bulk_load(panda_df=panda_df,
+                                  table_name=table_name,
+                                  chunk_size=chunk_size,
+                                  exist_action=exist_action,
+                                  dtype=dtype,
+                                  defer_indexes=defer_indexes)
+        elif chunk_size == AUTO:
+            self._to_sql_auto(panda_df=panda_df,
+                              table_name=table_name,
+                              exist_action=exist_action,
+                              dtype=dtype)
+        else:
+            table = self._cached_table(table_name=table_name,
+                                       exist_action=exist_action)
+            if table is not None:
+                size = chunk_size or max(len(panda_df), 1)
+                with self.session.bind.begin() as connection:
+                    for start in range(0, len(panda_df), size):
+                        self._insert(connection=connection,
+                                     table=table,
+                                     panda_df=panda_df.iloc[start:start + size])
+            else:
+                panda_df.to_sql(name=table_name,
+                                con=self.session.bind,
+                                if_exists=exist_action,
+                                chunksize=chunk_size,
+                                index=False,
+                                dtype=dtype)
+            if self.schema_cache and exist_action != "append":
+                self.schema_cache.invalidate(table_name)
+        return rows
+
+    def _cached_table(self, table_name: str, exist_action: str):
+        """
+        Function to return the cached table rows are appended to, or None
+        when table is not cached and Pandas must check it in catalog.
+        """
+
+        if exist_action != "append" or not self.schema_cache:
+            return None
+        try:
+            return self.schema_cache.get_table(table_name)
+        except NoSuchTableError:
+            return None
+
+    def _insert(self, connection, table, panda_df: DataFrame):
+        """
+        Function to insert rows of DataFrame in cached table without catalog
+        queries. Missing values are inserted as NULL like Pandas to_sql.
+        """
+
+        records = panda_df.astype(object).where(panda_df.notna(), None)\
+            .to_dict("records")
+        if records:
+            connection.execute(table.insert(), records)
+
+    def _to_sql_auto(self,
+                     panda_df: DataFrame,
+                     table_name: str,
+                     exist_action: str,
+                     dtype: dict):
+        """
+        Function to load Pandas DataFrame with to_sql in chunks sized by
+        ChunkTuner. First chunk apply exist action, others are appended.
+        Chunks are loaded on one connection in single transaction, so load
+        failing midway leave no partial append.
+        """
+
+        tuner = ChunkTuner(row_bytes=ChunkTuner.estimate_row_bytes(panda_df),
+                           memory_limit=self.chunk_memory_limit)
+        table = self._cached_table(table_name=table_name,
+                                   exist_action=exist_action)
+        start = 0
+        with self.session.bind.begin() as connection:
+            while start < len(panda_df):
+                chunk = panda_df.iloc[start:start + tuner.size]
+                began = time.monotonic()
+                if table is not None:
+                    self._insert(connection=connection,
+                                 table=table,
+                                 panda_df=chunk)
+                else:
+                    chunk.to_sql(name=table_name,
+                                 con=connection,
+                                 if_exists=exist_action if start == 0 else "append",
+                                 index=False,
+                                 dtype=dtype)
+                tuner.record(len(chunk), time.monotonic() - began)
+                start += len(chunk)
+        if self.schema_cache and exist_action != "append":
+            self.schema_cache.invalidate(table_name)
+        logger.info(f'Loaded {len(panda_df)} rows with auto chunk size ending at {tuner.size} rows')
+
+    def _guard(self,
+               connection,
+               timeout: float = None,
+               cancel_handle: CancelHandle = None):
+        """
+        Function to apply statement timeout and bind cancel handle on the
+        connection of session. Return the cleanup callables run after query.
+        """
+
+        cleanups = []
+        if cancel_handle:
+            cancel_handle.bind(connection)
+            cleanups.append(cancel_handle.release)
+        if timeout:
+            statement_timeout = StatementTimeout(connection=connection,
+                                                 timeout=timeout)
+            statement_timeout.apply()
+            cleanups.append(statement_timeout.reset)
+        return cleanups
+
+    def _cleanup(self, cleanups: list):
+        """
+        Function to run the cleanup callables and close the session.
+        """
+
+        try:
+            for cleanup in reversed(cleanups):
+                cleanup()
+        finally:
+            self.session.close()
+
+    def _close_after(self, chunks, cleanups: list):
+        """
+        Function to yield the chunks and cleanup once iterator is consumed
+        or closed.
+        """
+
+        try:
+            for chunk in chunks:
+                yield chunk
+        finally:
+            self._cleanup(cleanups)
+
+    def _read_df(self,
+                 sql: str,
+                 chunk_size: int = None,
+                 dtype: dict = None,
+                 parse_dates: list = None,
+                 downcast: bool = False,
+                 columns: list = None,
+                 connection=None,
+                 params: dict = None,
+                 timeout: float = None):
+        """
+        Function to read the DML select query as Pandas DataFrame applying
+        dtype map and downcast on every chunk as it is fetched, so the full
+        frame never exist with inferred dtypes. Query run on given connection
+        else on a connection of engine. Query with bind parameters is read
+        through SQLAlchemy whatever the engine. Timeout is given to BigQuery
+        query job, as the loader does not read through the connection.
+        """
+
+        if columns:
+            preparer = self.session.bind.dialect.identifier_preparer
+            selected = ", ".join(preparer.quote(column) for column in columns)
+            sql = sql.strip().rstrip(";").rstrip()
+            sql = f"SELECT {selected} FROM ({sql}) AS pruned"
+
+        is_optimize = bool(dtype) or downcast
+        fetch_size = chunk_size
+        if is_optimize and not fetch_size:
+            fetch_size = OPTIMIZE_CHUNK_SIZE
+        if fetch_size == AUTO and not params and \
+                (self.bigquery_loader or self.duckdb_operations):
+            # Arrow batches are sliced locally without round trip per
+            # chunk, so there is no throughput to tune.
+            fetch_size = OPTIMIZE_CHUNK_SIZE
+
+        if fetch_size == AUTO:
+            chunks = self._read_auto(sql=sql,
+                                     connection=connection,
+                                     params=params)
+            if parse_dates:
+                chunks = self._parse_dates(chunks, parse_dates)
+        elif params:
+            chunks = pandas.read_sql(sql=text(sql),
+                                     con=connection or self.session.bind,
+                                     params=params,
+                                     chunksize=fetch_size,
+                                     parse_dates=parse_dates)
+        elif self.bigquery_loader:
+            chunks = self.bigquery_loader.read_df(sql=sql,
+                                                  chunk_size=fetch_size,
+                                                  timeout=timeout)
+            if parse_dates:
+                chunks = self._parse_dates(chunks, parse_dates)
+        elif self.duckdb_operations:
+            chunks = self.duckdb_operations.read_df(sql=sql,
+                                                    chunk_size=fetch_size)
+            if parse_dates:
+                chunks = self._parse_dates(chunks, parse_dates)
+        else:
+            chunks = pandas.read_sql(sql=sql,
+                                     con=connection or self.session.bind,
+                                     chunksize=fetch_size,
+                                     parse_dates=parse_dates)
+        if not is_optimize:
+            return chunks
+
+        optimized = TypeMapper.optimize_chunks(chunks=chunks,
+                                               dtype=dtype,
+                                               downcast=downcast)
+        if chunk_size:
+            return optimized
+        return TypeMapper.concat_df(list(optimized))
+
+    def _read_auto(self, sql: str, connection=None, params: dict = None):
+        """
+        Function to execute query and return iterator of DataFrame chunks
+        fetched with fetchmany, sized from row width of first chunk and
+        memory ceiling and tuned by throughput of every fetch. Query is run
+        before return, so it run within retry, admission and schema of
+        caller.
+        """
+
+        is_owner = connection is None
+        if is_owner:
+            connection = self.session.bind.connect()
+        try:
+            result = connection.execute(text(sql), params or {})
+        except Exception:
+            if is_owner:
+                connection.close()
+            raise
+        return self._iter_auto(result=result,
+                               connection=connection if is_owner else None)
+
+    def _iter_auto(self, result, connection=None):
+        """
+        Function to yield DataFrame chunks of executed result and close the
+        owned connection once iterator is consumed or closed.
+        """
+
+        try:
+            names = list(result.keys())
+            cursor = ResultFormat.get_cursor(result)
+
+            # First chunk is small and only measure width of rows.
+            panda_df = DataFrame.from_records(cursor.fetchmany(MIN_ROWS),
+                                              columns=names)
+            tuner = ChunkTuner(row_bytes=ChunkTuner.estimate_row_bytes(panda_df),
+                               memory_limit=self.chunk_memory_limit)
+            while len(panda_df):
+                yield panda_df
+                began = time.monotonic()
+                panda_df = DataFrame.from_records(cursor.fetchmany(tuner.size),
+                                                  columns=names)
+                tuner.record(len(panda_df), time.monotonic() - began)
+        finally:
+            if connection is not None:
+                connection.close()
+
+    def _parse_dates(self, chunks, parse_dates):
+        """
+        Function to parse date columns of DataFrame or iterator of DataFrames
+        read without Pandas read_sql.
+        """
+
+        def parse(panda_df: DataFrame):
+            formats = parse_dates if isinstance(parse_dates, dict) else \
+                {column: None for column in parse_dates}
+            for column, date_format in formats.items():
+                panda_df[column] = pandas.to_datetime(panda_df[column],
+                                                      format=date_format)
+            return panda_df
+
+        if isinstance(chunks, DataFrame):
+            return parse(chunks)
+        return (parse(chunk) for chunk in chunks)
+
+    @staticmethod
+    def write_rows(cursor,
+                   dialect,
+                   panda_df: DataFrame,
+                   table_name: str,
+                   chunk_size: int = None,
+                   tuner: ChunkTuner = None):
+        """
+        Function to write rows of Pandas DataFrame in existing table on the
+        DBAPI cursor, serialized column wise and sent with COPY FROM STDIN
+        for PostgreSQL, registered as view for DuckDB or with DBAPI
+        executemany for other databases. Transaction is left to the caller.
+
+        ***********
+        Attributes:
+        -----------
+
+            cursor:         (Required) => DBAPI cursor.
+            dialect:        (Required) => SQLAlchemy dialect of database.
+            panda_df:       (Required) => Pandas DataFrame to write.
+            table_name:     (Required) => Name of table.
+            chunk_size:     (Optional) => Number of rows serialized and sent
+                            per batch.
+                            Default: None to send all rows in single batch.
+            tuner:          (Optional) => Tuner sizing every batch by
+                            throughput, in place of chunk_size.
+                            Default: None
+        """
+
+        preparer = dialect.identifier_preparer
+        table = preparer.quote(table_name)
+        columns = ", ".join(preparer.quote(str(column))
+                            for column in panda_df.columns)
+        chunk_size = chunk_size or len(panda_df)
+
+        use_copy = dialect.name == "postgresql" and \
+            (hasattr(cursor, "copy_expert") or dialect.driver == "pg8000")
+        if use_copy:
+            sql = f"COPY {table} ({columns}) FROM STDIN " \
+                f"WITH (FORMAT csv, NULL '{CSV_NULL}')"
+        else:
+            placeholders = Serializer.get_placeholders(
+                paramstyle=dialect.paramstyle,
+                count=len(panda_df.columns))
+            sql = f"INSERT INTO {table} ({columns}) VALUES ({placeholders})"
+
+        is_duckdb = dialect.name == "duckdb"
+        if is_duckdb:
+            # Chunk is registered as view and copied inside DuckDB.
+            view = preparer.quote(f"{table_name}_db_factory_load")
+            sql = f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {view}"
+
+        logger.info(f'Bulk load {len(panda_df)} rows using: {sql}')
+        start = 0
+        while start < len(panda_df):
+            size = tuner.size if tuner else chunk_size
+            chunk = panda_df.iloc[start:start + size]
+            start += len(chunk)
+            began = time.monotonic()
+            if is_duckdb:
+                cursor.register(f"{table_name}_db_factory_load", chunk)
+                cursor.execute(sql)
+                cursor.unregister(f"{table_name}_db_factory_load")
+            elif use_copy:
+                stream = io.BytesIO(Serializer.to_csv_bytes(chunk))
+                if hasattr(cursor, "copy_expert"):
+                    cursor.copy_expert(sql, stream)
+                else:
+                    cursor.execute(sql, stream=stream)
+            else:
+                parameters = Serializer.to_parameters(chunk, dialect=dialect)
+                cursor.executemany(sql, parameters)
+            if tuner:
+                tuner.record(len(chunk), time.monotonic() - began)
+
+    def bulk_load(self,
+                  panda_df: DataFrame,
+                  table_name: str,
+                  chunk_size: int = None,
+                  exist_action: str = "append",
+                  dtype: dict = None,
+                  defer_indexes: bool = False):
+        """
+        Function to load Pandas DataFrame using vectorized serialization.
+        Table is created or replaced by Pandas using an empty frame, then
+        rows are serialized column wise and sent with COPY FROM STDIN for
+        PostgreSQL or with DBAPI executemany for other databases. Snowflake
+        load Parquet files through temporary internal stage and COPY INTO.
+
+        ***********
+        Attributes:
+        -----------
+
+            panda_df:       (Required) => Pandas DataFrame table object to
+                            load in table.
+            table_name:     (Required) => Name of table.
+            chunk_size:     (Optional) => Number of rows serialized and sent
+                            per batch, or auto to tune it by throughput.
+                            Default: None to send all rows in single batch.
+            exist_action:   (Optional) => Action on if table already exist.
+                            Default: append mode. Others modes are replace
+                            or fail.
+            dtype:          (Optional) => Mapping of column name to
+                            SQLAlchemy type used when table is created.
+                            Default: None to let Pandas infer the types.
+            defer_indexes:  (Optional) => Drop indexes of SQLite table before
+                            load and create them after rows are loaded in
+                            the same transaction.
+                            Default: False
+        *******
+        Return:
+        -------
+
+            results:        Load result per staged file for Snowflake else
+                            None.
+        """
+
+        engine = self.session.bind
+        is_cached = exist_action == "append" and self.schema_cache and \
+            self.schema_cache.has_table(table_name)
+        if not is_cached:
+            # Empty frame carry no values, so types of object columns are
+            # derived from rows like Pandas to_sql does.
+            panda_df.head(0).to_sql(
+                name=table_name,
+                con=engine,
+                if_exists=exist_action,
+                index=False,
+                dtype=TypeMapper.infer_object_types(panda_df, dtype=dtype))
+            if self.schema_cache:
+                self.schema_cache.invalidate(table_name)
+
+        tuner = None
+        if chunk_size == AUTO:
+            tuner = ChunkTuner(row_bytes=ChunkTuner.estimate_row_bytes(panda_df),
+                               memory_limit=self.chunk_memory_limit)
+            # Snowflake stage files of fixed size, sized from row width.
+            chunk_size = tuner.size
+
+        if engine.dialect.name == "snowflake":
+            loader = SnowflakeLoader(connection=self.session.connection())
+            return loader.load(panda_df=panda_df,
+                               table_name=table_name,
+                               chunk_size=chunk_size)
+
+        connection = engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            indexes = []
+            if defer_indexes and engine.dialect.name == "sqlite":
+                indexes = SqliteProfile.drop_indexes(cursor, table_name)
+
+            self.write_rows(cursor=cursor,
+                            dialect=engine.dialect,
+                            panda_df=panda_df,
+                            table_name=table_name,
+                            chunk_size=chunk_size,
+                            tuner=tuner)
+
+            SqliteProfile.create_indexes(cursor, indexes)
+            cursor.close()
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
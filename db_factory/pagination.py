@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+
+"""
+File holds the module of keyset pagination walking table or query ordered
+by unique key, so every page cost the same whatever its position and no
+server side cursor is kept open between pages.
+"""
+
+import logging
+import contextvars
+import numpy
+import pandas
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class KeysetPaginator(object):
+    """
+    Class handle the keyset pagination of DatabaseManager. Each page is
+    selected with key greater than last key of previous page, ordered by
+    key and limited to page size. Next page is fetched on background
+    thread while consumer process current page.
+
+    ********
+    Methods:
+    --------
+
+        __init__:       Initaization functions, holds manager and key.
+        get_page_sql:   Method to return query of page after last key.
+        iterate:        Method to yield pages as DataFrames or row batches.
+    """
+
+    def __init__(self,
+                 manager,
+                 key_columns: list,
+                 page_size: int = 10000,
+                 prefetch: bool = True):
+        """
+        Initialization function to initlaize the keyset paginator
+
+        ***********
+        Attributes:
+        -----------
+
+            manager:        (Required) => DatabaseManager to read from.
+            key_columns:    (Required) => Column or list of columns of unique
+                            key, in order of sort.
+            page_size:      (Optional) => Rows per page.
+                            Default: 10000
+            prefetch:       (Optional) => Fetch next page on background
+                            thread.
+                            Default: True
+        """
+
+        if isinstance(key_columns, str):
+            key_columns = [key_columns]
+        self.manager = manager
+        self.key_columns = list(key_columns)
+        self.page_size = page_size
+        self.prefetch = prefetch
+
+    def get_page_sql(self, query: str, is_first: bool):
+        """
+        Method to return the query of page after last key. Composite key is
+        compared column by column so predicate work on every dialect:
+        a > :k0 OR (a = :k0 AND b > :k1).
+
+        ***********
+        Attributes:
+        -----------
+
+            query:      (Required) => DML select query to paginate.
+            is_first:   (Required) => True for first page without last key.
+        *******
+        Return:
+        -------
+
+            sql:        Query of page with :k0, :k1... bind parameters.
+        """
+
+        order = ", ".join(self.key_columns)
+        predicate = ""
+        if not is_first:
+            terms = []
+            for index, column in enumerate(self.key_columns):
+                equals = [f"{self.key_columns[position]} = :k{position}"
+                          for position in range(index)]
+                terms.append(" AND ".join(equals + [f"{column} > :k{index}"]))
+            predicate = "WHERE " + " OR ".join(f"({term})" for term in terms)
+        return f"SELECT * FROM ({query}) AS page_src {predicate} " \
+            f"ORDER BY {order} LIMIT {int(self.page_size)}"
+
+    @staticmethod
+    def _to_param(value):
+        """
+        Method to convert key value of DataFrame to driver native value.
+        """
+
+        if isinstance(value, (pandas.Timestamp, numpy.datetime64)):
+            return pandas.Timestamp(value).to_pydatetime()
+        if isinstance(value, numpy.generic):
+            return value.item()
+        return value
+
+    def _fetch(self, query: str, last_key: list, as_frame: bool, kwargs: dict):
+        """
+        Method to fetch page after last key and return it with its last key.
+        """
+
+        sql = self.get_page_sql(query, is_first=last_key is None)
+        params = None
+        if last_key is not None:
+            params = {f"k{index}": value for index, value in enumerate(last_key)}
+
+        if as_frame:
+            page = self.manager.get_df(sql=sql, params=params, **kwargs)
+            if not len(page):
+                return page, None
+            last = page.iloc[-1]
+            return page, [self._to_param(last[column])
+                          for column in self.key_columns]
+
+        page = self.manager.execute_sql(sql=sql, params=params, **kwargs)
+        if not page:
+            return page, None
+        last = page[-1]
+        return page, [last[column] for column in self.key_columns]
+
+    def iterate(self,
+                table_name: str = None,
+                sql: str = None,
+                as_frame: bool = True,
+                start_after: list = None,
+                **kwargs):
+        """
+        Method to yield pages of table or query ordered by key.
+
+        ***********
+        Attributes:
+        -----------
+
+            table_name:     (Optional) => Name of table to walk.
+            sql:            (Optional) => DML select query to walk. One of
+                            table_name or sql is required.
+            as_frame:       (Optional) => Yield Pandas DataFrame per page.
+                            Default: True. False yield list of rows.
+            start_after:    (Optional) => Key values to resume after.
+                            Default: None to start from first row.
+            kwargs:         (Optional) => Extra arguments of get_df like
+                            dtype, or of execute_sql when as_frame is False.
+        *******
+        Return:
+        -------
+
+            pages:          Iterator of pages.
+        """
+
+        if not table_name and not sql:
+            msg = f"One of table_name or sql is required for pagination"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        query = sql or f"SELECT * FROM {table_name}"
+        last_key = list(start_after) if start_after is not None else None
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(contextvars.copy_context().run,
+                                     self._fetch, query, last_key,
+                                     as_frame, kwargs)
+            while future is not None:
+                page, last_key = future.result()
+                if last_key is None:
+                    break
+                is_full = len(page) >= self.page_size
+                future = None
+                if is_full and self.prefetch:
+                    # Next page only depends on last key, so it is fetched
+                    # while consumer process current page.
+                    future = executor.submit(contextvars.copy_context().run,
+                                             self._fetch, query, last_key,
+                                             as_frame, kwargs)
+                logger.info(f'Fetched page ending at key {last_key}')
+                yield page
+                if not is_full:
+                    break
+                if future is None:
+                    future = executor.submit(contextvars.copy_context().run,
+                                             self._fetch, query, last_key,
+                                             as_frame, kwargs)
@@ -0,0 +1,367 @@
+#!/usr/bin/env python
+
+"""
+File holds the module to retry database operations failing with transient
+errors like failover, dropped connection, deadlock or serialization failure
+using jittered exponential backoff and a retry budget.
+"""
+
+import re
+import time
+import random
+import logging
+import threading
+from sqlalchemy.exc import DBAPIError
+
+logger = logging.getLogger(__name__)
+
+# SQLSTATE codes of transient errors (serialization, deadlock, shutdown,
+# connection failure and too many connections).
+TRANSIENT_SQLSTATE = ["40001", "40P01", "57P01", "57P02", "57P03",
+                      "08000", "08001", "08003", "08004", "08006", "53300"]
+# SQLSTATE codes of errors where connection is no longer usable.
+DISCONNECT_SQLSTATE = ["57P01", "57P02", "57P03",
+                       "08000", "08001", "08003", "08004", "08006"]
+# MySQL / MariaDB error codes of transient errors (deadlock, lock wait
+# timeout, server gone away, lost connection, can't connect, too many
+# connections).
+TRANSIENT_MYSQL_CODE = [1213, 1205, 2006, 2013, 2003, 1040]
+DISCONNECT_MYSQL_CODE = [2006, 2013, 2003]
+# Transient and disconnect error codes per SQLAlchemy dialect name. Codes
+# of other dialects are never matched, as driver numbers overlap.
+TRANSIENT_CODE = {
+    "postgresql": TRANSIENT_SQLSTATE,
+    "mysql": TRANSIENT_MYSQL_CODE,
+    "mariadb": TRANSIENT_MYSQL_CODE,
+}
+DISCONNECT_CODE = {
+    "postgresql": DISCONNECT_SQLSTATE,
+    "mysql": DISCONNECT_MYSQL_CODE,
+    "mariadb": DISCONNECT_MYSQL_CODE,
+}
+# Message patterns of transient errors per SQLAlchemy dialect name. HTTP
+# statuses only match as whole words, so numbers in data do not.
+TRANSIENT_MESSAGE = {
+    "snowflake": [r"\b429\b", "too many requests", "throttl",
+                  "service unavailable", "connection reset"],
+    "bigquery": ["ratelimitexceeded", "backenderror", "internalerror",
+                 r"\b503\b", "service unavailable"],
+    "sqlite": ["database is locked", "database table is locked"],
+}
+# Statements safe to retry without side effects.
+READ_ONLY_STATEMENT = ["select", "with", "show", "describe", "desc",
+                       "explain", "values"]
+# Keywords of statements modifying data, like data-modifying CTE or SELECT
+# INTO. Row locking clauses FOR UPDATE and FOR NO KEY UPDATE are reads.
+MODIFYING_PATTERN = re.compile(
+    r"\b(insert|delete|merge|into|truncate)\b|(?<!for )(?<!key )\bupdate\b")
+# String literals and comments, ignored when looking for keywords.
+LITERAL_PATTERN = re.compile(r"'(?:[^']|'')*'|--[^\n]*|/\*.*?\*/", re.DOTALL)
+
+
+class RetryPolicy(object):
+    """
+    Class handle the retry of database operations on transient errors.
+    Errors are classified per dialect, idempotent operations are retried
+    with jittered exponential backoff while retry budget allow it.
+
+    ********
+    Methods:
+    --------
+
+        __init__:           Initaization functions.
+        get_error_code:     Method to return SQLSTATE or driver error code
+                            of error.
+        is_transient:       Method to check if error is transient and
+                            operation can be retried.
+        is_disconnect:      Method to check if error made the connection
+                            unusable.
+        is_read_only:       Method to check if SQL statement is read only.
+        get_delay:          Method to return the backoff delay of attempt.
+        call:               Method to execute function with retries.
+        get_metrics:        Method to return the retry counters.
+    """
+
+    def __init__(self,
+                 max_retries: int = 3,
+                 base_delay: float = 0.1,
+                 max_delay: float = 5.0,
+                 retry_budget: float = 10.0,
+                 budget_refill: float = 0.1):
+        """
+        Initialization function to initlaize the retry policy
+
+        ***********
+        Attributes:
+        -----------
+
+            max_retries:    (Optional) => Maximum retries per operation.
+                            Default: 3
+            base_delay:     (Optional) => Seconds of backoff of first retry.
+                            Doubled on every retry.
+                            Default: 0.1
+            max_delay:      (Optional) => Maximum seconds of backoff.
+                            Default: 5.0
+            retry_budget:   (Optional) => Retries allowed across all
+                            operations before retries stop. Every retry
+                            consume one token.
+                            Default: 10.0
+            budget_refill:  (Optional) => Tokens given back to budget on
+                            every successful operation.
+                            Default: 0.1
+        """
+
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_budget = retry_budget
+        self.budget_refill = budget_refill
+        self.__tokens = retry_budget
+        self.__lock = threading.Lock()
+        self.__metrics = {"operations": 0,
+                          "retries": 0,
+                          "recovered": 0,
+                          "failures": 0,
+                          "budget_exhausted": 0}
+
+    @staticmethod
+    def get_error_code(err: Exception):
+        """
+        Method to return SQLSTATE or driver error code of error.
+
+        ***********
+        Attributes:
+        -----------
+
+            err:    (Required) => Exception raised by operation.
+        *******
+        Return:
+        -------
+
+            code:   SQLSTATE string, driver error number or None.
+        """
+
+        orig = err.orig if isinstance(err, DBAPIError) else err
+        for attribute in ["pgcode", "sqlstate"]:
+            code = getattr(orig, attribute, None)
+            if code:
+                return code
+
+        args = getattr(orig, "args", None) or ()
+        if args and isinstance(args[0], dict):
+            # pg8000 keep error fields of server response in a dictonary
+            return args[0].get("C")
+        if args and isinstance(args[0], int):
+            return args[0]
+        return getattr(orig, "errno", None)
+
+    @staticmethod
+    def _codes(codes: dict, dialect: str = None):
+        """
+        Method to return the error codes of dialect, or codes of every
+        dialect when dialect is unknown.
+        """
+
+        if dialect is None:
+            return [code for items in codes.values() for code in items]
+        return codes.get(dialect, [])
+
+    @staticmethod
+    def is_disconnect(err: Exception, dialect: str = None):
+        """
+        Method to check if error made the connection unusable.
+
+        ***********
+        Attributes:
+        -----------
+
+            err:        (Required) => Exception raised by operation.
+            dialect:    (Optional) => SQLAlchemy dialect name of database.
+                        Default: None to check codes of every dialect.
+        *******
+        Return:
+        -------
+
+            is_disconnect:  True if connection should be invalidated.
+        """
+
+        if isinstance(err, DBAPIError) and err.connection_invalidated:
+            return True
+
+        code = RetryPolicy.get_error_code(err)
+        return code is not None and \
+            code in RetryPolicy._codes(DISCONNECT_CODE, dialect)
+
+    @staticmethod
+    def is_transient(err: Exception, dialect: str = None):
+        """
+        Method to check if error is transient and operation can be retried.
+
+        ***********
+        Attributes:
+        -----------
+
+            err:        (Required) => Exception raised by operation.
+            dialect:    (Optional) => SQLAlchemy dialect name of database.
+                        Default: None to check codes of every dialect
+                        without messages.
+        *******
+        Return:
+        -------
+
+            is_transient:   True if operation can be retried.
+        """
+
+        if RetryPolicy.is_disconnect(err, dialect=dialect):
+            return True
+
+        code = RetryPolicy.get_error_code(err)
+        if code is not None and \
+                code in RetryPolicy._codes(TRANSIENT_CODE, dialect):
+            return True
+
+        message = str(err).lower()
+        return any(re.search(pattern, message)
+                   for pattern in TRANSIENT_MESSAGE.get(dialect, []))
+
+    @staticmethod
+    def is_read_only(sql: str):
+        """
+        Method to check if SQL statement is read only and safe to retry.
+        Statements writing data, like data-modifying CTE, are not.
+
+        ***********
+        Attributes:
+        -----------
+
+            sql:    (Required) => Plain SQL statement.
+        *******
+        Return:
+        -------
+
+            is_read_only:   True if statement is read only.
+        """
+
+        words = str(sql).strip().lstrip("(").split(None, 1)
+        if not words or words[0].lower() not in READ_ONLY_STATEMENT:
+            return False
+
+        statement = " ".join(LITERAL_PATTERN.sub(" ", str(sql)).lower().split())
+        return MODIFYING_PATTERN.search(statement) is None
+
+    def get_delay(self, attempt: int):
+        """
+        Method to return the backoff delay of attempt using full jitter.
+
+        ***********
+        Attributes:
+        -----------
+
+            attempt:    (Required) => Retry attempt starting from 0.
+        *******
+        Return:
+        -------
+
+            delay:      Seconds to wait before retry.
+        """
+
+        ceiling = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    def _acquire_token(self):
+        """
+        Method to consume one retry token from budget.
+        """
+
+        with self.__lock:
+            if self.__tokens < 1:
+                self.__metrics["budget_exhausted"] += 1
+                return False
+            self.__tokens -= 1
+            self.__metrics["retries"] += 1
+            return True
+
+    def _refill(self):
+        """
+        Method to give back tokens to budget on success.
+        """
+
+        with self.__lock:
+            self.__tokens = min(self.retry_budget,
+                                self.__tokens + self.budget_refill)
+
+    def _record(self, name: str, refill: bool = False):
+        """
+        Method to increment counter and refill budget on success.
+        """
+
+        with self.__lock:
+            self.__metrics[name] += 1
+        if refill:
+            self._refill()
+
+    def call(self,
+             func,
+             idempotent: bool = True,
+             dialect: str = None):
+        """
+        Method to execute function and retry it on transient errors.
+
+        ***********
+        Attributes:
+        -----------
+
+            func:           (Required) => Function without arguments
+                            executing the database operation.
+            idempotent:     (Optional) => True if operation can be repeated
+                            without side effects. Non idempotent operations
+                            are never retried.
+                            Default: True
+            dialect:        (Optional) => SQLAlchemy dialect name of database
+                            used to classify errors.
+                            Default: None
+        *******
+        Return:
+        -------
+
+            result:         Result of function.
+        """
+
+        self._record("operations")
+        attempt = 0
+        while True:
+            try:
+                result = func()
+                if attempt:
+                    self._record("recovered", refill=True)
+                else:
+                    self._refill()
+                return result
+            except Exception as err:
+                is_retry = idempotent and attempt < self.max_retries and \
+                    RetryPolicy.is_transient(err, dialect=dialect)
+                if not is_retry or not self._acquire_token():
+                    self._record("failures")
+                    raise
+
+                delay = self.get_delay(attempt)
+                attempt += 1
+                logger.warning(
+                    f'Transient database error, retry {attempt} of '
+                    f'{self.max_retries} in {delay:.2f} seconds: {err}')
+                time.sleep(delay)
+
+    def get_metrics(self):
+        """
+        Method to return the retry counters.
+
+        *******
+        Return:
+        -------
+
+            metrics:    Dictonary of operations, retries, recovered,
+                        failures and budget_exhausted counters.
+        """
+
+        with self.__lock:
+            return dict(self.__metrics)
@@ -0,0 +1,393 @@
+#!/usr/bin/env python
+
+"""
+File holds the module to route queries and DataFrame loads across many
+identical databases partitioned by hash or range of a key.
+"""
+
+import logging
+import itertools
+import contextvars
+from decimal import Decimal
+import numpy
+import pandas
+from pandas import DataFrame
+from pandas.util import hash_array
+from concurrent.futures import ThreadPoolExecutor
+from .manager import DatabaseManager
+from .executor import QueryExecutor
+from .common.common import Common
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_STRATEGY = ["hash", "range"]
+
+
+class ShardedDatabaseManager(object):
+    """
+    Class holds one DatabaseManager per shard and route execute_sql, get_df
+    and execute_df by shard key. Shard map is given as dictonary or loaded
+    from secret JSON of cloud secret manager service:
+
+        {
+            "strategy": "hash",
+            "key": "tenant_id",
+            "shards": [
+                {"name": "shard_0", "engine_type": "postgres",
+                 "database": "tenants_0", "host": "...", "port": 5432,
+                 "username": "...", "password": "..."},
+                ...
+            ]
+        }
+
+    Range strategy use exclusive "upper" bound of key per shard in
+    ascending order. Last shard may omit it to take every greater key.
+
+    ********
+    Methods:
+    --------
+
+        __init__:           Initaization functions, holds the shard map.
+        load_shard_map:     Method to fetch the shard map from secret.
+        create_session:     Method to create the managers of shards.
+        shard_index:        Method to return shard index of keys.
+        get_manager:        Method to return manager of key.
+        execute_sql:        Function to execute query on shard of key or on
+                            every shard.
+        execute_df:         Function to split DataFrame by shard and load
+                            shards in parallel.
+        get_df:             Function to read DataFrame from shard of key or
+                            gather it from every shard.
+        dispose_session:    Method to dispose sessions of every shard.
+    """
+
+    def __init__(self,
+                 shard_map: dict = None,
+                 secret_id: str = None,
+                 secrete_manager_cloud: str = "aws",
+                 aws_region: str = "us-east-1",
+                 parallel: int = 8,
+                 **manager_kwargs):
+        """
+        Initialization function to initlaize the sharded manager
+
+        ***********
+        Attributes:
+        -----------
+
+            shard_map:              (Optional) => Dictonary of strategy, key
+                                    and shards. One of shard_map or secret_id
+                                    is required.
+            secret_id:              (Optional) => Secret Id containing JSON
+                                    of shard map.
+            secrete_manager_cloud:  (Optional) => Cloud of secret manager.
+                                    Default: is 'aws'
+            aws_region:             (Optional) => AWS region for secret
+                                    manager service.
+                                    Default: us-east-1
+            parallel:               (Optional) => Shards queried or loaded
+                                    in parallel.
+                                    Default: 8
+            manager_kwargs:         (Optional) => DatabaseManager parameters
+                                    common to every shard like pool_size.
+                                    Overridden by values of shard.
+        """
+
+        self.secret_id = secret_id
+        self.secrete_manager_cloud = secrete_manager_cloud
+        self.aws_region = aws_region
+        self.parallel = parallel
+        self.manager_kwargs = manager_kwargs
+        self.shard_map = shard_map
+        self.strategy = None
+        self.key = None
+        self.shards = []
+        self.managers = []
+        self.uppers = None
+
+    def load_shard_map(self):
+        """
+        Method to fetch the shard map from cloud secret manager service
+        unless given at initialization, and validate it.
+        """
+
+        if self.shard_map is None and self.secret_id:
+            logger.info(f'Fetch shard map from cloud secret manager service')
+            self.shard_map = Common.get_secret(
+                secret_id=self.secret_id,
+                secrete_manager_cloud=self.secrete_manager_cloud,
+                aws_region=self.aws_region)
+
+        # Keys of shard map are case insensitive like keys of secret.
+        self.shard_map = {name.lower(): value
+                          for name, value in (self.shard_map or {}).items()}
+        if not self.shard_map.get("shards"):
+            msg = f"Shard map with at least one shard is required"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        self.strategy = self.shard_map.get("strategy", "hash")
+        if self.strategy not in SUPPORTED_STRATEGY:
+            msg = f"Unsupported strategy '{self.strategy}'. Supported are '{SUPPORTED_STRATEGY}'"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        self.key = self.shard_map.get("key")
+        self.shards = [{name.lower(): value for name, value in shard.items()}
+                       for shard in self.shard_map["shards"]]
+        if self.strategy == "range":
+            uppers = [shard.get("upper") for shard in self.shards[:-1]]
+            if None in uppers or uppers != sorted(uppers):
+                msg = f"Range shards require ascending upper bound except last shard"
+                logger.error(msg)
+                raise ValueError(msg)
+            self.uppers = numpy.asarray(uppers)
+
+    def create_session(self):
+        """
+        Method to create the manager and session of every shard.
+        """
+
+        self.load_shard_map()
+        self.managers = []
+        for shard in self.shards:
+            param = dict(self.manager_kwargs)
+            param.update({name: value for name, value in shard.items()
+                          if name not in ["name", "upper"]})
+            manager = DatabaseManager(**param)
+            manager.create_session()
+            self.managers.append(manager)
+        logger.info(
+            f'Created sessions of {len(self.managers)} shards using {self.strategy} strategy')
+
+    @staticmethod
+    def _integral(values: numpy.ndarray):
+        """
+        Method to return mask of keys holding integral number in int64 or
+        uint64 range, like 5.0 or Decimal 5, hashed as the integer key they
+        equal.
+        """
+
+        if values.dtype.kind == "f":
+            with numpy.errstate(invalid="ignore"):
+                return numpy.isfinite(values) & (values == numpy.floor(values)) & \
+                    (values >= -2.0 ** 63) & (values < 2.0 ** 64)
+        if values.dtype.kind != "O":
+            return numpy.zeros(len(values), dtype=bool)
+
+        def is_integral(value):
+            if not isinstance(value, (int, float, numpy.number, Decimal)):
+                return False
+            try:
+                return value == int(value) and -2 ** 63 <= int(value) < 2 ** 64
+            except (OverflowError, ValueError):
+                return False
+
+        return numpy.fromiter((is_integral(value) for value in values),
+                              dtype=bool, count=len(values))
+
+    @staticmethod
+    def _hash_keys(values: numpy.ndarray):
+        """
+        Method to return stable 64 bit hash of keys, so the same key map to
+        the same shard in every process whatever the dtype of its column.
+        Integer keys are hashed on their 64 bit unsigned view, so uint64
+        keys beyond int64 range do not wrap.
+        """
+
+        if values.dtype.kind == "u":
+            return hash_array(values.astype("uint64"))
+        if values.dtype.kind in "ib":
+            return hash_array(values.astype("int64").view("uint64"))
+
+        integral = ShardedDatabaseManager._integral(values)
+        hashes = numpy.empty(len(values), dtype="uint64")
+        if integral.any():
+            hashes[integral] = hash_array(
+                numpy.array([int(value) % 2 ** 64 for value in values[integral]],
+                            dtype="uint64"))
+        if not integral.all():
+            hashes[~integral] = hash_array(
+                values[~integral].astype(str).astype(object))
+        return hashes
+
+    def shard_index(self, keys):
+        """
+        Method to return the shard index of every key, vectorized over
+        array or series of keys. Missing keys are rejected as they belong
+        to no shard.
+
+        ***********
+        Attributes:
+        -----------
+
+            keys:       (Required) => Array or Pandas Series of keys.
+        *******
+        Return:
+        -------
+
+            indexes:    NumPy array of shard index.
+        """
+
+        missing = pandas.isna(keys)
+        if numpy.any(missing):
+            msg = f"Shard key must not be missing, got {int(numpy.sum(missing))} missing keys"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        if isinstance(keys, pandas.Series) and \
+                pandas.api.types.is_unsigned_integer_dtype(keys.dtype):
+            values = keys.to_numpy(dtype="uint64")
+        elif isinstance(keys, pandas.Series) and \
+                (pandas.api.types.is_integer_dtype(keys.dtype) or
+                 pandas.api.types.is_bool_dtype(keys.dtype)):
+            values = keys.to_numpy(dtype="int64")
+        else:
+            values = numpy.asarray(keys)
+
+        if self.strategy == "range":
+            return numpy.searchsorted(self.uppers, values, side="right")
+        return (self._hash_keys(values) %
+                numpy.uint64(len(self.managers))).astype("int64")
+
+    def get_manager(self, key):
+        """
+        Method to return the manager of shard holding key.
+
+        ***********
+        Attributes:
+        -----------
+
+            key:        (Required) => Value of shard key.
+        *******
+        Return:
+        -------
+
+            manager:    DatabaseManager of shard.
+        """
+
+        return self.managers[int(self.shard_index(numpy.asarray([key]))[0])]
+
+    def execute_sql(self, sql: str, key=None, **kwargs):
+        """
+        Function to execute DML or DDL query on shard of key, or on every
+        shard if key is not given.
+
+        ***********
+        Attributes:
+        -----------
+
+            sql:        (Required) => Plain DDL or DML query.
+            key:        (Optional) => Value of shard key.
+                        Default: None to execute on every shard.
+            kwargs:     (Optional) => Extra arguments of execute_sql.
+        *******
+        Return:
+        -------
+
+            rows:       Rows of shard, or rows gathered from every shard.
+        """
+
+        if key is not None:
+            return self.get_manager(key).execute_sql(sql=sql, **kwargs)
+
+        executor = QueryExecutor(max_workers=self.parallel,
+                                 method="execute_sql")
+        params = kwargs.pop("params", None)
+        results = executor.run([(manager, sql, params)
+                                for manager in self.managers],
+                               raise_on_error=True,
+                               **kwargs)
+        if all(result["result"] is None for result in results):
+            return None
+        return [row for result in results for row in result["result"] or []]
+
+    def execute_df(self, panda_df: DataFrame, table_name: str, **kwargs):
+        """
+        Function to split DataFrame by shard of key column and load the
+        parts of shards in parallel.
+
+        ***********
+        Attributes:
+        -----------
+
+            panda_df:       (Required) => Pandas DataFrame with key column.
+            table_name:     (Required) => Name of table.
+            kwargs:         (Optional) => Extra arguments of execute_df.
+        *******
+        Return:
+        -------
+
+            rows:           Dictonary of shard index to result of load.
+        """
+
+        if self.key not in panda_df.columns:
+            msg = f"Shard key '{self.key}' is missing in DataFrame"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        indexes = self.shard_index(panda_df[self.key])
+        parts = {int(index): panda_df[indexes == index]
+                 for index in numpy.unique(indexes)}
+        logger.info(
+            f'Loading {len(panda_df)} rows in {len(parts)} shards of table {table_name}')
+
+        def load(index: int):
+            return self.managers[index].execute_df(panda_df=parts[index],
+                                                   table_name=table_name,
+                                                   **kwargs)
+
+        with ThreadPoolExecutor(max_workers=self.parallel) as executor:
+            futures = {index: executor.submit(contextvars.copy_context().run,
+                                              load, index)
+                       for index in parts}
+            return {index: future.result() for index, future in futures.items()}
+
+    def get_df(self, sql: str, key=None, **kwargs):
+        """
+        Function to read DML select query from shard of key, or gather and
+        concatenate it from every shard if key is not given. With chunk_size
+        chunks of every shard are chained in order of shards, and query of
+        shard start once chunks of previous shard are consumed.
+
+        ***********
+        Attributes:
+        -----------
+
+            sql:        (Required) => DML select query.
+            key:        (Optional) => Value of shard key.
+                        Default: None to read from every shard.
+            kwargs:     (Optional) => Extra arguments of get_df.
+        *******
+        Return:
+        -------
+
+            panda_df:   Pandas DataFrame, or iterator of chunks with
+                        chunk_size.
+        """
+
+        if key is not None:
+            return self.get_manager(key).get_df(sql=sql, **kwargs)
+
+        params = kwargs.pop("params", None)
+        if kwargs.get("chunk_size"):
+            # Chunks are read by thread consuming them, as connection of
+            # lazy result can not move across threads.
+            return itertools.chain.from_iterable(
+                manager.get_df(sql=sql, params=params, **kwargs)
+                for manager in self.managers)
+
+        executor = QueryExecutor(max_workers=self.parallel)
+        return executor.run([(manager, sql, params)
+                             for manager in self.managers],
+                            concat=True,
+                            raise_on_error=True,
+                            **kwargs)
+
+    def dispose_session(self):
+        """
+        Method to dispose the session of every shard.
+        """
+
+        for manager in self.managers:
+            manager.dispose_session()
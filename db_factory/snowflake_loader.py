@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+
+"""
+File holds the module to bulk load Pandas DataFrame in Snowflake using
+compressed Parquet files, PUT to a temporary internal stage and single
+COPY INTO command.
+"""
+
+import os
+import uuid
+import shutil
+import logging
+import tempfile
+import traceback
+from pandas import DataFrame
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+# Rows written per Parquet file when chunk size is not provided.
+PARQUET_CHUNK_SIZE = 500000
+
+
+class SnowflakeLoader(object):
+    """
+    Class handle the bulk load of Pandas DataFrame in Snowflake table.
+    DataFrame is written as compressed Parquet chunks locally, uploaded in
+    parallel to temporary internal stage and loaded with COPY INTO.
+    Statements are issued through connection.execute so any object
+    implementing it (like a stand-in recording the commands) can be used.
+
+    ********
+    Methods:
+    --------
+
+        __init__:       Initaization functions, holds the connection.
+        write_parquet:  Method to write DataFrame as Parquet chunks.
+        load:           Method to load DataFrame in table through stage.
+    """
+
+    def __init__(self,
+                 connection,
+                 parallel: int = 8,
+                 compression: str = "snappy"):
+        """
+        Initialization function to initlaize the Snowflake loader
+
+        ***********
+        Attributes:
+        -----------
+
+            connection:     (Required) => SQLAlchemy connection of Snowflake.
+                            Table must already exist.
+            parallel:       (Optional) => Number of threads uploading files
+                            to stage.
+                            Default: 8
+            compression:    (Optional) => Compression codec of Parquet files.
+                            Default: snappy
+        """
+
+        self.connection = connection
+        self.parallel = parallel
+        self.compression = compression
+
+    def write_parquet(self,
+                      panda_df: DataFrame,
+                      directory: str,
+                      chunk_size: int = None):
+        """
+        Method to write DataFrame as compressed Parquet chunks.
+
+        ***********
+        Attributes:
+        -----------
+
+            panda_df:       (Required) => Pandas DataFrame to write.
+            directory:      (Required) => Directory to write files.
+            chunk_size:     (Optional) => Rows per Parquet file.
+                            Default: None for PARQUET_CHUNK_SIZE rows.
+        *******
+        Return:
+        -------
+
+            files:          List of written file paths.
+        """
+
+        chunk_size = chunk_size or PARQUET_CHUNK_SIZE
+        files = []
+        for index, start in enumerate(range(0, len(panda_df), chunk_size)):
+            path = os.path.join(directory, f"part_{index:05d}.parquet")
+            panda_df.iloc[start:start + chunk_size].to_parquet(
+                path,
+                engine="pyarrow",
+                compression=self.compression,
+                index=False,
+                coerce_timestamps="us",
+                allow_truncated_timestamps=True)
+            files.append(path)
+        return files
+
+    def _execute(self, sql: str):
+        """
+        Method to execute statement on connection.
+        """
+
+        logger.info(f'Snowflake bulk load statement: {sql}')
+        return self.connection.execute(text(sql))
+
+    def load(self,
+             panda_df: DataFrame,
+             table_name: str,
+             chunk_size: int = None):
+        """
+        Method to load DataFrame in table through temporary internal stage.
+
+        ***********
+        Attributes:
+        -----------
+
+            panda_df:       (Required) => Pandas DataFrame to load.
+            table_name:     (Required) => Name of existing table.
+            chunk_size:     (Optional) => Rows per Parquet file.
+                            Default: None for PARQUET_CHUNK_SIZE rows.
+        *******
+        Return:
+        -------
+
+            results:        List of dictonary per loaded file as reported by
+                            COPY INTO (file, status, rows_parsed,
+                            rows_loaded, errors_seen, first_error ...).
+        """
+
+        # Quoted as table created by Pandas, so mixed case or reserved name
+        # load the same table.
+        dialect = getattr(self.connection, "dialect", None)
+        table = dialect.identifier_preparer.quote(table_name) \
+            if dialect is not None else table_name
+        stage = f"DB_FACTORY_{uuid.uuid4().hex.upper()}"
+        directory = tempfile.mkdtemp(prefix="db_factory_")
+        try:
+            files = self.write_parquet(panda_df=panda_df,
+                                       directory=directory,
+                                       chunk_size=chunk_size)
+            logger.info(f'Written {len(files)} Parquet files to load')
+
+            self._execute(f"CREATE TEMPORARY STAGE {stage} "
+                          f"FILE_FORMAT = (TYPE = PARQUET)")
+            pattern = os.path.join(directory, "*.parquet").replace("\\", "/")
+            self._execute(f"PUT 'file://{pattern}' @{stage} "
+                          f"PARALLEL = {self.parallel} "
+                          f"AUTO_COMPRESS = FALSE")
+
+            result = self._execute(
+                f"COPY INTO {table} FROM @{stage} "
+                f"FILE_FORMAT = (TYPE = PARQUET) "
+                f"MATCH_BY_COLUMN_NAME = CASE_INSENSITIVE "
+                f"ON_ERROR = ABORT_STATEMENT PURGE = TRUE")
+
+            results = []
+            if result is not None and getattr(result, "returns_rows", True):
+                keys = [str(key).lower() for key in result.keys()]
+                results = [dict(zip(keys, row)) for row in result.fetchall()]
+            for item in results:
+                logger.info(f'Loaded file: {item}')
+
+            self._execute(f"DROP STAGE IF EXISTS {stage}")
+            return results
+        except Exception as err:
+            logger.exception(f'Failed to bulk load DataFrame in Snowflake: {err}')
+            traceback.print_tb(err.__traceback__)
+
+            # Propagate the exception
+            raise
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
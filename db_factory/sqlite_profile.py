@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+
+"""
+File holds the module of SQLite performance profile applying PRAGMAs on
+every new connection, connection pool shared by threads and index handling
+for bulk loads.
+"""
+
+import logging
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.pool import StaticPool
+
+logger = logging.getLogger(__name__)
+
+# Default PRAGMAs of performance profile.
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",          # Readers do not block on writer
+    "synchronous": "NORMAL",        # Fsync at checkpoint only with WAL
+    "cache_size": -64000,           # 64 MB of page cache per connection
+    "mmap_size": 268435456,         # 256 MB of memory mapped I/O
+    "temp_store": "MEMORY",         # Temporary tables and indexes in memory
+    "busy_timeout": 5000,           # Wait 5 seconds on lock before failing
+}
+# PRAGMAs not applicable to in-memory database.
+FILE_ONLY_PRAGMAS = ["journal_mode", "mmap_size"]
+
+
+class SqliteProfile(object):
+    """
+    Class handle the SQLite performance profile of SQLAlchemy engine.
+
+    ********
+    Methods:
+    --------
+
+        __init__:           Initaization functions, holds the PRAGMAs.
+        get_uri:            Method to return the URI of file or shared
+                            in-memory database.
+        get_engine_args:    Method to return the engine arguments of
+                            connection pool.
+        apply:              Method to apply PRAGMAs on every new connection
+                            of engine.
+        drop_indexes:       Method to drop the indexes of table and return
+                            their definition.
+        create_indexes:     Method to create indexes from definitions.
+    """
+
+    def __init__(self, pragmas: dict = None, in_memory: bool = False):
+        """
+        Initialization function to initlaize the SQLite profile
+
+        ***********
+        Attributes:
+        -----------
+
+            pragmas:    (Optional) => PRAGMAs overriding SQLITE_PRAGMAS.
+                        Value None remove the PRAGMA from profile.
+                        Default: None to use SQLITE_PRAGMAS.
+            in_memory:  (Optional) => True for shared in-memory database.
+                        Default: False
+        """
+
+        self.in_memory = in_memory
+        self.pragmas = dict(SQLITE_PRAGMAS)
+        self.pragmas.update(pragmas or {})
+        if in_memory:
+            for name in FILE_ONLY_PRAGMAS:
+                self.pragmas.pop(name, None)
+        self.pragmas = {name: value for name, value in self.pragmas.items()
+                        if value is not None}
+
+    def get_uri(self, path: str, database: str):
+        """
+        Method to return the URI of file or shared in-memory database.
+
+        ***********
+        Attributes:
+        -----------
+
+            path:       (Required) => Path of database file.
+            database:   (Required) => Name of database.
+        *******
+        Return:
+        -------
+
+            uri:        SQLAlchemy URI of database.
+        """
+
+        if self.in_memory:
+            # Named in-memory database is shared by connections of process
+            return f"sqlite:///file:{database}?mode=memory&cache=shared&uri=true"
+        return f"sqlite:///{path}"
+
+    def get_engine_args(self):
+        """
+        Method to return the engine arguments of connection pool. File
+        database use queue pool, so each connection is used by one thread at
+        a time whatever the number of threads. Shared in-memory database use
+        single connection, which keep the database alive.
+
+        *******
+        Return:
+        -------
+
+            param:      Extra kwargs for SQLAlchemy engine.
+        """
+
+        # Pool hand connection to one thread at a time, so connection can
+        # be checked out by other thread than the one that opened it.
+        connect_args = {"check_same_thread": False}
+        if self.in_memory:
+            return dict(poolclass=StaticPool, connect_args=connect_args)
+        return dict(poolclass=QueuePool, connect_args=connect_args)
+
+    def apply(self, engine: Engine):
+        """
+        Method to apply PRAGMAs on every new connection of engine.
+
+        ***********
+        Attributes:
+        -----------
+
+            engine:     (Required) => SQLAlchemy engine of SQLite.
+        """
+
+        pragmas = self.pragmas
+
+        def on_connect(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name} = {value}")
+            cursor.close()
+
+        event.listen(engine, "connect", on_connect)
+        logger.info(f'SQLite profile is applied with PRAGMAs: {pragmas}')
+
+    @staticmethod
+    def drop_indexes(cursor, table_name: str):
+        """
+        Method to drop the indexes of table and return their definition.
+        Indexes created by constraints are kept.
+
+        ***********
+        Attributes:
+        -----------
+
+            cursor:         (Required) => DBAPI cursor of SQLite.
+            table_name:     (Required) => Name of table.
+        *******
+        Return:
+        -------
+
+            indexes:        List of CREATE INDEX statements.
+        """
+
+        # Identifiers of SQLite are case-insensitive.
+        cursor.execute("SELECT name, sql FROM sqlite_master WHERE "
+                       "type = 'index' AND tbl_name = ? COLLATE NOCASE "
+                       "AND sql IS NOT NULL",
+                       (table_name,))
+        indexes = cursor.fetchall()
+        for name, _ in indexes:
+            cursor.execute(f'DROP INDEX "{name}"')
+        logger.info(f'Dropped {len(indexes)} indexes of table {table_name}')
+        return [sql for _, sql in indexes]
+
+    @staticmethod
+    def create_indexes(cursor, indexes: list):
+        """
+        Method to create indexes from definitions.
+
+        ***********
+        Attributes:
+        -----------
+
+            cursor:         (Required) => DBAPI cursor of SQLite.
+            indexes:        (Required) => List of CREATE INDEX statements.
+        """
+
+        for sql in indexes:
+            cursor.execute(sql)
+        logger.info(f'Created {len(indexes)} indexes')
@@ -0,0 +1,559 @@
+#!/usr/bin/env python
+
+"""
+File holds the module to diff table between two databases by comparing
+checksums of key ranges computed server side, so only ranges with a
+mismatch are split further and only differing rows are transferred.
+"""
+
+import hashlib
+import logging
+import contextvars
+import pandas
+from pandas import DataFrame
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import MetaData
+from sqlalchemy import Table
+from sqlalchemy import types as satypes
+
+logger = logging.getLogger(__name__)
+
+# Marker of NULL value in text of row.
+NULL_TEXT = "\\N"
+# SQLite function returning the hash of text of row.
+SQLITE_HASH_FUNCTION = "db_factory_row_hash"
+# SQLite function returning the ISO UTC text of timestamp.
+SQLITE_TIMESTAMP_FUNCTION = "db_factory_timestamp"
+# Digits after decimal point of numeric and float text.
+NUMERIC_SCALE = 6
+# Dialects where TIMESTAMP type hold an instant rendered in session zone.
+INSTANT_TIMESTAMP_DIALECT = ["mysql", "bigquery"]
+# Text of boolean, as 1 or 0 on every database.
+BOOLEAN_TEXT = "CASE WHEN {0} THEN '1' WHEN NOT {0} THEN '0' END"
+# Per dialect: text of column per type category, so the same value give the
+# same text on every database. Timestamps are ISO text with microseconds,
+# in UTC when they hold an instant, numerics have fixed scale.
+DIALECT_TEXT = {
+    "postgresql": {
+        "text": "CAST({} AS TEXT)",
+        "boolean": BOOLEAN_TEXT,
+        "integer": "CAST({} AS TEXT)",
+        "numeric": f"CAST(CAST({{}} AS NUMERIC(38, {NUMERIC_SCALE})) AS TEXT)",
+        "date": "to_char({}, 'YYYY-MM-DD')",
+        "timestamp": "to_char({}, 'YYYY-MM-DD HH24:MI:SS.US')",
+        "timestamptz": "to_char({} AT TIME ZONE 'UTC', 'YYYY-MM-DD HH24:MI:SS.US')"},
+    "mysql": {
+        "text": "CAST({} AS CHAR)",
+        "boolean": BOOLEAN_TEXT,
+        "integer": "CAST({} AS CHAR)",
+        "numeric": f"CAST(CAST({{}} AS DECIMAL(38, {NUMERIC_SCALE})) AS CHAR)",
+        "date": "DATE_FORMAT({}, '%Y-%m-%d')",
+        "timestamp": "DATE_FORMAT({}, '%Y-%m-%d %H:%i:%s.%f')",
+        "timestamptz": "DATE_FORMAT(TIMESTAMPADD(MICROSECOND, "
+                       "CAST(UNIX_TIMESTAMP({}) * 1000000 AS SIGNED), "
+                       "'1970-01-01'), '%Y-%m-%d %H:%i:%s.%f')"},
+    "snowflake": {
+        "text": "TO_VARCHAR({})",
+        "boolean": BOOLEAN_TEXT,
+        "integer": "TO_VARCHAR({})",
+        "numeric": f"TO_VARCHAR(CAST({{}} AS NUMBER(38, {NUMERIC_SCALE})))",
+        "date": "TO_VARCHAR({}, 'YYYY-MM-DD')",
+        "timestamp": "TO_VARCHAR({}, 'YYYY-MM-DD HH24:MI:SS.FF6')",
+        "timestamptz": "TO_VARCHAR(CONVERT_TIMEZONE('UTC', {}), 'YYYY-MM-DD HH24:MI:SS.FF6')"},
+    "bigquery": {
+        "text": "CAST({} AS STRING)",
+        "boolean": BOOLEAN_TEXT,
+        "integer": "CAST({} AS STRING)",
+        "numeric": f"FORMAT('%.{NUMERIC_SCALE}f', {{}})",
+        "date": "FORMAT_DATE('%Y-%m-%d', {})",
+        "timestamp": "FORMAT_DATETIME('%Y-%m-%d %H:%M:%E6S', {})",
+        "timestamptz": "FORMAT_TIMESTAMP('%Y-%m-%d %H:%M:%E6S', {}, 'UTC')"},
+    "duckdb": {
+        "text": "CAST({} AS VARCHAR)",
+        "boolean": BOOLEAN_TEXT,
+        "integer": "CAST({} AS VARCHAR)",
+        "numeric": f"CAST(CAST({{}} AS DECIMAL(38, {NUMERIC_SCALE})) AS VARCHAR)",
+        "date": "strftime({}, '%Y-%m-%d')",
+        "timestamp": "strftime({}, '%Y-%m-%d %H:%M:%S.%f')",
+        "timestamptz": "strftime(timezone('UTC', {}), '%Y-%m-%d %H:%M:%S.%f')"},
+    "sqlite": {
+        "text": "CAST({} AS TEXT)",
+        "boolean": BOOLEAN_TEXT,
+        "integer": "CAST({} AS TEXT)",
+        "numeric": f"printf('%.{NUMERIC_SCALE}f', {{}})",
+        "date": "date({})",
+        "timestamp": SQLITE_TIMESTAMP_FUNCTION + "({})",
+        "timestamptz": SQLITE_TIMESTAMP_FUNCTION + "({})"},
+}
+# Per dialect: join of texts and exact integer of the first 8 hex digits of
+# MD5, so same row give same hash on every database.
+DIALECT_CHECKSUM = {
+    "postgresql": (" || '|' || ",
+                   "('x' || substr(md5({}), 1, 8))::bit(32)::bigint"),
+    "mysql": (None,
+              "CAST(CONV(SUBSTRING(MD5({}), 1, 8), 16, 10) AS UNSIGNED)"),
+    "snowflake": (" || '|' || ",
+                  "TO_NUMBER(SUBSTR(MD5({}), 1, 8), 'XXXXXXXX')"),
+    "bigquery": (None,
+                 "CAST(CONCAT('0x', SUBSTR(TO_HEX(MD5({})), 1, 8)) AS INT64)"),
+    "duckdb": (" || '|' || ",
+               "CAST(('0x' || substr(md5({}), 1, 8)) AS BIGINT)"),
+    "sqlite": (" || '|' || ",
+               SQLITE_HASH_FUNCTION + "({})"),
+}
+
+
+def row_hash(text: str):
+    """
+    Function to return the 32 bit hash of text of row, registered in SQLite
+    which has no MD5 function.
+    """
+
+    return int(hashlib.md5(text.encode("utf-8")).hexdigest()[:8], 16)
+
+
+def timestamp_text(value):
+    """
+    Function to return the ISO text of timestamp, in UTC if it has a time
+    zone, registered in SQLite which store timestamps as text.
+    """
+
+    if value is None:
+        return None
+    try:
+        timestamp = pandas.Timestamp(value)
+    except (TypeError, ValueError):
+        return str(value)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_convert("UTC")
+    return timestamp.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+class TableDiff(object):
+    """
+    Class handle the diff of table between source and target
+    DatabaseManager. Range of integer key is split in segments and count
+    and sum of row hashes are computed by both databases. Segments with
+    mismatch are bisected until they are small enough to fetch and
+    compare rows, so matching data is never transferred. Values are
+    normalized per type before hashing, so databases of different dialects
+    give the same checksum for the same rows.
+
+    ********
+    Methods:
+    --------
+
+        __init__:       Initaization functions, holds the managers.
+        get_columns:    Method to return compared columns of source table.
+        get_types:      Method to return column types of table.
+        checksum:       Method to return count and checksum of key range.
+        diff:           Method to return the differing rows.
+        reconcile:      Method to apply the diff on target table.
+    """
+
+    def __init__(self,
+                 source,
+                 target,
+                 key_column: str,
+                 segments: int = 16,
+                 leaf_rows: int = 1000,
+                 parallel: int = 4):
+        """
+        Initialization function to initlaize the table diff
+
+        ***********
+        Attributes:
+        -----------
+
+            source:         (Required) => DatabaseManager of reference table.
+                            Session must be created.
+            target:         (Required) => DatabaseManager of compared table.
+                            Session must be created.
+            key_column:     (Required) => Unique integer key of table.
+            segments:       (Optional) => Initial ranges of key.
+                            Default: 16
+            leaf_rows:      (Optional) => Rows under which mismatched range
+                            is fetched instead of bisected.
+                            Default: 1000
+            parallel:       (Optional) => Ranges checked in parallel.
+                            Default: 4
+        """
+
+        self.source = source
+        self.target = target
+        self.key_column = key_column
+        self.segments = segments
+        self.leaf_rows = leaf_rows
+        self.parallel = parallel
+
+    def get_columns(self, table_name: str):
+        """
+        Method to reflect source table and return its column names.
+
+        ***********
+        Attributes:
+        -----------
+
+            table_name:     (Required) => Name of table.
+        *******
+        Return:
+        -------
+
+            columns:        List of column names.
+        """
+
+        return list(self.get_types(self.source, table_name))
+
+    def get_types(self, manager, table_name: str):
+        """
+        Method to reflect table and return its column types.
+
+        ***********
+        Attributes:
+        -----------
+
+            manager:        (Required) => DatabaseManager of table.
+            table_name:     (Required) => Name of table.
+        *******
+        Return:
+        -------
+
+            types:          Dictonary of column name to SQLAlchemy type.
+        """
+
+        table = Table(table_name, MetaData(), autoload_with=manager.engine)
+        return {column.name: column.type for column in table.columns}
+
+    @staticmethod
+    def _dialect(manager):
+        """
+        Method to return the checksum dialect name of manager.
+        """
+
+        dialect = manager.engine.dialect.name
+        name = "mysql" if dialect == "mariadb" else dialect
+        if name not in DIALECT_CHECKSUM:
+            msg = f"Checksum is not supported for dialect '{dialect}'"
+            logger.error(msg)
+            raise ValueError(msg)
+        return name
+
+    @staticmethod
+    def _category(dialect: str, sql_type):
+        """
+        Method to return the normalization category of column type.
+        """
+
+        if sql_type is None or isinstance(sql_type, satypes.NullType):
+            return None
+        if isinstance(sql_type, satypes.Boolean):
+            return "boolean"
+        if isinstance(sql_type, satypes.Integer):
+            return "integer"
+        if isinstance(sql_type, satypes.Numeric):
+            if not isinstance(sql_type, satypes.Float) and sql_type.scale == 0:
+                return "integer"
+            return "numeric"
+        if isinstance(sql_type, satypes.DateTime):
+            if getattr(sql_type, "timezone", False) or \
+                    type(sql_type).__name__ in ["TIMESTAMP_TZ", "TIMESTAMP_LTZ"] or \
+                    (dialect in INSTANT_TIMESTAMP_DIALECT and
+                     isinstance(sql_type, satypes.TIMESTAMP)):
+                return "timestamptz"
+            return "timestamp"
+        if isinstance(sql_type, satypes.Date):
+            return "date"
+        return "text"
+
+    def _categories(self, table_name: str, columns: list):
+        """
+        Method to return the normalization categories of columns in source
+        and target. Column integer on one side and numeric on the other is
+        rendered as numeric on both, and column of unknown type take the
+        category of other side.
+        """
+
+        categories = []
+        for manager in [self.source, self.target]:
+            dialect = self._dialect(manager)
+            types = {name.lower(): sql_type for name, sql_type in
+                     self.get_types(manager, table_name).items()}
+            categories.append([self._category(dialect, types.get(column.lower()))
+                               for column in columns])
+
+        for index, (source, target) in enumerate(zip(*categories)):
+            if {source, target} == {"integer", "numeric"}:
+                source = target = "numeric"
+            categories[0][index] = source or target or "text"
+            categories[1][index] = target or source or "text"
+        return categories
+
+    def _checksum_sql(self,
+                      manager,
+                      table_name: str,
+                      columns: list,
+                      categories: list):
+        """
+        Method to return the checksum query of manager with :low and :high
+        placeholders of key range.
+        """
+
+        name = self._dialect(manager)
+        preparer = manager.engine.dialect.identifier_preparer
+        separator, hash_sql = DIALECT_CHECKSUM[name]
+        texts = [f"COALESCE({DIALECT_TEXT[name][category].format(preparer.quote(column))}, "
+                 f"'{NULL_TEXT}')"
+                 for column, category in zip(columns, categories)]
+        if separator:
+            row_text = separator.join(texts)
+        elif name == "mysql":
+            row_text = f"CONCAT_WS('|', {', '.join(texts)})"
+        else:
+            row_text = "CONCAT(" + ", '|', ".join(texts) + ")"
+        key = preparer.quote(self.key_column)
+        return f"SELECT COUNT(*) AS row_count, " \
+            f"SUM({hash_sql.format(row_text)}) AS checksum " \
+            f"FROM {preparer.quote(table_name)} WHERE {key} >= :low " \
+            f"AND {key} < :high"
+
+    def checksum(self, manager, sql: str, low: int, high: int):
+        """
+        Method to return the count and checksum of key range.
+
+        ***********
+        Attributes:
+        -----------
+
+            manager:    (Required) => DatabaseManager to query.
+            sql:        (Required) => Checksum query of dialect.
+            low:        (Required) => Inclusive lower bound of key.
+            high:       (Required) => Exclusive upper bound of key.
+        *******
+        Return:
+        -------
+
+            result:     Tuple of row count and checksum.
+        """
+
+        if manager.engine.dialect.name == "sqlite":
+            raw_connection = manager.engine.raw_connection()
+            try:
+                raw_connection.connection.create_function(
+                    SQLITE_HASH_FUNCTION, 1, row_hash)
+                raw_connection.connection.create_function(
+                    SQLITE_TIMESTAMP_FUNCTION, 1, timestamp_text)
+                cursor = raw_connection.cursor()
+                cursor.execute(sql.replace(":low", str(int(low)))
+                               .replace(":high", str(int(high))))
+                row = cursor.fetchone()
+                cursor.close()
+            finally:
+                raw_connection.close()
+        else:
+            row = manager.execute_sql(sql=sql,
+                                      params={"low": int(low),
+                                              "high": int(high)})[0]
+        return int(row[0] or 0), int(row[1] or 0)
+
+    def _compare_range(self, queries: tuple, low: int, high: int):
+        """
+        Method to compare checksums of range on both databases.
+        """
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            source = executor.submit(contextvars.copy_context().run,
+                                     self.checksum, self.source,
+                                     queries[0], low, high)
+            target = executor.submit(contextvars.copy_context().run,
+                                     self.checksum, self.target,
+                                     queries[1], low, high)
+            source, target = source.result(), target.result()
+        return source == target, max(source[0], target[0])
+
+    def _fetch_range(self, table_name: str, columns: list, ranges: list):
+        """
+        Method to fetch rows of ranges from both databases.
+        """
+
+        def fetch(manager):
+            preparer = manager.engine.dialect.identifier_preparer
+            key = preparer.quote(self.key_column)
+            selected = ", ".join(preparer.quote(column) for column in columns)
+            predicate = " OR ".join(
+                f"({key} >= {int(low)} AND {key} < {int(high)})"
+                for low, high in ranges)
+            return manager.get_df(
+                sql=f"SELECT {selected} FROM {preparer.quote(table_name)} "
+                    f"WHERE {predicate}")
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            source = executor.submit(contextvars.copy_context().run,
+                                     fetch, self.source)
+            target = executor.submit(contextvars.copy_context().run,
+                                     fetch, self.target)
+            return source.result(), target.result()
+
+    def _bounds(self, table_name: str):
+        """
+        Method to return the key range covering both tables.
+        """
+
+        bounds = []
+        for manager in [self.source, self.target]:
+            preparer = manager.engine.dialect.identifier_preparer
+            key = preparer.quote(self.key_column)
+            bounds.append(manager.get_df(
+                sql=f"SELECT MIN({key}) AS low, MAX({key}) AS high "
+                    f"FROM {preparer.quote(table_name)}").iloc[0])
+        lows = [bound["low"] for bound in bounds if not pandas.isna(bound["low"])]
+        highs = [bound["high"] for bound in bounds if not pandas.isna(bound["high"])]
+        if not lows:
+            return None
+        return int(min(lows)), int(max(highs)) + 1
+
+    @staticmethod
+    def _split(low: int, high: int, count: int):
+        """
+        Method to split key range in count ranges.
+        """
+
+        step = max(-(-(high - low) // count), 1)
+        return [(start, min(start + step, high))
+                for start in range(low, high, step)]
+
+    @staticmethod
+    def _normalize(values: pandas.Series, category: str):
+        """
+        Method to convert fetched values by normalization category, so
+        values fetched from databases of different dialects compare equal.
+        """
+
+        if category in ["boolean", "integer", "numeric"]:
+            numbers = pandas.to_numeric(values.astype(object), errors="coerce")
+            return numbers.astype(float).round(NUMERIC_SCALE) \
+                .where(values.notna())
+        if category in ["date", "timestamp", "timestamptz"]:
+            return pandas.to_datetime(values, errors="coerce", utc=True)
+        return values
+
+    def diff(self, table_name: str, columns: list = None):
+        """
+        Method to return the rows differing between source and target table.
+
+        ***********
+        Attributes:
+        -----------
+
+            table_name:     (Required) => Name of table in both databases.
+            columns:        (Optional) => Columns to compare.
+                            Default: None to compare every column of source.
+        *******
+        Return:
+        -------
+
+            result:         Dictonary of missing_in_target, missing_in_source
+                            and changed Pandas DataFrame of source rows, and
+                            ranges_checked.
+        """
+
+        columns = list(columns or self.get_columns(table_name))
+        if self.key_column not in columns:
+            columns.insert(0, self.key_column)
+        categories = self._categories(table_name, columns)
+        queries = (
+            self._checksum_sql(self.source, table_name, columns,
+                               categories[0]),
+            self._checksum_sql(self.target, table_name, columns,
+                               categories[1]))
+
+        result = {"missing_in_target": DataFrame(columns=columns),
+                  "missing_in_source": DataFrame(columns=columns),
+                  "changed": DataFrame(columns=columns),
+                  "ranges_checked": 0}
+        bounds = self._bounds(table_name)
+        if bounds is None:
+            return result
+
+        pending = self._split(bounds[0], bounds[1], self.segments)
+        leaves = []
+        with ThreadPoolExecutor(max_workers=self.parallel) as executor:
+            while pending:
+                futures = [executor.submit(contextvars.copy_context().run,
+                                           self._compare_range, queries,
+                                           low, high)
+                           for low, high in pending]
+                compared = [future.result() for future in futures]
+                result["ranges_checked"] += len(pending)
+                next_pending = []
+                for (low, high), (is_equal, rows) in zip(pending, compared):
+                    if is_equal:
+                        continue
+                    if rows <= self.leaf_rows or high - low <= 1:
+                        leaves.append((low, high))
+                    else:
+                        next_pending.extend(self._split(low, high, 2))
+                pending = next_pending
+
+        logger.info(
+            f'Checked {result["ranges_checked"]} ranges, {len(leaves)} ranges differ')
+        if not leaves:
+            return result
+
+        source, target = self._fetch_range(table_name, columns, leaves)
+        merged = source.merge(target, on=self.key_column, how="outer",
+                              suffixes=("", "_target"), indicator=True)
+        both = merged[merged["_merge"] == "both"]
+        is_changed = pandas.Series(False, index=both.index)
+        for column, category in zip(columns, categories[0]):
+            if column == self.key_column:
+                continue
+            left = self._normalize(both[column], category)
+            right = self._normalize(both[f"{column}_target"], category)
+            is_changed |= (left.astype(str) != right.astype(str)) & \
+                ~(left.isna() & right.isna())
+
+        # Rows are taken from fetched frames to keep their dtypes.
+        keys = {"missing_in_target": merged["_merge"] == "left_only",
+                "missing_in_source": merged["_merge"] == "right_only",
+                "changed": is_changed.reindex(merged.index, fill_value=False)}
+        for name, is_selected in keys.items():
+            frame = target if name == "missing_in_source" else source
+            selected = merged.loc[is_selected, self.key_column]
+            result[name] = frame[frame[self.key_column].isin(selected)] \
+                .reset_index(drop=True)
+        return result
+
+    def reconcile(self, table_name: str, result: dict, batch_size: int = 1000):
+        """
+        Method to apply the diff on target table, so it match source.
+        Changed and extra rows are deleted from target and missing and
+        changed rows of source are appended.
+
+        ***********
+        Attributes:
+        -----------
+
+            table_name:     (Required) => Name of target table.
+            result:         (Required) => Result of diff.
+            batch_size:     (Optional) => Keys per DELETE statement.
+                            Default: 1000
+        """
+
+        preparer = self.target.engine.dialect.identifier_preparer
+        keys = list(result["changed"][self.key_column]) + \
+            list(result["missing_in_source"][self.key_column])
+        for start in range(0, len(keys), batch_size):
+            values = ", ".join(str(int(key))
+                               for key in keys[start:start + batch_size])
+            self.target.execute_sql(
+                sql=f"DELETE FROM {preparer.quote(table_name)} "
+                    f"WHERE {preparer.quote(self.key_column)} IN ({values})")
+
+        rows = pandas.concat([result["changed"], result["missing_in_target"]],
+                             ignore_index=True)
+        if len(rows):
+            self.target.execute_df(panda_df=rows,
+                                   table_name=table_name,
+                                   exist_action="append")
+        logger.info(
+            f'Reconciled table {table_name}: {len(keys)} rows deleted, {len(rows)} rows appended')
@@ -0,0 +1,305 @@
+#!/usr/bin/env python
+
+"""
+File holds the module to replace table by loading an unindexed staging
+table, rebuilding indexes and constraints of the table on it and swapping
+it in atomically, so rows never pay index maintenance while loading and
+readers never see a half loaded table.
+"""
+
+import logging
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import inspect
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Suffix of staging table and of its indexes until swapped.
+STAGING_SUFFIX = "_dbf_new"
+# Suffix of replaced table until dropped.
+OLD_SUFFIX = "_dbf_old"
+# Dialects building indexes of staging table before swap and renaming
+# them at swap. Others build indexes inside swap transaction.
+RENAME_INDEX_DIALECT = ["postgresql", "mysql"]
+# Dialects building indexes in parallel on separate connections.
+PARALLEL_INDEX_DIALECT = ["postgresql"]
+# Dialects supported by the swap.
+SUPPORTED_DIALECT = ["postgresql", "mysql", "sqlite", "duckdb", "snowflake"]
+
+
+class TableSwapper(object):
+    """
+    Class handle the replace of table through staging table. Indexes,
+    primary key and unique constraints of existing table are captured by
+    reflection and rebuilt once rows are loaded.
+
+    ********
+    Methods:
+    --------
+
+        __init__:       Initaization functions, holds SQLAlchemy engine.
+        capture:        Method to return index and constraint definitions
+                        of table.
+        load:           Method to load staging table and swap it in.
+    """
+
+    def __init__(self, engine: Engine, parallel: int = 4):
+        """
+        Initialization function to initlaize the table swapper
+
+        ***********
+        Attributes:
+        -----------
+
+            engine:     (Required) => SQLAlchemy engine of database.
+            parallel:   (Optional) => Indexes built in parallel where
+                        dialect allow it.
+                        Default: 4
+        """
+
+        if engine.dialect.name not in SUPPORTED_DIALECT:
+            msg = f"Atomic swap is not supported for '{engine.dialect.name}'"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        self.engine = engine
+        self.parallel = parallel
+        self.preparer = engine.dialect.identifier_preparer
+
+    def capture(self, table_name: str):
+        """
+        Method to return the indexes, primary key and unique constraints of
+        table, or None if table does not exist.
+
+        ***********
+        Attributes:
+        -----------
+
+            table_name: (Required) => Name of table.
+        *******
+        Return:
+        -------
+
+            definition: List of dictonary with name, columns, unique and
+                        kind (index, primary or unique).
+        """
+
+        inspector = inspect(self.engine)
+        if not inspector.has_table(table_name):
+            return None
+        if self.engine.dialect.name == "duckdb":
+            return self._capture_duckdb(table_name)
+
+        definition = []
+        primary = inspector.get_pk_constraint(table_name)
+        if primary and primary.get("constrained_columns"):
+            definition.append({"kind": "primary",
+                               "name": primary.get("name") or f"{table_name}_pkey",
+                               "columns": primary["constrained_columns"],
+                               "unique": True})
+        for constraint in inspector.get_unique_constraints(table_name):
+            # Unnamed constraint of SQLite is reflected without name
+            name = constraint["name"] or \
+                f"{table_name}_{'_'.join(constraint['column_names'])}_key"
+            definition.append({"kind": "unique",
+                               "name": name,
+                               "columns": constraint["column_names"],
+                               "unique": True})
+        names = {item["name"] for item in definition}
+        for index in inspector.get_indexes(table_name):
+            if index["name"] in names or None in index["column_names"]:
+                # Index of constraint or on expression are skipped
+                continue
+            definition.append({"kind": "index",
+                               "name": index["name"],
+                               "columns": index["column_names"],
+                               "unique": bool(index.get("unique"))})
+        logger.info(f'Captured {len(definition)} indexes and constraints of table {table_name}')
+        return definition
+
+    def _capture_duckdb(self, table_name: str):
+        """
+        Method to return the indexes and constraints of DuckDB table from
+        its catalog functions, as duckdb-engine does not reflect indexes.
+        """
+
+        kinds = {"PRIMARY KEY": "primary", "UNIQUE": "unique"}
+        definition = []
+        with self.engine.connect() as connection:
+            constraints = connection.execute(text(
+                "SELECT constraint_type, constraint_name, constraint_column_names "
+                "FROM duckdb_constraints() WHERE table_name = :table_name "
+                "AND schema_name = current_schema()"),
+                {"table_name": table_name}).fetchall()
+            indexes = connection.execute(text(
+                "SELECT index_name, is_unique, expressions "
+                "FROM duckdb_indexes() WHERE table_name = :table_name "
+                "AND schema_name = current_schema()"),
+                {"table_name": table_name}).fetchall()
+
+        for kind, name, columns in constraints:
+            if kind in kinds:
+                definition.append({"kind": kinds[kind],
+                                   "name": name,
+                                   "columns": list(columns),
+                                   "unique": True})
+        for name, unique, expressions in indexes:
+            columns = [column.strip().strip('"')
+                       for column in str(expressions).strip("[]").split(",")]
+            if not all(column.isidentifier() for column in columns):
+                # Index on expression is skipped
+                continue
+            definition.append({"kind": "index",
+                               "name": name,
+                               "columns": columns,
+                               "unique": bool(unique)})
+        logger.info(f'Captured {len(definition)} indexes and constraints of table {table_name}')
+        return definition
+
+    def _build_sql(self, table_name: str, item: dict, suffix: str):
+        """
+        Method to return DDL building index or constraint on table.
+        """
+
+        quote = self.preparer.quote
+        name = quote(f"{item['name']}{suffix}")
+        columns = ", ".join(quote(column) for column in item["columns"])
+        table = quote(table_name)
+        dialect = self.engine.dialect.name
+        if item["kind"] == "index" or dialect in ["sqlite", "duckdb"]:
+            # SQLite and DuckDB can not add constraint to existing table,
+            # unique index enforce the same rule.
+            unique = "UNIQUE " if item["unique"] else ""
+            return f"CREATE {unique}INDEX {name} ON {table} ({columns})"
+        if item["kind"] == "primary":
+            if dialect == "mysql":
+                return f"ALTER TABLE {table} ADD PRIMARY KEY ({columns})"
+            return f"ALTER TABLE {table} ADD CONSTRAINT {name} PRIMARY KEY ({columns})"
+        return f"ALTER TABLE {table} ADD CONSTRAINT {name} UNIQUE ({columns})"
+
+    def _rename_sql(self, table_name: str, item: dict):
+        """
+        Method to return DDL renaming index or constraint of staging table
+        to its original name.
+        """
+
+        quote = self.preparer.quote
+        staging = quote(f"{item['name']}{STAGING_SUFFIX}")
+        original = quote(item["name"])
+        if self.engine.dialect.name == "mysql":
+            if item["kind"] == "primary":
+                return None
+            return f"ALTER TABLE {quote(table_name)} RENAME INDEX {staging} TO {original}"
+        if item["kind"] == "index":
+            return f"ALTER INDEX {staging} RENAME TO {original}"
+        return f"ALTER TABLE {quote(table_name)} RENAME CONSTRAINT {staging} TO {original}"
+
+    def _execute(self, statements: list):
+        """
+        Method to execute statements in single transaction.
+        """
+
+        if self.engine.dialect.name == "sqlite" and len(statements) > 1:
+            # Python sqlite3 run DDL outside of transaction unless it is
+            # begun explicitly.
+            statements = ["BEGIN"] + statements
+        with self.engine.begin() as connection:
+            for sql in statements:
+                logger.info(f'Swap statement: {sql}')
+                connection.execute(text(sql))
+
+    def _build_indexes(self, staging: str, definition: list):
+        """
+        Method to build indexes and constraints on staging table before
+        swap, in parallel where dialect allow it. Parallel builds run in
+        copy of caller context, so they use schema selected by caller.
+        """
+
+        statements = [self._build_sql(staging, item, STAGING_SUFFIX)
+                      for item in definition]
+        if self.engine.dialect.name in PARALLEL_INDEX_DIALECT:
+            # Constraints alter the table so they are added after indexes
+            indexes = [sql for sql, item in zip(statements, definition)
+                       if item["kind"] == "index"]
+            constraints = [sql for sql in statements if sql not in indexes]
+            with ThreadPoolExecutor(max_workers=self.parallel) as executor:
+                futures = [executor.submit(contextvars.copy_context().run,
+                                           self._execute, [sql])
+                           for sql in indexes]
+                for future in futures:
+                    future.result()
+            self._execute(constraints)
+        else:
+            self._execute(statements)
+
+    def load(self, table_name: str, load):
+        """
+        Method to load staging table with load callable, build indexes and
+        constraints of existing table on it and swap it in atomically.
+
+        ***********
+        Attributes:
+        -----------
+
+            table_name: (Required) => Name of table to replace.
+            load:       (Required) => Callable loading rows in table name
+                        given as argument, creating or replacing it.
+        *******
+        Return:
+        -------
+
+            rows:       Result of load callable.
+        """
+
+        quote = self.preparer.quote
+        dialect = self.engine.dialect.name
+        staging = f"{table_name}{STAGING_SUFFIX}"
+        old = f"{table_name}{OLD_SUFFIX}"
+        definition = self.capture(table_name)
+
+        self._execute([f"DROP TABLE IF EXISTS {quote(staging)}"])
+        rows = load(staging)
+
+        if definition is None:
+            self._execute([f"ALTER TABLE {quote(staging)} RENAME TO {quote(table_name)}"])
+            return rows
+
+        if dialect == "snowflake":
+            # SWAP WITH exchange constraints with the table, so they are
+            # added on staging table first and renamed once swapped.
+            constraints = [item for item in definition if item["kind"] != "index"]
+            self._build_indexes(staging, constraints)
+            statements = [f"ALTER TABLE {quote(table_name)} SWAP WITH {quote(staging)}",
+                          f"DROP TABLE {quote(staging)}"]
+            statements.extend(self._rename_sql(table_name, item)
+                              for item in constraints)
+            self._execute(statements)
+            return rows
+
+        if dialect in RENAME_INDEX_DIALECT:
+            self._build_indexes(staging, definition)
+            statements = []
+            if dialect == "mysql":
+                statements.append(
+                    f"RENAME TABLE {quote(table_name)} TO {quote(old)}, "
+                    f"{quote(staging)} TO {quote(table_name)}")
+            else:
+                statements.extend([
+                    f"ALTER TABLE {quote(table_name)} RENAME TO {quote(old)}",
+                    f"ALTER TABLE {quote(staging)} RENAME TO {quote(table_name)}"])
+            statements.append(f"DROP TABLE {quote(old)}")
+            statements.extend(sql for sql in (self._rename_sql(table_name, item)
+                                              for item in definition) if sql)
+        else:
+            # Indexes are built in the swap transaction so readers see old
+            # table until commit.
+            statements = [f"DROP TABLE {quote(table_name)}",
+                          f"ALTER TABLE {quote(staging)} RENAME TO {quote(table_name)}"]
+            statements.extend(self._build_sql(table_name, item, "")
+                              for item in definition)
+
+        self._execute(statements)
+        logger.info(f'Swapped staging table in {table_name}')
+        return rows
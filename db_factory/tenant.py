@@ -0,0 +1,224 @@
+#!/usr/bin/env python
+
+"""
+File holds the module to switch schema of pooled connections per call or
+per context, so many tenant schemas share one engine and one pool instead
+of one manager per schema.
+"""
+
+import logging
+import contextvars
+from contextlib import contextmanager
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Schema selected by current thread or asyncio task.
+CURRENT_SCHEMA = contextvars.ContextVar("db_factory_schema", default=None)
+# Key of schema applied on connection in pool connection record info.
+STATE_KEY = "db_factory_schema"
+# Statement switching schema per dialect.
+SWITCH_SQL = {
+    "postgresql": "SET search_path TO {schema}",
+    "mysql": "USE {schema}",
+    "snowflake": "USE SCHEMA {schema}",
+    "duckdb": "USE {schema}",
+}
+# Statement restoring default schema of connection, when it is not a switch
+# to the default schema.
+RESET_SQL = {
+    "postgresql": "RESET search_path",
+}
+# Dialects where switch is part of transaction and lost on rollback.
+TRANSACTIONAL_DIALECT = ["postgresql"]
+
+
+def current_schema():
+    """
+    Function to return the schema selected by current context, or None for
+    default schema.
+    """
+
+    return CURRENT_SCHEMA.get()
+
+
+class SchemaSwitcher(object):
+    """
+    Class handle the schema of pooled connections. Schema selected with use
+    is applied on connection checkout, begin of transaction and before
+    statement when connection still hold other schema, and default schema is
+    restored on checkin. Schema applied on connection is tracked in its pool
+    record so switch is only issued when it change.
+
+    ********
+    Methods:
+    --------
+
+        __init__:       Initaization functions, holds SQLAlchemy engine.
+        use:            Context manager selecting schema for current thread
+                        or asyncio task.
+        attach:         Method to register pool and connection events.
+        detach:         Method to remove pool and connection events.
+    """
+
+    def __init__(self, engine: Engine, default_schema: str = None):
+        """
+        Initialization function to initlaize the schema switcher
+
+        ***********
+        Attributes:
+        -----------
+
+            engine:         (Required) => SQLAlchemy engine of database.
+            default_schema: (Optional) => Schema restored on checkin, like
+                            database of MySQL or schema of Snowflake URI.
+                            Default: None to reset search_path of Postgres
+                            or use main schema of DuckDB.
+        """
+
+        dialect = engine.dialect.name
+        if dialect not in SWITCH_SQL:
+            msg = f"Schema switching is not supported for '{dialect}'"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        if default_schema is None and dialect == "duckdb":
+            default_schema = "main"
+        if default_schema is None and dialect not in RESET_SQL:
+            msg = f"Default schema is required to reset schema of '{dialect}'"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        self.engine = engine
+        self.dialect = dialect
+        self.default_schema = default_schema
+        self.preparer = engine.dialect.identifier_preparer
+        self.__listeners = [
+            (engine, "connect", self._on_connect),
+            (engine, "checkout", self._on_checkout),
+            (engine, "checkin", self._on_checkin),
+            (engine, "begin", self._on_begin),
+            (engine, "before_cursor_execute", self._on_execute),
+            (engine, "rollback", self._on_rollback),
+        ]
+
+    @staticmethod
+    @contextmanager
+    def use(schema: str = None):
+        """
+        Context manager selecting schema for statements of current thread or
+        asyncio task. Nested use restore outer schema on exit.
+
+        ***********
+        Attributes:
+        -----------
+
+            schema:     (Optional) => Name of schema.
+                        Default: None to keep schema of outer context.
+        """
+
+        if schema is None:
+            yield current_schema()
+            return
+
+        token = CURRENT_SCHEMA.set(schema)
+        try:
+            yield schema
+        finally:
+            CURRENT_SCHEMA.reset(token)
+
+    def _target(self):
+        """
+        Method to return the schema connection must hold for current
+        context.
+        """
+
+        return current_schema() or self.default_schema
+
+    def _switch(self, dbapi_connection, info: dict, schema: str, commit: bool):
+        """
+        Method to switch schema of DBAPI connection and record it.
+        """
+
+        if schema is None:
+            sql = RESET_SQL[self.dialect]
+        else:
+            sql = SWITCH_SQL[self.dialect].format(
+                schema=self.preparer.quote(schema))
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute(sql)
+        finally:
+            cursor.close()
+        if commit and self.dialect in TRANSACTIONAL_DIALECT:
+            # Connection is outside of transaction, so switch is kept even
+            # if next transaction is rolled back.
+            dbapi_connection.commit()
+        info[STATE_KEY] = schema
+        logger.debug(f'Switched schema of connection to {schema}')
+
+    def _apply(self, dbapi_connection, info: dict, commit: bool):
+        """
+        Method to switch schema of connection if it differ from schema of
+        current context.
+        """
+
+        schema = self._target()
+        if STATE_KEY in info and info[STATE_KEY] == schema:
+            return
+        self._switch(dbapi_connection, info, schema, commit)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        # New connection start in default schema of database.
+        connection_record.info[STATE_KEY] = self.default_schema
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        self._apply(dbapi_connection, connection_record.info, commit=True)
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        if dbapi_connection is None:
+            return
+        info = connection_record.info
+        if STATE_KEY in info and info[STATE_KEY] == self.default_schema:
+            return
+        try:
+            self._switch(dbapi_connection, info, self.default_schema,
+                         commit=True)
+        except Exception as err:
+            # Unknown schema is switched again on next checkout.
+            info.pop(STATE_KEY, None)
+            logger.warning(f'Failed to reset schema of connection: {err}')
+
+    def _on_begin(self, connection):
+        # Session keep its connection between calls, so schema of context
+        # may have changed since checkout.
+        self._apply(connection.connection, connection.info, commit=False)
+
+    def _on_execute(self, connection, cursor, statement, parameters,
+                    context, executemany):
+        self._apply(connection.connection, connection.info, commit=False)
+
+    def _on_rollback(self, connection):
+        if self.dialect in TRANSACTIONAL_DIALECT:
+            # Switch issued in rolled back transaction is lost.
+            connection.info.pop(STATE_KEY, None)
+
+    def attach(self):
+        """
+        Method to register pool and connection events on engine.
+        """
+
+        for target, name, listener in self.__listeners:
+            if not event.contains(target, name, listener):
+                event.listen(target, name, listener)
+        logger.info(f'Schema switching is enabled with default schema {self.default_schema}')
+
+    def detach(self):
+        """
+        Method to remove pool and connection events from engine.
+        """
+
+        for target, name, listener in self.__listeners:
+            if event.contains(target, name, listener):
+                event.remove(target, name, listener)
@@ -0,0 +1,273 @@
+#!/usr/bin/env python
+
+"""
+File holds the module to bound the execution time of queries using native
+statement timeouts of database and to cancel running queries from another
+thread.
+"""
+
+import time
+import logging
+import threading
+from sqlalchemy import text
+from sqlalchemy import event
+from sqlalchemy.engine import Connection
+
+logger = logging.getLogger(__name__)
+
+# Query to fetch the server side id of connection per dialect.
+BACKEND_ID_QUERY = {"postgresql": "SELECT pg_backend_pid()",
+                    "mysql": "SELECT CONNECTION_ID()",
+                    "snowflake": "SELECT CURRENT_SESSION()"}
+# Query to cancel the running query of server side id per dialect.
+CANCEL_QUERY = {"postgresql": "SELECT pg_cancel_backend({id})",
+                "mysql": "KILL QUERY {id}",
+                "snowflake": "SELECT SYSTEM$CANCEL_ALL_QUERIES({id})"}
+# Dialects where DBAPI connection interrupt the running query itself.
+INTERRUPT_DIALECT = ["sqlite", "duckdb"]
+# SQLite virtual machine instructions between checks of timeout.
+SQLITE_PROGRESS_STEPS = 1000
+# Key of BigQuery job timeout in connection info.
+JOB_TIMEOUT_KEY = "db_factory_job_timeout_ms"
+
+
+def is_mariadb(connection: Connection):
+    """
+    Function to check if MySQL dialect is connected to MariaDB server.
+    """
+
+    dialect = connection.dialect
+    return bool(getattr(dialect, "_is_mariadb", False) or
+                getattr(dialect, "is_mariadb", False))
+
+
+def execute_with_job_timeout(cursor, statement, parameters, context):
+    """
+    Function to execute BigQuery statement with its own query job
+    configuration when timeout is applied on connection. Return False to
+    let the dialect execute statement otherwise.
+    """
+
+    milliseconds = context.root_connection.info.get(JOB_TIMEOUT_KEY)
+    if milliseconds is None:
+        return False
+
+    from google.cloud.bigquery import QueryJobConfig
+    cursor.execute(statement, parameters,
+                   job_config=QueryJobConfig(job_timeout_ms=milliseconds))
+    return True
+
+
+class StatementTimeout(object):
+    """
+    Class handle the native statement timeout of connection.
+
+    ***********
+    Timeouts:
+    -----------
+
+        postgresql:     SET LOCAL statement_timeout, reverted at the end of
+                        transaction.
+        mysql:          MAX_EXECUTION_TIME for MySQL and max_statement_time
+                        for MariaDB session variables.
+        snowflake:      STATEMENT_TIMEOUT_IN_SECONDS session parameter.
+        bigquery:       job_timeout_ms of query job configuration given
+                        to every query of connection.
+        sqlite:         Progress handler interrupting the query once
+                        deadline is passed.
+
+    ********
+    Methods:
+    --------
+
+        __init__:   Initaization functions, holds SQLAlchemy connection.
+        apply:      Method to apply timeout on connection.
+        reset:      Method to remove timeout from connection.
+    """
+
+    def __init__(self, connection: Connection, timeout: float):
+        """
+        Initialization function to initlaize the statement timeout
+
+        ***********
+        Attributes:
+        -----------
+
+            connection: (Required) => SQLAlchemy connection running query.
+            timeout:    (Required) => Seconds allowed for the query.
+        """
+
+        self.connection = connection
+        self.timeout = timeout
+        self.dialect = connection.dialect.name
+
+    def apply(self):
+        """
+        Method to apply timeout on connection before query is executed.
+        """
+
+        milliseconds = max(int(self.timeout * 1000), 1)
+        logger.info(f'Apply statement timeout of {self.timeout} seconds')
+
+        if self.dialect == "postgresql":
+            self.connection.execute(
+                text(f"SET LOCAL statement_timeout = {milliseconds}"))
+        elif self.dialect == "mysql":
+            if is_mariadb(self.connection):
+                self.connection.execute(text(
+                    f"SET SESSION max_statement_time = {self.timeout}"))
+            else:
+                self.connection.execute(text(
+                    f"SET SESSION MAX_EXECUTION_TIME = {milliseconds}"))
+        elif self.dialect == "snowflake":
+            seconds = max(int(round(self.timeout)), 1)
+            self.connection.execute(text(
+                f"ALTER SESSION SET STATEMENT_TIMEOUT_IN_SECONDS = {seconds}"))
+        elif self.dialect == "bigquery":
+            # Client and its default configuration are shared by threads,
+            # so timeout is given with configuration of each query.
+            engine = self.connection.engine
+            if not event.contains(engine, "do_execute", execute_with_job_timeout):
+                event.listen(engine, "do_execute", execute_with_job_timeout)
+            self.connection.info[JOB_TIMEOUT_KEY] = milliseconds
+        elif self.dialect == "sqlite":
+            deadline = time.monotonic() + self.timeout
+            self.connection.connection.set_progress_handler(
+                lambda: int(time.monotonic() > deadline),
+                SQLITE_PROGRESS_STEPS)
+        else:
+            logger.warning(
+                f'Statement timeout is not supported for {self.dialect}')
+
+    def reset(self):
+        """
+        Method to remove timeout from connection once query is finished, so
+        pooled connection is returned without it.
+        """
+
+        try:
+            if self.dialect == "mysql":
+                variable = "max_statement_time" if \
+                    is_mariadb(self.connection) else "MAX_EXECUTION_TIME"
+                self.connection.execute(
+                    text(f"SET SESSION {variable} = DEFAULT"))
+            elif self.dialect == "snowflake":
+                self.connection.execute(text(
+                    "ALTER SESSION UNSET STATEMENT_TIMEOUT_IN_SECONDS"))
+            elif self.dialect == "bigquery":
+                self.connection.info.pop(JOB_TIMEOUT_KEY, None)
+            elif self.dialect == "sqlite":
+                self.connection.connection.set_progress_handler(
+                    None, SQLITE_PROGRESS_STEPS)
+        except Exception as err:
+            logger.warning(
+                f'Failed to reset statement timeout, connection is discarded: {err}')
+            self.connection.invalidate()
+
+
+class CancelHandle(object):
+    """
+    Class handle the cancellation of running query from another thread.
+    Handle is passed to execute_sql or get_df, bound to the connection
+    running the query and cancel kill the query on the server. Query of
+    handle cancelled before it is bound is not started.
+
+    ********
+    Methods:
+    --------
+
+        __init__:       Initaization functions.
+        bind:           Method to bind handle to connection running query.
+        release:        Method to unbind handle once query is finished.
+        cancel:         Method to cancel the running query.
+        is_cancelled:   Method to check if cancel was requested.
+    """
+
+    def __init__(self):
+        """
+        Initialization function to initlaize the cancel handle
+        """
+
+        self.__lock = threading.Lock()
+        self.__connection = None
+        self.__backend_id = None
+        self.__is_cancelled = False
+
+    def bind(self, connection: Connection):
+        """
+        Method to bind handle to connection running query. Server side id of
+        connection is fetched so query can be killed from other connection.
+
+        ***********
+        Attributes:
+        -----------
+
+            connection: (Required) => SQLAlchemy connection running query.
+        """
+
+        backend_id = None
+        query = BACKEND_ID_QUERY.get(connection.dialect.name)
+        if query:
+            backend_id = connection.execute(text(query)).scalar()
+
+        with self.__lock:
+            if not self.__is_cancelled:
+                self.__connection = connection
+                self.__backend_id = backend_id
+
+        if self.__is_cancelled:
+            msg = f"Query was cancelled before it started"
+            logger.error(msg)
+            raise ValueError(msg)
+
+    def release(self):
+        """
+        Method to unbind handle once query is finished.
+        """
+
+        with self.__lock:
+            self.__connection = None
+            self.__backend_id = None
+
+    def is_cancelled(self):
+        """
+        Method to check if cancel was requested.
+        """
+
+        return self.__is_cancelled
+
+    def cancel(self):
+        """
+        Method to cancel the running query. Query is killed using a separate
+        connection of engine, or interrupted directly for SQLite and DuckDB.
+
+        *******
+        Return:
+        -------
+
+            is_cancelled:   True if cancel was sent to the database.
+        """
+
+        with self.__lock:
+            connection = self.__connection
+            backend_id = self.__backend_id
+            self.__is_cancelled = True
+
+        if connection is None:
+            logger.info(f'No running query to cancel')
+            return False
+
+        dialect = connection.dialect.name
+        logger.info(f'Cancel running query on {dialect}')
+        if dialect in INTERRUPT_DIALECT:
+            connection.connection.interrupt()
+            return True
+
+        if dialect not in CANCEL_QUERY or backend_id is None:
+            logger.warning(f'Query cancellation is not supported for {dialect}')
+            return False
+
+        sql = CANCEL_QUERY[dialect].format(id=backend_id)
+        with connection.engine.connect() as killer:
+            killer.execute(text(sql))
+        return True
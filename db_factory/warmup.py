@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+
+"""
+File holds the module to pre-open pooled connections of SQLAlchemy engine at
+session creation and keep minimum idle connections available.
+"""
+
+import logging
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionWarmer(object):
+    """
+    Class handle the warm up of SQLAlchemy connection pool. Connections are
+    opened concurrently so TCP, TLS, authentication and dialect
+    initialization is paid before the first query.
+
+    ********
+    Methods:
+    --------
+
+        __init__:       Initaization functions, holds SQLAlchemy engine.
+        warm_up:        Method to initialize dialect and pre-open pooled
+                        connections concurrently.
+        top_up:         Method to open connections until pool holds minimum
+                        idle connections.
+        start:          Method to start background thread keeping minimum
+                        idle connections.
+        stop:           Method to stop background thread.
+    """
+
+    def __init__(self,
+                 engine: Engine,
+                 warm_up_connections: int = 0,
+                 min_idle_connections: int = 0,
+                 idle_check_interval: int = 30):
+        """
+        Initialization function to initlaize the connection warmer
+
+        ***********
+        Attributes:
+        -----------
+
+            engine:                 (Required) => SQLAlchemy engine.
+            warm_up_connections:    (Optional) => Number of connections
+                                    opened at warm up.
+                                    Default: 0 to only initialize dialect.
+            min_idle_connections:   (Optional) => Number of idle connections
+                                    kept in pool by background thread.
+                                    Default: 0 to disable background thread.
+            idle_check_interval:    (Optional) => Seconds between checks of
+                                    idle connections.
+                                    Default: 30
+        """
+
+        self.engine = engine
+        self.warm_up_connections = warm_up_connections or 0
+        self.min_idle_connections = min_idle_connections or 0
+        self.idle_check_interval = idle_check_interval
+        self.__stop_event = threading.Event()
+        self.__thread = None
+
+    def _is_queue_pool(self):
+        """
+        Method to check if engine pool keep connections idle for reuse.
+        """
+
+        pool = self.engine.pool
+        return hasattr(pool, "checkedin") and hasattr(pool, "size")
+
+    def _open_connections(self, count: int):
+        """
+        Method to open given number of connections concurrently and return
+        them back to pool as idle connections.
+        """
+
+        if count <= 0:
+            return 0
+
+        with ThreadPoolExecutor(max_workers=count) as executor:
+            futures = [executor.submit(self.engine.connect)
+                       for _ in range(count)]
+
+        opened = 0
+        for future in futures:
+            try:
+                future.result().close()
+                opened += 1
+            except Exception as err:
+                logger.warning(f'Failed to pre-open connection: {err}')
+        return opened
+
+    def warm_up(self):
+        """
+        Method to initialize dialect with single connection, then pre-open
+        the remaining connections concurrently.
+
+        *******
+        Return:
+        -------
+
+            opened:     Number of connections opened.
+        """
+
+        try:
+            logger.info(f'Warming up connection pool of {self.engine.name}')
+            # First connect run dialect initialization (server version,
+            # encoding and isolation queries) only once.
+            connection = self.engine.connect()
+            connection.close()
+
+            count = self.warm_up_connections
+            if count > 1 and self._is_queue_pool():
+                capacity = self.engine.pool.size()
+                if count > capacity:
+                    logger.warning(
+                        f'Warm up connections {count} exceed pool size '
+                        f'{capacity}. Only {capacity} kept idle.')
+                    count = capacity
+                # Idle connection of dialect initialization is reused.
+                opened = self._open_connections(count)
+            else:
+                # Connection of dialect initialization is only counted when
+                # warm up connections were asked.
+                opened = min(count, 1)
+
+            logger.info(f'Connection pool is warmed with {opened} connections')
+            return opened
+        except Exception as err:
+            logger.exception(f'Failed to warm up connection pool: {err}')
+            traceback.print_tb(err.__traceback__)
+
+            # Propagate the exception
+            raise
+
+    def top_up(self):
+        """
+        Method to open connections until pool holds minimum idle connections.
+
+        *******
+        Return:
+        -------
+
+            opened:     Number of connections opened.
+        """
+
+        if not self._is_queue_pool():
+            return 0
+
+        pool = self.engine.pool
+        target = min(self.min_idle_connections,
+                     pool.size() - pool.checkedout())
+        idle = pool.checkedin()
+        if idle >= target:
+            return 0
+
+        # Idle connections are checked out together with new ones so the
+        # pool create the missing connections instead of reusing idle ones.
+        # Capacity is checked before every checkout as other threads may
+        # take connections meanwhile, so pool never grow into overflow.
+        connections = []
+        try:
+            while len(connections) < target and \
+                    pool.checkedout() < pool.size():
+                try:
+                    connections.append(self.engine.connect())
+                except Exception as err:
+                    logger.warning(f'Failed to pre-open connection: {err}')
+                    break
+        finally:
+            for connection in connections:
+                connection.close()
+        return max(len(connections) - idle, 0)
+
+    def _run(self):
+        """
+        Method run by background thread to keep minimum idle connections.
+        """
+
+        while not self.__stop_event.wait(self.idle_check_interval):
+            try:
+                opened = self.top_up()
+                if opened:
+                    logger.info(f'Opened {opened} idle connections')
+            except Exception as err:
+                logger.warning(f'Failed to top up idle connections: {err}')
+
+    def start(self):
+        """
+        Method to start background thread keeping minimum idle connections.
+        """
+
+        if self.min_idle_connections <= 0 or self.__thread:
+            return
+
+        self.__stop_event.clear()
+        self.__thread = threading.Thread(target=self._run,
+                                         name="db-factory-warmer",
+                                         daemon=True)
+        self.__thread.start()
+        logger.info(
+            f'Started keeping {self.min_idle_connections} idle connections')
+
+    def stop(self):
+        """
+        Method to stop background thread.
+        """
+
+        if self.__thread:
+            self.__stop_event.set()
+            self.__thread.join()
+            self.__thread = None
@@ -71,9 +71,14 @@ mysql = [
     "pymysql"                         # Pure Python MySQL Driver
 ]
 
+duckdb = [
+    "duckdb",                         # In-process analytical SQL database
+    "duckdb-engine"                   # SQLAlchemy dialect for DuckDB
+]
+
 setups = []
 
-ir = (base + aws + gcp + snowflake + postgres + mysql)
+ir = (base + aws + gcp + snowflake + postgres + mysql + duckdb)
 requires = ir
 
 
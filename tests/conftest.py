@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+
+"""
+File holds the fixtures shared by tests, creating DatabaseManager of SQLite
+and DuckDB databases in temporary directory.
+"""
+
+import pytest
+from db_factory.manager import DatabaseManager
+
+
+@pytest.fixture
+def create_manager(tmp_path):
+    """
+    Fixture returning function to create manager with session, disposed
+    at end of test.
+    """
+
+    managers = []
+
+    def create(engine_type: str = "sqlite", database: str = "test", **kwargs):
+        if engine_type == "duckdb":
+            pytest.importorskip("duckdb_engine")
+        manager = DatabaseManager(engine_type=engine_type,
+                                  database=database,
+                                  sqlite_db_path=str(tmp_path),
+                                  **kwargs)
+        manager.create_session()
+        manager.engine.echo = False
+        managers.append(manager)
+        return manager
+
+    yield create
+    for manager in managers:
+        manager.dispose_session()
+
+
+@pytest.fixture
+def sqlite_manager(create_manager):
+    """
+    Fixture returning manager of SQLite database.
+    """
+
+    return create_manager("sqlite")
+
+
+@pytest.fixture
+def duckdb_manager(create_manager):
+    """
+    Fixture returning manager of DuckDB database.
+    """
+
+    return create_manager("duckdb")
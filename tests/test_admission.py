@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+
+"""
+File holds the tests of AdmissionController limiting concurrent
+operations per database and favouring interactive operations.
+"""
+
+import threading
+import time
+import pytest
+from db_factory.admission import AdmissionController
+
+
+def test_interactive_not_queued_behind_batch():
+    controller = AdmissionController(max_concurrency=8, batch_limit=2)
+    threads = [threading.Thread(target=controller.run,
+                                args=("db", lambda: time.sleep(1.0)),
+                                kwargs={"priority": "batch"})
+               for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.2)
+    assert controller.get_metrics("db")["queue_depth_by_priority"]["batch"] == 1
+
+    start = time.monotonic()
+    assert controller.run("db", lambda: "done") == "done"
+    assert time.monotonic() - start < 0.5
+    for thread in threads:
+        thread.join()
+    assert controller.get_metrics("db")["in_use"] == 0
+
+
+def test_queue_timeout():
+    controller = AdmissionController(max_concurrency=1, queue_timeout=0.1)
+    release = threading.Event()
+    thread = threading.Thread(target=controller.run, args=("db", release.wait))
+    thread.start()
+    time.sleep(0.1)
+    with pytest.raises(TimeoutError):
+        controller.run("db", lambda: None)
+    release.set()
+    thread.join()
+    assert controller.run("db", lambda: 1) == 1
+
+
+def test_unsupported_priority():
+    with pytest.raises(ValueError):
+        AdmissionController().run("db", lambda: None, priority="urgent")
+
+
+def test_manager_run_through_controller(create_manager):
+    controller = AdmissionController(max_concurrency=2)
+    manager = create_manager(admission_controller=controller)
+    assert manager.execute_sql("SELECT 1") == [(1,)]
+    assert len(manager.get_df("SELECT 1 AS a", priority="batch")) == 1
+    assert sum(metrics["in_use"] for metrics in controller.get_metrics().values()) == 0
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+
+"""
+File holds the tests of BigQuery reads through Storage Read API, using
+stand-in clients returning Arrow tables.
+"""
+
+import types
+import pytest
+from db_factory.bigquery_loader import BigQueryLoader
+
+pyarrow = pytest.importorskip("pyarrow")
+
+
+class Job(object):
+    destination = types.SimpleNamespace(project="p", dataset_id="d",
+                                        table_id="anon")
+
+    def result(self, timeout=None):
+        return self
+
+
+class Reader(object):
+    def __init__(self, index: int):
+        self.table = pyarrow.table({"a": [index * 10 + row for row in range(3)]})
+
+    def to_arrow(self):
+        return self.table
+
+    def rows(self, session):
+        pages = [types.SimpleNamespace(to_arrow=lambda batch=batch: batch)
+                 for batch in self.table.to_batches(max_chunksize=1)]
+        return types.SimpleNamespace(pages=pages)
+
+
+class ReadClient(object):
+    def __init__(self):
+        self.requests = []
+
+    def create_read_session(self, request):
+        self.requests.append(request)
+        count = request["max_stream_count"]
+        return types.SimpleNamespace(
+            streams=[types.SimpleNamespace(name=str(index)) for index in range(count)])
+
+    def read_rows(self, name):
+        return Reader(int(name))
+
+
+class Client(object):
+    def query(self, sql, **kwargs):
+        return Job()
+
+
+def create_loader():
+    read_client = ReadClient()
+    loader = BigQueryLoader("p", "d", client=Client(), read_client=read_client,
+                            max_streams=2)
+    return loader, read_client
+
+
+def test_read_df_concatenates_streams():
+    loader, read_client = create_loader()
+    panda_df = loader.read_df("SELECT a FROM t")
+    assert sorted(panda_df["a"].tolist()) == [0, 1, 2, 10, 11, 12]
+    assert read_client.requests[0]["read_session"]["table"] == \
+        "projects/p/datasets/d/tables/anon"
+
+
+def test_ordered_query_use_single_stream():
+    loader, read_client = create_loader()
+    panda_df = loader.read_df("SELECT a FROM t ORDER BY a")
+    assert read_client.requests[0]["max_stream_count"] == 1
+    assert panda_df["a"].tolist() == [0, 1, 2]
+
+
+def test_read_df_chunks():
+    loader, _ = create_loader()
+    chunks = list(loader.read_df("SELECT a FROM t", chunk_size=4))
+    assert [len(chunk) for chunk in chunks] == [4, 2]
+    assert sorted(value for chunk in chunks for value in chunk["a"]) == \
+        [0, 1, 2, 10, 11, 12]
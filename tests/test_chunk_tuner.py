@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+
+"""
+File holds the tests of ChunkTuner and automatic chunk size of loads and
+reads.
+"""
+
+import numpy
+import pandas
+import pytest
+from db_factory.common.chunk_tuner import ChunkTuner
+
+
+def test_size_bounded_by_memory_limit():
+    tuner = ChunkTuner(row_bytes=100, memory_limit=3 * 100 * 80000)
+    assert tuner.max_rows == 80000
+    assert tuner.size == 10000
+    sizes = [tuner.record(tuner.size, tuner.size / (1000.0 * (index + 1)))
+             for index in range(10)]
+    assert sizes[0] > 10000
+    assert max(sizes) <= 80000
+    assert tuner.record(10, 1.0) == tuner.size
+
+
+def test_size_reverse_when_throughput_drop():
+    tuner = ChunkTuner(row_bytes=100, memory_limit=3 * 100 * 80000)
+    grown = tuner.record(tuner.size, 1.0)
+    assert tuner.record(grown, grown / 1000.0) < grown
+
+
+def test_estimate_row_bytes():
+    assert ChunkTuner.estimate_row_bytes(pandas.DataFrame()) == 1.0
+    panda_df = pandas.DataFrame({"a": numpy.arange(100, dtype="int64")})
+    assert ChunkTuner.estimate_row_bytes(panda_df) == 8.0
+
+
+@pytest.mark.parametrize("engine_type", ["sqlite", "duckdb"])
+@pytest.mark.parametrize("fast_load", [False, True])
+def test_auto_chunk_size(create_manager, engine_type, fast_load):
+    manager = create_manager(engine_type, chunk_memory_limit=1024 * 1024)
+    rows = 50000
+    panda_df = pandas.DataFrame({"id": numpy.arange(rows),
+                                 "s": [f"name{index}" for index in range(rows)]})
+    manager.execute_df(panda_df, "t", exist_action="replace", chunk_size="auto",
+                       fast_load=fast_load)
+    assert manager.execute_sql("SELECT count(*), sum(id) FROM t") == \
+        [(rows, int(panda_df["id"].sum()))]
+    chunks = list(manager.get_df("SELECT * FROM t WHERE id < :hi",
+                                 chunk_size="auto", params={"hi": 40000}))
+    assert len(chunks) > 1
+    assert sum(len(chunk) for chunk in chunks) == 40000
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+
+"""
+File holds the tests of coalescing identical concurrent reads.
+"""
+
+import asyncio
+import numpy
+import pandas
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import event
+from db_factory.coalesce import QueryCoalescer
+
+SQL = "SELECT x % 100 AS k, sum(x) AS s FROM t GROUP BY 1 ORDER BY 1"
+
+
+@pytest.fixture
+def manager(create_manager):
+    manager = create_manager(coalesce_queries=True, sqlite_profile=True)
+    manager.execute_df(pandas.DataFrame({"x": numpy.arange(300000)}), "t",
+                       exist_action="replace")
+    return manager
+
+
+def count_executions(manager):
+    # pandas probe table named as query with PRAGMA, only SELECT is counted.
+    executions = []
+    event.listen(manager.engine, "before_cursor_execute",
+                 lambda *args: executions.append(args[2])
+                 if args[2].startswith("SELECT") and "sum" in args[2] else None)
+    return executions
+
+
+@pytest.mark.parametrize("sql, shareable", [
+    ("SELECT * FROM t", True),
+    ("SELECT * FROM t WHERE name = 'for update'", True),
+    ("SELECT * FROM t FOR UPDATE", False),
+    ("select * from t for no key update", False),
+    ("SELECT * FROM t LOCK IN SHARE MODE", False),
+    ("SELECT nextval('seq')", False),
+    ("SELECT random() FROM t", False),
+    ("SELECT * FROM t WHERE created < clock_timestamp()", False),
+])
+def test_is_shareable(sql, shareable):
+    assert QueryCoalescer().is_shareable(sql) is shareable
+
+
+def test_custom_volatile_functions():
+    assert not QueryCoalescer(volatile_functions=["my_counter"]).is_shareable(
+        "SELECT my_counter()")
+
+
+def test_concurrent_reads_run_once_with_own_copy(manager):
+    executions = count_executions(manager)
+
+    def read(index: int):
+        panda_df = manager.get_df(SQL)
+        panda_df["mine"] = index
+        return panda_df
+
+    with ThreadPoolExecutor(16) as executor:
+        results = list(executor.map(read, range(16)))
+    assert all((result["mine"] == index).all() for index, result in enumerate(results))
+    assert len({int(result["s"].sum()) for result in results}) == 1
+    metrics = manager.coalescer.get_metrics()
+    assert metrics["executed"] + metrics["coalesced"] == 16
+    assert len(executions) == metrics["executed"]
+
+
+def test_async_reads_coalesced(manager):
+    async def main():
+        return await asyncio.gather(*[manager.get_df_async(SQL) for _ in range(10)])
+
+    results = asyncio.run(main())
+    assert all(len(result) == 100 for result in results)
+    assert results[0] is not results[1]
+    assert manager.coalescer.get_metrics()["in_flight"] == 0
+
+
+def test_locking_and_failed_reads_not_shared(manager):
+    executions = count_executions(manager)
+    volatile = "SELECT sum(x) + random() AS s FROM t"
+    with ThreadPoolExecutor(4) as executor:
+        list(executor.map(lambda _: manager.execute_sql(volatile), range(4)))
+    assert len(executions) == 4
+    with pytest.raises(Exception):
+        manager.get_df("SELECT * FROM missing")
+    assert manager.coalescer.get_metrics()["in_flight"] == 0
@@ -0,0 +1,30 @@
+#!/usr/bin/env python
+
+"""
+File holds the tests of core execution running operations on pooled
+connection without ORM session.
+"""
+
+import pandas
+import pytest
+
+
+@pytest.mark.parametrize("core_execution", [False, True])
+def test_operations_match_session_execution(create_manager, core_execution):
+    manager = create_manager(core_execution=core_execution)
+    manager.execute_df(pandas.DataFrame({"a": range(100)}), "t")
+    manager.execute_sql("CREATE TABLE u (x INTEGER)")
+    manager.execute_sql("INSERT INTO u VALUES (1)")
+    assert manager.execute_sql("SELECT count(*) FROM u") == [(1,)]
+    assert manager.execute_sql("SELECT a FROM t WHERE a = :v",
+                               params={"v": 5}) == [(5,)]
+    assert len(manager.get_df("SELECT * FROM t", timeout=5)) == 100
+    with pytest.raises(Exception):
+        manager.execute_sql("INSERT INTO missing VALUES (1)")
+    assert manager.execute_sql("SELECT count(*) FROM u") == [(1,)]
+
+
+def test_core_execution_skip_session(create_manager):
+    manager = create_manager(core_execution=True)
+    manager.execute_sql("SELECT 1")
+    assert manager._DatabaseManager__session is None
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+
+"""
+File holds the tests of DuckDB operations of DatabaseManager, registered
+views, chunked reads and native DataFrame load.
+"""
+
+import pandas
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import types
+
+
+def column_types(manager, table_name: str):
+    return manager.execute_sql(
+        f"SELECT column_name, data_type FROM information_schema.columns "
+        f"WHERE table_name = '{table_name}' ORDER BY ordinal_position")
+
+
+def test_concurrent_queries_see_registered_view(duckdb_manager):
+    duckdb_manager.execute_sql("CREATE TABLE t (id INTEGER, v INTEGER)")
+    duckdb_manager.register_df("frame", pandas.DataFrame({"id": range(5)}))
+
+    def job(index: int):
+        if index % 2:
+            duckdb_manager.execute_sql(f"INSERT INTO t VALUES ({index}, {index})")
+        return duckdb_manager.execute_sql("SELECT count(*) FROM frame")[0][0]
+
+    with ThreadPoolExecutor(8) as executor:
+        assert set(executor.map(job, range(32))) == {5}
+    assert duckdb_manager.execute_sql("SELECT count(*) FROM t") == [(16,)]
+    assert len(duckdb_manager.get_df(sql="SELECT * FROM frame")) == 5
+    assert [len(chunk) for chunk in duckdb_manager.get_df(
+        sql="SELECT * FROM t", chunk_size=5)] == [5, 5, 5, 1]
+
+
+def test_unregistered_view_is_gone(duckdb_manager):
+    duckdb_manager.register_df("frame", pandas.DataFrame({"id": range(5)}))
+    duckdb_manager.duckdb_operations.unregister("frame")
+    assert duckdb_manager.execute_sql(
+        "SELECT count(*) FROM information_schema.tables "
+        "WHERE table_name = 'frame'") == [(0,)]
+
+
+def test_load_df_apply_dtype(duckdb_manager):
+    panda_df = pandas.DataFrame({"a": [1, 2], "b": ["x", "yy"], "c": [1.5, 2.5],
+                                 "Mixed Col": [3, 4]})
+    duckdb_manager.execute_df(panda_df, "t1", exist_action="replace",
+                              dtype={"a": types.BigInteger, "c": types.Numeric(10, 2),
+                                     "Mixed Col": types.SmallInteger()})
+    assert column_types(duckdb_manager, "t1") == [
+        ("a", "BIGINT"), ("b", "VARCHAR"), ("c", "DECIMAL(10,2)"),
+        ("Mixed Col", "SMALLINT")]
+
+    duckdb_manager.execute_df(panda_df, "t2", exist_action="replace",
+                              infer_dtype=True)
+    duckdb_manager.execute_df(panda_df, "t2", infer_dtype=True)
+    assert column_types(duckdb_manager, "t2")[0] == ("a", "SMALLINT")
+    assert duckdb_manager.execute_sql("SELECT count(*) FROM t2") == [(4,)]
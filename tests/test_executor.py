@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+
+"""
+File holds the tests of QueryExecutor running queries of managers in
+parallel and bounding workers by connection pool.
+"""
+
+import types
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import SingletonThreadPool, NullPool, QueuePool, StaticPool
+from db_factory.executor import QueryExecutor
+
+
+@pytest.mark.parametrize("pool_class, limit", [(SingletonThreadPool, 8),
+                                               (NullPool, 8),
+                                               (QueuePool, 15),
+                                               (StaticPool, 1)])
+def test_get_limit_by_pool_class(tmp_path, pool_class, limit):
+    engine = create_engine(f"sqlite:///{tmp_path}/limit.db", poolclass=pool_class)
+    manager = types.SimpleNamespace(engine=engine, pool_size=None)
+    assert QueryExecutor.get_limit(manager, default=8) == limit
+    engine.dispose()
+
+
+def test_run_concat_results(sqlite_manager):
+    sqlite_manager.execute_sql("CREATE TABLE t (a INTEGER)")
+    sqlite_manager.execute_sql("INSERT INTO t VALUES (1), (2), (3)")
+    panda_df = QueryExecutor(max_workers=4).run(
+        [(sqlite_manager, "SELECT a FROM t WHERE a < 2"),
+         (sqlite_manager, "SELECT a FROM t WHERE a >= 2")],
+        concat=True)
+    assert sorted(panda_df["a"].tolist()) == [1, 2, 3]
+
+
+def test_run_collect_errors(sqlite_manager):
+    results = QueryExecutor(max_workers=2).run(
+        [(sqlite_manager, "SELECT 1 AS a"),
+         (sqlite_manager, "SELECT * FROM missing")])
+    assert results[0]["error"] is None
+    assert results[1]["error"] is not None
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+
+"""
+File holds the tests of incremental reads advancing watermark of id and
+timestamp columns.
+"""
+
+import json
+import pandas
+import pytest
+from db_factory.incremental import WatermarkStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return WatermarkStore(str(tmp_path / "watermarks.json"))
+
+
+@pytest.fixture
+def manager(sqlite_manager):
+    sqlite_manager.execute_df(
+        pandas.DataFrame({"id": range(10),
+                          "ts": pandas.date_range("2024-01-01", periods=10)}), "t")
+    return sqlite_manager
+
+
+def test_id_watermark_read_only_new_rows(manager, store):
+    batch = manager.get_df_incremental("t_id", "id", table_name="t",
+                                       chunk_size=4, state_store=store)
+    assert [len(chunk) for chunk in batch] == [4, 4, 2]
+    batch.ack()
+    with open(store.state_path) as file:
+        assert json.load(file)["t_id"] == {"type": "number", "value": 9}
+
+    manager.execute_df(pandas.DataFrame(
+        {"id": range(10, 13), "ts": pandas.date_range("2024-02-01", periods=3)}), "t")
+    batch = manager.get_df_incremental("t_id", "id", table_name="t",
+                                       state_store=store)
+    assert [chunk["id"].tolist() for chunk in batch] == [[10, 11, 12]]
+
+
+def test_ack_require_batch_read_to_end(manager, store):
+    batch = manager.get_df_incremental("t_id", "id", table_name="t",
+                                       chunk_size=4, state_store=store)
+    next(iter(batch))
+    with pytest.raises(ValueError):
+        batch.ack()
+    assert store.get("t_id") is None
+
+
+def test_timestamp_watermark_never_move_back(manager, store):
+    batch = manager.get_df_incremental("t_ts", "ts", sql="SELECT * FROM t",
+                                       state_store=store, parse_dates=["ts"])
+    assert sum(len(chunk) for chunk in batch) == 10
+    batch.ack()
+
+    manager.execute_df(pandas.DataFrame(
+        {"id": [20], "ts": [pandas.Timestamp("2024-03-01")]}), "t")
+    batch = manager.get_df_incremental("t_ts", "ts", sql="SELECT * FROM t",
+                                       state_store=store)
+    assert [chunk["id"].tolist() for chunk in batch] == [[20]]
+    batch.ack()
+
+    batch = manager.get_df_incremental("t_ts", "ts", sql="SELECT * FROM t",
+                                       state_store=store)
+    assert list(batch) == []
@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+
+"""
+File holds the tests of reading and modifying rows by large key lists
+staged in temporary table.
+"""
+
+import numpy
+import pandas
+import pytest
+
+
+@pytest.fixture(params=["sqlite", "duckdb"])
+def manager(request, create_manager):
+    manager = create_manager(request.param)
+    rows = 5000
+    manager.execute_df(pandas.DataFrame({"id": numpy.arange(rows),
+                                         "v": numpy.arange(rows) * 2}),
+                       "orders", exist_action="replace")
+    return manager
+
+
+def test_get_df_by_keys(manager):
+    keys = numpy.random.default_rng(0).choice(5000, 2000, replace=False)
+    panda_df = manager.get_df_by_keys(
+        keys, "SELECT o.* FROM orders o JOIN {keys} k ON o.id = k.key")
+    assert sorted(panda_df["id"]) == sorted(keys)
+
+
+def test_get_df_by_key_frame_with_params(manager):
+    panda_df = manager.get_df_by_keys(
+        pandas.DataFrame({"id": [1, 2, 3], "mul": [10, 20, 30]}),
+        "SELECT o.v * k.mul AS x FROM orders o JOIN {keys} k ON o.id = k.id "
+        "WHERE o.v > :lo ORDER BY x", params={"lo": 2})
+    assert panda_df["x"].tolist() == [80, 180]
+
+
+def test_execute_sql_by_keys(manager):
+    manager.execute_sql_by_keys(numpy.arange(1000),
+                                "DELETE FROM orders WHERE id IN (SELECT key FROM {keys})")
+    assert manager.execute_sql("SELECT count(*), min(id) FROM orders") == [(4000, 1000)]
@@ -0,0 +1,33 @@
+#!/usr/bin/env python
+
+"""
+File holds the tests of SchemaCache skipping reflection of known tables
+and persisting it across managers.
+"""
+
+import pandas
+from sqlalchemy import event
+
+
+def test_fast_load_reflect_table_once(create_manager, tmp_path):
+    cache_path = str(tmp_path / "schema.pkl")
+    manager = create_manager(metadata_cache_path=cache_path)
+    panda_df = pandas.DataFrame({"a": [1, 2]})
+    manager.execute_df(panda_df, "t", fast_load=True, exist_action="replace")
+
+    statements = []
+    event.listen(manager.engine, "before_cursor_execute",
+                 lambda *args: statements.append(args[2]))
+    manager.execute_df(panda_df, "t", fast_load=True)
+    statements.clear()
+    manager.execute_df(panda_df, "t", fast_load=True)
+    assert not [sql for sql in statements if sql.startswith("PRAGMA")]
+
+    manager.execute_sql("ALTER TABLE t ADD COLUMN b INTEGER")
+    statements.clear()
+    manager.execute_df(panda_df, "t", fast_load=True)
+    assert [sql for sql in statements if "table_xinfo" in sql]
+    assert manager.execute_sql("SELECT count(*) FROM t") == [(8,)]
+
+    other = create_manager(metadata_cache_path=cache_path)
+    assert other.schema_cache.has_table("t")
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+
+"""
+File holds the tests of TableCopier copying tables between SQLite databases
+and resuming from checkpoint.
+"""
+
+import pandas
+import pytest
+from db_factory.migration import TableCopier
+
+
+@pytest.fixture
+def databases(create_manager):
+    source = create_manager(database="source")
+    target = create_manager(database="target")
+    source.execute_df(pandas.DataFrame({"id": range(100), "v": range(100)}),
+                      "Src Table", exist_action="replace")
+    target.execute_df(pandas.DataFrame({"id": range(1000, 1010), "v": range(10)}),
+                      "dst", exist_action="replace")
+    return source, target
+
+
+def count(target):
+    return target.execute_sql(
+        "SELECT count(*), sum(id >= 1000), count(DISTINCT id) FROM dst")[0]
+
+
+def test_copy_quoted_table_in_partitions(databases, tmp_path):
+    source, target = databases
+    copier = TableCopier(source, target, chunk_size=10,
+                         checkpoint_path=str(tmp_path / "checkpoint.json"))
+    copied = copier.copy("dst", table_name="Src Table",
+                         partitions=TableCopier.range_partitions("id", 0, 100, 3))
+    assert sum(copied.values()) == 100
+    assert count(target) == (110, 10, 110)
+
+
+def test_resume_keep_existing_rows(databases, tmp_path):
+    source, target = databases
+    copier = TableCopier(source, target, chunk_size=10,
+                         checkpoint_path=str(tmp_path / "checkpoint.json"))
+    execute_df = target.execute_df
+    calls = []
+
+    def flaky(*args, **kwargs):
+        calls.append(1)
+        if len(calls) == 4:
+            raise RuntimeError("load failed")
+        return execute_df(*args, **kwargs)
+
+    target.execute_df = flaky
+    with pytest.raises(RuntimeError):
+        copier.copy("dst", table_name="Src Table")
+    target.execute_df = execute_df
+
+    copier.copy("dst", table_name="Src Table")
+    assert count(target) == (110, 10, 110)
+
+
+def test_resume_after_failed_move_of_stage(databases, tmp_path, monkeypatch):
+    source, target = databases
+    copier = TableCopier(source, target, chunk_size=10,
+                         checkpoint_path=str(tmp_path / "checkpoint.json"))
+    partitions = ["id < 50", "id >= 50"]
+    move_stage = TableCopier._move_stage
+
+    def failed_move(self, **kwargs):
+        raise RuntimeError("move failed")
+
+    monkeypatch.setattr(TableCopier, "_move_stage", failed_move)
+    with pytest.raises(RuntimeError):
+        copier.copy("dst", table_name="Src Table", partitions=partitions)
+    assert count(target) == (10, 10, 10)
+
+    monkeypatch.setattr(TableCopier, "_move_stage", move_stage)
+    assert copier.copy("dst", table_name="Src Table", partitions=partitions) == \
+        {"id < 50": 50, "id >= 50": 50}
+    assert count(target) == (110, 10, 110)
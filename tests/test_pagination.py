@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+
+"""
+File holds the tests of keyset pagination of get_pages.
+"""
+
+import numpy
+import pandas
+import pytest
+
+
+@pytest.fixture
+def manager(sqlite_manager):
+    rows = 10050
+    sqlite_manager.execute_df(pandas.DataFrame({"g": numpy.arange(rows) % 7,
+                                                "id": numpy.arange(rows),
+                                                "v": numpy.arange(rows) * 2}),
+                              "t", fast_load=True)
+    return sqlite_manager
+
+
+def test_pages_cover_table_once(manager):
+    pages = list(manager.get_pages(["g", "id"], table_name="t", page_size=1000))
+    assert len(pages) == 11
+    panda_df = pandas.concat(pages)
+    assert len(panda_df) == 10050
+    assert not panda_df[["g", "id"]].duplicated().any()
+
+
+def test_pages_of_query_as_rows(manager):
+    pages = list(manager.get_pages("id", sql="SELECT id, v FROM t WHERE id % 2 = 0",
+                                   page_size=777, as_frame=False))
+    assert sum(map(len, pages)) == 5025
+    assert pages[0][0] == (0, 0)
+
+
+def test_pages_start_after(manager):
+    pages = manager.get_pages("id", table_name="t", page_size=1000,
+                              prefetch=False, start_after=[9000])
+    assert sum(map(len, pages)) == 1049
+    assert list(manager.get_pages("id", table_name="t", start_after=[99999])) == []
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+
+"""
+File holds the tests of execute_sql result formats.
+"""
+
+import numpy
+import pandas
+import pytest
+
+
+@pytest.fixture(params=[False, True])
+def manager(request, create_manager):
+    manager = create_manager(core_execution=request.param)
+    manager.execute_df(pandas.DataFrame({"a": numpy.arange(30),
+                                         "b": numpy.arange(30) / 2,
+                                         "s": ["x"] * 30}), "t", fast_load=True)
+    return manager
+
+
+def test_formats(manager):
+    assert manager.execute_sql("SELECT a, s FROM t WHERE a < 2",
+                               result_format="tuples") == [(0, "x"), (1, "x")]
+    assert manager.execute_sql("SELECT count(*) FROM t",
+                               result_format="scalar") == 30
+    assert manager.execute_sql("SELECT a, s FROM t WHERE a = 3",
+                               result_format="first") == (3, "x")
+    assert manager.execute_sql("SELECT a FROM t WHERE a > 100",
+                               result_format="first") is None
+    iterator = manager.execute_sql("SELECT a FROM t WHERE a < 25",
+                                   result_format="iterator", fetch_size=10)
+    assert [row[0] for row in iterator] == list(range(25))
+
+
+def test_columns_format(manager):
+    columns = manager.execute_sql("SELECT * FROM t", result_format="columns",
+                                  fetch_size=7)
+    assert columns["a"].tolist() == list(range(30))
+    assert columns["b"].dtype == numpy.float64
+    assert columns["s"].dtype == object
+    empty = manager.execute_sql("SELECT a FROM t WHERE a > 100",
+                                result_format="columns")
+    assert len(empty["a"]) == 0
+
+
+def test_unsupported_format(manager):
+    with pytest.raises(ValueError):
+        manager.execute_sql("SELECT 1", result_format="xml")
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+
+"""
+File holds the tests of retry policy of transient database errors.
+"""
+
+import sqlite3
+import pytest
+from sqlalchemy.exc import OperationalError
+from db_factory.retry import RetryPolicy
+
+
+def failing(times: int, message: str = "database is locked"):
+    calls = []
+
+    def func():
+        calls.append(1)
+        if len(calls) <= times:
+            raise OperationalError("SELECT 1", {}, sqlite3.OperationalError(message))
+        return len(calls)
+
+    return func, calls
+
+
+def test_transient_error_is_retried():
+    policy = RetryPolicy(base_delay=0.001)
+    func, calls = failing(2)
+    assert policy.call(func, dialect="sqlite") == 3
+    metrics = policy.get_metrics()
+    assert metrics["retries"] == 2 and metrics["recovered"] == 1
+
+
+def test_non_idempotent_and_permanent_errors_are_not_retried():
+    policy = RetryPolicy(base_delay=0.001)
+    func, calls = failing(1)
+    with pytest.raises(OperationalError):
+        policy.call(func, idempotent=False, dialect="sqlite")
+    assert len(calls) == 1
+
+    func, calls = failing(1, message="no such table: missing")
+    with pytest.raises(OperationalError):
+        policy.call(func, dialect="sqlite")
+    assert len(calls) == 1
+
+
+def test_retry_budget_is_exhausted():
+    policy = RetryPolicy(base_delay=0.001, max_retries=5, retry_budget=2,
+                         budget_refill=0)
+    func, calls = failing(10)
+    with pytest.raises(OperationalError):
+        policy.call(func, dialect="sqlite")
+    assert len(calls) == 3
+    assert policy.get_metrics()["budget_exhausted"] == 1
+
+
+def test_read_only_statements():
+    assert RetryPolicy.is_read_only("  select * from t")
+    assert RetryPolicy.is_read_only("SELECT * FROM t FOR UPDATE")
+    assert RetryPolicy.is_read_only("SELECT 'insert' AS word")
+    assert not RetryPolicy.is_read_only("WITH d AS (DELETE FROM t RETURNING *) SELECT * FROM d")
+    assert not RetryPolicy.is_read_only("UPDATE t SET a = 1")
+
+
+def test_manager_retries_transient_errors(create_manager):
+    policy = RetryPolicy(base_delay=0.001)
+    manager = create_manager("sqlite", retry_policy=policy)
+    assert manager.execute_sql("SELECT 1") == [(1,)]
+    assert policy.get_metrics()["operations"] == 1
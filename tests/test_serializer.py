@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+
+"""
+File holds the tests of vectorized DataFrame serialization used by
+fast_load.
+"""
+
+from decimal import Decimal
+import numpy
+import pandas
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects import sqlite
+from db_factory.common.serializer import Serializer
+
+
+def test_parameters_replace_nulls_with_none():
+    panda_df = pandas.DataFrame({"a": [1.5, numpy.nan],
+                                 "b": pandas.Series([1, None], dtype="Int64"),
+                                 "t": pandas.to_datetime(["2024-01-01", None])})
+    rows = Serializer.to_parameters(panda_df)
+    assert rows[1] == (None, None, None)
+    assert rows[0][1] == 1 and type(rows[0][1]) is int
+    assert rows[0][2].year == 2024
+
+
+def test_decimal_is_float_only_without_native_decimal():
+    panda_df = pandas.DataFrame({"a": [Decimal("1.25"), None],
+                                 "b": pandas.Series([numpy.int64(3), 4], dtype=object)})
+    rows = Serializer.to_parameters(panda_df, dialect=sqlite.dialect())
+    assert rows == [(1.25, numpy.int64(3).item()), (None, 4)]
+    assert type(rows[0][0]) is float and type(rows[0][1]) is int
+    rows = Serializer.to_parameters(panda_df, dialect=postgresql.dialect())
+    assert rows[0][0] == Decimal("1.25")
+
+
+def test_csv_bytes_quote_null_marker_string():
+    panda_df = pandas.DataFrame({"a": ["\\N", None, "x"]})
+    assert Serializer.to_csv_bytes(panda_df) == b'"\\N"\n\\N\nx\n'
+
+
+def test_fast_load_binds_object_columns(sqlite_manager):
+    panda_df = pandas.DataFrame({
+        "amount": [Decimal("1.25"), None, Decimal("3")],
+        "count": pandas.Series([numpy.int64(1), 2, None], dtype=object),
+        "name": ["x", None, "z"],
+        "at": pandas.Series([pandas.Timestamp("2024-01-01"), None,
+                             pandas.Timestamp("2024-01-02")], dtype=object)})
+    sqlite_manager.execute_df(panda_df, "fast", fast_load=True)
+    rows = sqlite_manager.execute_sql("SELECT * FROM fast", result_format="tuples")
+    assert [row[:3] for row in rows] == [(1.25, 1, "x"), (None, 2, None),
+                                         (3.0, None, "z")]
+    assert rows[1][3] is None and rows[0][3].startswith("2024-01-01")
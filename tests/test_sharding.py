@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+
+"""
+File holds the tests of ShardedDatabaseManager routing keys and loads
+across SQLite shards.
+"""
+
+from decimal import Decimal
+import numpy
+import pandas
+import pytest
+from db_factory.sharding import ShardedDatabaseManager
+
+BIG = 2 ** 63 + 5
+LAST = 2 ** 64 - 1
+
+
+@pytest.fixture
+def sharded(tmp_path):
+    manager = ShardedDatabaseManager(
+        shard_map={"strategy": "hash", "key": "k",
+                   "shards": [{"engine_type": "sqlite", "database": f"s{index}",
+                               "sqlite_db_path": str(tmp_path)}
+                              for index in range(4)]},
+        parallel=2)
+    manager.create_session()
+    for shard in manager.managers:
+        shard.engine.echo = False
+    yield manager
+    manager.dispose_session()
+
+
+def test_same_key_same_shard_whatever_dtype(sharded):
+    expected = sharded.shard_index(numpy.array([BIG, 7, LAST], dtype="uint64"))
+    keys = [pandas.Series(numpy.array([BIG, 7, LAST], dtype="uint64")).astype("UInt64"),
+            numpy.array([BIG, 7, LAST], dtype=object),
+            numpy.array([Decimal(BIG), 7.0, Decimal(LAST)], dtype=object)]
+    for values in keys:
+        assert sharded.shard_index(values).tolist() == expected.tolist()
+    assert [sharded.shard_index(numpy.asarray([key]))[0]
+            for key in [BIG, 7, LAST]] == expected.tolist()
+    assert sharded.shard_index(numpy.arange(10)).tolist() == \
+        sharded.shard_index(numpy.arange(10).astype(float)).tolist()
+
+
+def test_missing_key_rejected(sharded):
+    with pytest.raises(ValueError):
+        sharded.shard_index(pandas.Series([1, None]))
+
+
+def test_load_and_gather(sharded):
+    sharded.execute_sql("CREATE TABLE t (k INTEGER, v INTEGER)")
+    results = sharded.execute_df(pandas.DataFrame({"k": numpy.arange(40), "v": 1}), "t")
+    assert len(results) > 1
+    assert len(sharded.get_df("SELECT * FROM t")) == 40
+    chunks = sharded.get_df("SELECT * FROM t", chunk_size=4)
+    assert sum(len(chunk) for chunk in chunks) == 40
+    assert sharded.get_manager(3).execute_sql("SELECT k FROM t WHERE k = 3") == [(3,)]
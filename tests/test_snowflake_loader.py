@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+
+"""
+File holds the tests of Snowflake bulk load through internal stage, using
+stand-in connection recording the statements.
+"""
+
+import os
+import pandas
+import pytest
+from sqlalchemy.dialects import postgresql
+from db_factory.snowflake_loader import SnowflakeLoader
+
+pytest.importorskip("pyarrow")
+
+
+class Result(object):
+    returns_rows = True
+
+    def keys(self):
+        return ["FILE", "STATUS", "ROWS_LOADED"]
+
+    def fetchall(self):
+        return [("part_00000.parquet", "LOADED", 2)]
+
+
+class Connection(object):
+    dialect = postgresql.dialect()
+
+    def __init__(self):
+        self.statements = []
+        self.files = []
+
+    def execute(self, sql):
+        sql = str(sql)
+        self.statements.append(sql)
+        if sql.startswith("PUT"):
+            directory = os.path.dirname(sql.split("'")[1][len("file://"):])
+            self.files = sorted(os.listdir(directory))
+        return Result()
+
+
+def test_load_put_parquet_chunks_and_copy():
+    connection = Connection()
+    panda_df = pandas.DataFrame({"a": [1, 2, 3],
+                                 "t": pandas.to_datetime(["2020", "2021", "2022"])})
+    results = SnowflakeLoader(connection, parallel=2).load(panda_df, "Orders",
+                                                           chunk_size=2)
+    assert results == [{"file": "part_00000.parquet", "status": "LOADED",
+                        "rows_loaded": 2}]
+    assert connection.files == ["part_00000.parquet", "part_00001.parquet"]
+    create, put, copy, drop = connection.statements
+    assert create.startswith("CREATE TEMPORARY STAGE")
+    assert "PARALLEL = 2" in put
+    assert copy.startswith('COPY INTO "Orders" FROM @')
+    assert "MATCH_BY_COLUMN_NAME = CASE_INSENSITIVE" in copy
+    assert drop.startswith("DROP STAGE IF EXISTS")
+
+
+def test_write_parquet_round_trip(tmp_path):
+    panda_df = pandas.DataFrame({"a": range(5)})
+    files = SnowflakeLoader(Connection()).write_parquet(panda_df, str(tmp_path),
+                                                        chunk_size=2)
+    assert len(files) == 3
+    assert pandas.concat(pandas.read_parquet(path) for path in files)["a"].tolist() \
+        == list(range(5))
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+
+"""
+File holds the tests of SQLite performance profile, deferred indexes and
+named in-memory database.
+"""
+
+import sqlite3
+import threading
+import pandas
+from db_factory.sqlite_profile import SqliteProfile
+
+
+def test_profile_pragmas(create_manager):
+    manager = create_manager(sqlite_profile=True)
+    assert manager.execute_sql("PRAGMA journal_mode") == [("wal",)]
+    assert manager.execute_sql("PRAGMA synchronous") == [(1,)]
+    assert manager.execute_sql("PRAGMA busy_timeout") == [(5000,)]
+
+
+def test_defer_indexes_recreate_them(create_manager):
+    manager = create_manager(sqlite_profile=True)
+    manager.execute_sql("CREATE TABLE t (a INTEGER, b TEXT)")
+    manager.execute_sql("CREATE INDEX ix_t_a ON t(a)")
+    manager.execute_df(pandas.DataFrame({"a": range(1000), "b": "x"}), "t",
+                       fast_load=True, defer_indexes=True)
+    assert manager.execute_sql(
+        "SELECT name FROM sqlite_master WHERE type = 'index'") == [("ix_t_a",)]
+    assert manager.execute_sql("SELECT count(*) FROM t") == [(1000,)]
+
+
+def test_drop_indexes_match_table_case_insensitive(tmp_path):
+    connection = sqlite3.connect(str(tmp_path / "index.db"))
+    cursor = connection.cursor()
+    cursor.execute("CREATE TABLE t (a INTEGER, b TEXT)")
+    cursor.execute("CREATE INDEX ix_t_a ON t(a)")
+    cursor.execute("CREATE INDEX ix_T_b ON T(b)")
+    indexes = SqliteProfile.drop_indexes(cursor, "T")
+    assert sorted(indexes) == ["CREATE INDEX ix_T_b ON T(b)",
+                               "CREATE INDEX ix_t_a ON t(a)"]
+    SqliteProfile.create_indexes(cursor, indexes)
+    cursor.execute("SELECT count(*) FROM sqlite_master WHERE type = 'index'")
+    assert cursor.fetchone() == (2,)
+    connection.close()
+
+
+def test_in_memory_database_shared_across_threads(create_manager):
+    manager = create_manager(database="memory", sqlite_in_memory=True)
+    manager.execute_sql("CREATE TABLE x (a INTEGER)")
+    manager.execute_sql("INSERT INTO x VALUES (1)")
+    rows = []
+    thread = threading.Thread(
+        target=lambda: rows.append(manager.execute_sql("SELECT * FROM x")))
+    thread.start()
+    thread.join()
+    assert rows == [[(1,)]]
@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+
+"""
+File holds the tests of TableDiff comparing table of SQLite and DuckDB by
+checksum of key ranges and reconciling the differences.
+"""
+
+import numpy
+import pandas
+import pytest
+from db_factory.table_diff import TableDiff
+
+pytestmark = pytest.mark.filterwarnings("ignore")
+
+
+def test_diff_and_reconcile(sqlite_manager, duckdb_manager):
+    rows = 2000
+    panda_df = pandas.DataFrame({"id": numpy.arange(rows), "v": numpy.arange(rows) * 2,
+                                 "s": [f"x{index}" for index in range(rows)]})
+    panda_df.loc[5, "s"] = None
+    sqlite_manager.execute_df(panda_df, "t")
+
+    target_df = panda_df.copy()
+    target_df.loc[100, "v"] = -1
+    target_df.loc[1500, "s"] = "changed"
+    target_df = pandas.concat([target_df.drop(index=[700]),
+                               pandas.DataFrame({"id": [rows + 5], "v": [1], "s": ["new"]})])
+    duckdb_manager.execute_df(target_df, "t")
+
+    table_diff = TableDiff(sqlite_manager, duckdb_manager, "id", parallel=1)
+    result = table_diff.diff("t")
+    assert result["missing_in_target"]["id"].tolist() == [700]
+    assert result["missing_in_source"]["id"].tolist() == [rows + 5]
+    assert result["changed"]["id"].tolist() == [100, 1500]
+    assert result["ranges_checked"] > 1
+
+    table_diff.reconcile("t", result)
+    result = table_diff.diff("t")
+    assert [len(result[name]) for name in
+            ["missing_in_target", "missing_in_source", "changed"]] == [0, 0, 0]
+    assert duckdb_manager.execute_sql("SELECT s FROM t WHERE id = 5") == [(None,)]
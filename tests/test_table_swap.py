@@ -0,0 +1,39 @@
+#!/usr/bin/env python
+
+"""
+File holds the tests of replacing table by atomic swap keeping its indexes
+and constraints.
+"""
+
+import numpy
+import pandas
+import pytest
+
+
+@pytest.fixture(params=["sqlite", "duckdb"])
+def manager(request, create_manager):
+    manager = create_manager(request.param)
+    manager.execute_sql("CREATE TABLE t (id INTEGER PRIMARY KEY, code VARCHAR, "
+                        "v INTEGER, UNIQUE(code))")
+    manager.execute_sql("CREATE INDEX ix_t_v ON t (v)")
+    manager.execute_sql("INSERT INTO t VALUES (1, 'a', 1)")
+    return manager
+
+
+def test_swap_replace_rows_and_keep_constraints(manager):
+    rows = 5000
+    panda_df = pandas.DataFrame({"id": numpy.arange(rows),
+                                 "code": [f"c{index}" for index in range(rows)],
+                                 "v": numpy.arange(rows) % 7})
+    manager.execute_df(panda_df, "t", exist_action="replace", atomic_swap=True,
+                       chunk_size=1000)
+    assert manager.execute_sql("SELECT count(*) FROM t") == [(rows,)]
+    with pytest.raises(Exception):
+        manager.execute_sql("INSERT INTO t VALUES (999999, 'c5', 1)")
+    assert manager.execute_sql("SELECT count(*) FROM t") == [(rows,)]
+
+
+def test_swap_create_missing_table(manager):
+    panda_df = pandas.DataFrame({"id": range(10), "v": range(10)})
+    manager.execute_df(panda_df, "new_t", exist_action="replace", atomic_swap=True)
+    assert manager.execute_sql("SELECT count(*) FROM new_t") == [(10,)]
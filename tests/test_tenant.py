@@ -0,0 +1,35 @@
+#!/usr/bin/env python
+
+"""
+File holds the tests of per tenant schema switching on DuckDB.
+"""
+
+import pandas
+import pytest
+
+
+@pytest.fixture
+def manager(create_manager):
+    manager = create_manager("duckdb", schema_switching=True, metadata_cache=True)
+    for schema, values in [("a", [1, 2, 3]), ("b", [9])]:
+        manager.execute_sql(f"CREATE SCHEMA {schema}")
+        manager.execute_df(pandas.DataFrame({"x": values}), "items",
+                           exist_action="replace", schema=schema)
+    return manager
+
+
+def test_schema_of_operation(manager):
+    assert manager.execute_sql("SELECT count(*) FROM items", schema="a") == [(3,)]
+    assert manager.execute_sql("SELECT count(*) FROM items", schema="b") == [(1,)]
+    assert manager.execute_sql(
+        "SELECT table_schema, table_name FROM information_schema.tables "
+        "ORDER BY 1") == [("a", "items"), ("b", "items")]
+
+
+def test_use_schema_is_restored(manager):
+    with manager.use_schema("b"):
+        assert manager.get_df("SELECT * FROM items")["x"].tolist() == [9]
+        assert manager.execute_sql("SELECT current_schema()") == [("b",)]
+    assert manager.execute_sql("SELECT current_schema()") == [("main",)]
+    with pytest.raises(Exception):
+        manager.execute_sql("SELECT * FROM items")
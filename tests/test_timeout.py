@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+
+"""
+File holds the tests of statement timeout and query cancellation.
+"""
+
+import time
+import threading
+import pytest
+from sqlalchemy.exc import OperationalError
+from db_factory.timeout import CancelHandle
+
+SLOW_SQL = "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c " \
+    "WHERE x < 50000000) SELECT count(*) FROM c"
+
+
+def test_statement_timeout_interrupts_query(sqlite_manager):
+    start = time.monotonic()
+    with pytest.raises(OperationalError):
+        sqlite_manager.execute_sql(SLOW_SQL, timeout=0.2)
+    assert time.monotonic() - start < 5
+    # Connection is usable after the interrupt.
+    assert sqlite_manager.execute_sql("SELECT 1", timeout=1) == [(1,)]
+
+
+def test_cancel_handle_interrupts_query(sqlite_manager):
+    handle = CancelHandle()
+    threading.Timer(0.2, handle.cancel).start()
+    start = time.monotonic()
+    with pytest.raises(OperationalError):
+        sqlite_manager.get_df(SLOW_SQL, cancel_handle=handle)
+    assert time.monotonic() - start < 5
+    assert handle.is_cancelled()
+
+
+def test_cancelled_handle_stops_query_before_start(sqlite_manager):
+    handle = CancelHandle()
+    handle.cancel()
+    with pytest.raises(Exception):
+        sqlite_manager.get_df(SLOW_SQL, cancel_handle=handle)
+
+
+def test_timeout_applies_to_chunked_reads(sqlite_manager):
+    chunks = sqlite_manager.get_df("SELECT 1 AS a UNION ALL SELECT 2",
+                                   chunk_size=1, timeout=1)
+    assert [len(chunk) for chunk in chunks] == [1, 1]
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+
+"""
+File holds the tests of dtype mapping of execute_df and memory efficient
+get_df.
+"""
+
+from decimal import Decimal
+import numpy
+import pandas
+from sqlalchemy import inspect
+from sqlalchemy import types as satypes
+from db_factory.common.type_mapper import TypeMapper
+
+
+def test_integer_type_is_sized_by_range():
+    assert isinstance(TypeMapper.get_column_type(pandas.Series([1, 300])),
+                      satypes.SmallInteger)
+    assert isinstance(TypeMapper.get_column_type(pandas.Series([1, 2 ** 20])),
+                      satypes.Integer)
+    assert isinstance(TypeMapper.get_column_type(pandas.Series([1, 2 ** 40])),
+                      satypes.BigInteger)
+
+
+def test_uint64_beyond_bigint_is_numeric():
+    series = pandas.Series(numpy.array([1, 2 ** 63 + 5], dtype="uint64"))
+    sql_type = TypeMapper.get_column_type(series)
+    assert isinstance(sql_type, satypes.Numeric)
+    assert not isinstance(sql_type, satypes.Float)
+    assert (sql_type.precision, sql_type.scale) == (20, 0)
+
+
+def test_object_types_are_derived_from_values():
+    panda_df = pandas.DataFrame({"name": ["ab", "abcd", None],
+                                 "amount": [Decimal("12.5"), Decimal("-1.25"), None]})
+    sql_types = TypeMapper.infer_sql_types(panda_df)
+    assert sql_types["name"].length == 4
+    assert (sql_types["amount"].precision, sql_types["amount"].scale) == (4, 2)
+
+
+def test_execute_df_creates_compact_columns(sqlite_manager):
+    panda_df = pandas.DataFrame({"id": [1, 2], "code": ["x", "yyy"]})
+    sqlite_manager.execute_df(panda_df, "items", infer_dtype=True)
+    columns = {column["name"]: column["type"] for column in
+               inspect(sqlite_manager.engine).get_columns("items")}
+    assert isinstance(columns["id"], satypes.SmallInteger)
+    assert columns["code"].length == 3
+
+
+def test_get_df_applies_dtype_and_columns(sqlite_manager):
+    sqlite_manager.execute_df(pandas.DataFrame({"a": [1, 2], "b": [1.5, 2.5],
+                                                "c": ["x", "y"]}), "items")
+    panda_df = sqlite_manager.get_df("SELECT * FROM items",
+                                     dtype={"a": "int8"},
+                                     columns=["a", "b"])
+    assert list(panda_df.columns) == ["a", "b"]
+    assert panda_df["a"].dtype == numpy.int8
+
+
+def test_downcast_chunks_keep_dtype_over_null_chunk(sqlite_manager):
+    sqlite_manager.execute_sql("CREATE TABLE items (a INTEGER, b REAL, c TEXT)")
+    sqlite_manager.execute_sql(
+        "INSERT INTO items VALUES (1, 1.5, 'x'), (2, 2.5, 'x'), "
+        "(NULL, NULL, NULL), (NULL, NULL, NULL), (3, NULL, 'y')")
+    chunks = list(sqlite_manager.get_df("SELECT * FROM items",
+                                        chunk_size=2, downcast=True))
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert str(chunks[1]["a"].dtype) == "Int8"
+    assert chunks[1]["a"].isna().all()
+    assert chunks[2]["a"].dtype == chunks[1]["a"].dtype
+    assert chunks[2]["a"].tolist() == [3]
+    assert all(chunk["b"].dtype == numpy.float32 for chunk in chunks)
+
+
+def test_concat_df_unifies_categories():
+    first = pandas.DataFrame({"c": pandas.Series(["x"], dtype="category")})
+    second = pandas.DataFrame({"c": pandas.Series(["y"], dtype="category")})
+    panda_df = TypeMapper.concat_df([first, second])
+    assert isinstance(panda_df["c"].dtype, pandas.CategoricalDtype)
+    assert panda_df["c"].tolist() == ["x", "y"]
@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+
+"""
+File holds the tests of connection warm up and idle connections top up.
+"""
+
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+from db_factory.warmup import ConnectionWarmer
+
+
+def create_engine_of(tmp_path, pool_size: int):
+    return create_engine(f"sqlite:///{tmp_path}/warm.db",
+                         poolclass=QueuePool,
+                         pool_size=pool_size,
+                         connect_args={"check_same_thread": False})
+
+
+def test_warm_up_opens_idle_connections(tmp_path):
+    engine = create_engine_of(tmp_path, pool_size=4)
+    warmer = ConnectionWarmer(engine=engine, warm_up_connections=3)
+    assert warmer.warm_up() == 3
+    assert engine.pool.checkedin() == 3
+    engine.dispose()
+
+
+def test_warm_up_is_capped_by_pool_size(tmp_path):
+    engine = create_engine_of(tmp_path, pool_size=2)
+    warmer = ConnectionWarmer(engine=engine, warm_up_connections=5)
+    assert warmer.warm_up() == 2
+    assert engine.pool.checkedin() == 2
+    assert engine.pool.overflow() <= 0
+    engine.dispose()
+
+
+def test_top_up_keeps_minimum_idle_connections(tmp_path):
+    engine = create_engine_of(tmp_path, pool_size=4)
+    warmer = ConnectionWarmer(engine=engine, min_idle_connections=3)
+    warmer.warm_up()
+    assert warmer.top_up() == 2
+    assert engine.pool.checkedin() == 3
+    assert warmer.top_up() == 0
+    engine.dispose()